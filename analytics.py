@@ -0,0 +1,179 @@
+from collections import Counter
+
+# --------------------------------------------------
+# GAMEPLAY ROLLUPS
+# Small aggregate tables kept next to the raw `events` table and updated
+# in the same transaction as every batch the event log writes, so the
+# instructor dashboards never rescan the raw history:
+#
+#   question_stats (scenario, floor, question) -> answers, correct, think_ms
+#                  a timeout counts as a wrong answer (it crashes the run)
+#   option_stats   (scenario, floor, question, option) -> picks
+#   funnel         (scenario, step) -> runs
+#                  step 0 = entered the tower, step k = cleared floor k
+#
+# Questions are keyed by id (see bank.py), not by position, so the rows of
+# a question stay its own when a reload of the bank inserts, reorders or
+# removes questions; the dashboard maps ids to the current bank and
+# leaves out questions it no longer has.
+#
+# Their size depends on the question bank, not on the number of answers.
+# ROLLUP_VERSION is kept in the database (PRAGMA user_version); rollups
+# written by an older version are dropped and rebuilt from the raw events
+# once. Answers logged before events carried question ids cannot be
+# attributed to a question and only count in the funnel.
+# --------------------------------------------------
+
+ROLLUP_VERSION = 3
+ROLLUPS = ("question_stats", "option_stats", "funnel")
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS question_stats ("
+    " scenario TEXT NOT NULL, floor INTEGER NOT NULL, question TEXT NOT NULL,"
+    " answers INTEGER NOT NULL, correct INTEGER NOT NULL, think_ms INTEGER NOT NULL,"
+    " PRIMARY KEY (scenario, floor, question))",
+    "CREATE TABLE IF NOT EXISTS option_stats ("
+    " scenario TEXT NOT NULL, floor INTEGER NOT NULL, question TEXT NOT NULL, option INTEGER NOT NULL,"
+    " picks INTEGER NOT NULL,"
+    " PRIMARY KEY (scenario, floor, question, option))",
+    "CREATE TABLE IF NOT EXISTS funnel ("
+    " scenario TEXT NOT NULL, step INTEGER NOT NULL, runs INTEGER NOT NULL,"
+    " PRIMARY KEY (scenario, step))",
+)
+
+
+def ensure_schema(conn):
+    # called once per connection by the event log's SQLite sink; history
+    # written before the rollups existed is folded in on first use
+    outdated = conn.execute("PRAGMA user_version").fetchone()[0] < ROLLUP_VERSION
+    with conn:
+        if outdated:
+            # the tables' keys may have changed: recreate them
+            for table in ROLLUPS:
+                conn.execute(f"DROP TABLE IF EXISTS {table}")
+        for statement in SCHEMA:
+            conn.execute(statement)
+    if outdated:
+        if conn.execute("SELECT 1 FROM events LIMIT 1").fetchone():
+            rebuild(conn)
+        conn.execute(f"PRAGMA user_version = {ROLLUP_VERSION}")
+
+
+def apply(conn, batch):
+    # fold a batch of events into the rollups; the caller owns the transaction
+    questions = Counter()
+    correct = Counter()
+    think_ms = Counter()
+    options = Counter()
+    funnel = Counter()
+    for e in batch:
+        kind = e["kind"]
+        if kind == "answer" or kind == "timeout":
+            q = (e["scenario"], e["floor"], e["question"])
+            questions[q] += 1
+            think_ms[q] += e["think_ms"] or 0
+            if kind == "answer":
+                options[q + (e["option"],)] += 1
+            if e["correct"]:
+                correct[q] += 1
+                funnel[(e["scenario"], e["floor"] + 1)] += 1
+        elif kind == "start":
+            funnel[(e["scenario"], 0)] += 1
+
+    conn.executemany(
+        "INSERT INTO question_stats VALUES (?, ?, ?, ?, ?, ?)"
+        " ON CONFLICT (scenario, floor, question) DO UPDATE SET answers = answers + excluded.answers,"
+        " correct = correct + excluded.correct, think_ms = think_ms + excluded.think_ms",
+        [q + (n, correct[q], think_ms[q]) for q, n in questions.items()],
+    )
+    conn.executemany(
+        "INSERT INTO option_stats VALUES (?, ?, ?, ?, ?)"
+        " ON CONFLICT (scenario, floor, question, option) DO UPDATE SET picks = picks + excluded.picks",
+        [k + (n,) for k, n in options.items()],
+    )
+    conn.executemany(
+        "INSERT INTO funnel VALUES (?, ?, ?)"
+        " ON CONFLICT (scenario, step) DO UPDATE SET runs = runs + excluded.runs",
+        [k + (n,) for k, n in funnel.items()],
+    )
+
+
+def rebuild(conn):
+    # recompute every rollup from the raw events (one full scan)
+    with conn:
+        for table in ROLLUPS:
+            conn.execute(f"DELETE FROM {table}")
+        conn.execute(
+            "INSERT INTO question_stats"
+            " SELECT scenario, floor, question, COUNT(*), SUM(correct), COALESCE(SUM(think_ms), 0)"
+            " FROM events WHERE kind IN ('answer', 'timeout') AND question IS NOT NULL"
+            " GROUP BY scenario, floor, question"
+        )
+        conn.execute(
+            "INSERT INTO option_stats"
+            " SELECT scenario, floor, question, option, COUNT(*)"
+            " FROM events WHERE kind = 'answer' AND question IS NOT NULL"
+            " GROUP BY scenario, floor, question, option"
+        )
+        conn.execute(
+            "INSERT INTO funnel"
+            " SELECT scenario, step, COUNT(*) FROM ("
+            "  SELECT scenario, 0 AS step FROM events WHERE kind = 'start'"
+            "  UNION ALL"
+            "  SELECT scenario, floor + 1 FROM events WHERE kind = 'answer' AND correct"
+            " ) GROUP BY scenario, step"
+        )
+
+
+# --------------------------------------------------
+# DASHBOARD QUERIES (pandas is only imported here)
+# --------------------------------------------------
+
+def question_report(conn, scenario):
+    import pandas as pd
+
+    df = pd.read_sql_query(
+        "SELECT floor, question, answers, correct, think_ms FROM question_stats"
+        " WHERE scenario = ? ORDER BY floor, question",
+        conn,
+        params=(scenario,),
+    )
+    df["correct_rate"] = df["correct"] / df["answers"]
+    df["avg_think_s"] = df["think_ms"] / df["answers"] / 1000
+    return df.drop(columns="think_ms")
+
+
+def floor_report(conn, scenario):
+    import pandas as pd
+
+    df = pd.read_sql_query(
+        "SELECT floor, SUM(answers) AS answers, SUM(answers - correct) AS crashes"
+        " FROM question_stats WHERE scenario = ? GROUP BY floor ORDER BY floor",
+        conn,
+        params=(scenario,),
+    )
+    df["crash_rate"] = df["crashes"] / df["answers"]
+    return df
+
+
+def option_report(conn, scenario):
+    import pandas as pd
+
+    df = pd.read_sql_query(
+        "SELECT floor, question, option, picks FROM option_stats"
+        " WHERE scenario = ? ORDER BY floor, question, option",
+        conn,
+        params=(scenario,),
+    )
+    df["share"] = df["picks"] / df.groupby(["floor", "question"])["picks"].transform("sum")
+    return df
+
+
+def funnel_report(conn, scenario):
+    import pandas as pd
+
+    return pd.read_sql_query(
+        "SELECT step, runs FROM funnel WHERE scenario = ? ORDER BY step",
+        conn,
+        params=(scenario,),
+    )
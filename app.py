@@ -1,5 +1,22 @@
+import math
+import time
+import uuid
+
 import streamlit as st
-import random
+
+from catalog import paginate
+from classroom import POLL_SECONDS, RoomFull
+from instrument import begin_rerun, span, timed
+from locales import DEFAULT_LOCALE, language_name
+from resources import (
+    get_bank_watcher,
+    get_classroom_hub,
+    get_deck_store,
+    get_leaderboard,
+    get_resume_codec,
+    get_session_store,
+)
+from review import Deck
 
 # --------------------------------------------------
 # PAGE CONFIG
@@ -11,868 +28,464 @@ st.set_page_config(
 )
 
 # --------------------------------------------------
-# LAYERS (FLOORS OF THE TOWER)
-# --------------------------------------------------
-LAYERS = [
-    {"key": "networking", "name": "Networking",
-     "description": "How users and systems connect to your app over networks and the internet."},
-    {"key": "servers", "name": "Servers",
-     "description": "The physical machines that provide CPU, RAM, and disk for your workloads."},
-    {"key": "virtualization", "name": "Virtualization",
-     "description": "VMs/containers that let you run many logical machines on one physical server."},
-    {"key": "os", "name": "Operating System (OS)",
-     "description": "System software like Linux/Windows that runs on servers and hosts your apps."},
-    {"key": "runtime", "name": "Runtime",
-     "description": "Language/platform environment like Python, Java, Node.js where your code runs."},
-    {"key": "middleware", "name": "Middleware",
-     "description": "APIs, queues, gateways, and messaging that connect app components."},
-    {"key": "data", "name": "Data Layer",
-     "description": "Databases and data models that store and manage structured information."},
-    {"key": "storage", "name": "Storage",
-     "description": "File/object storage for large files, backups, and unstructured data."},
-    {"key": "apps", "name": "Application Layer",
-     "description": "How your app is structured: monolith, microservices, or serverless."},
-]
-
-# --------------------------------------------------
-# SCENARIOS (CHAPTERS)
+# QUESTION BANK
+# LAYERS (floors of the tower) and the scenario index are loaded from
+# data/index.json once per bank snapshot. A scenario's questions are read
+# from data/scenarios/<key>.json the first time anyone picks it. Every
+# rerun reuses the same frozen objects, so no content is parsed or
+# rebuilt on a click.
 # Each scenario has a list "questions" of length 9 (one per layer),
 # and each element is a *list* of question dicts. We will pick one
 # at random per floor.
 # Each question has:
-#   prompt, options (list), correct (index), ex_correct, ex_wrong
+#   id, prompt, options (list), correct (index), ex_correct, ex_wrong
+# The files are watched and a new snapshot is swapped in when they
+# change (see snapshots.py). Each session is pinned to a snapshot
+# (st.session_state.bank): a run is played on the snapshot it started
+# on, and the session moves to the current one when it is back on the
+# home page or the scenario list, or starting a run of a scenario the
+# current snapshot still has.
+# LAYERS, SCENARIOS and everything built on them are in the player's
+# language (see locales.py): the one picked in the sidebar, else ?lang=,
+# else the browser's, else English.
 # --------------------------------------------------
 
-SCENARIOS = {
-    "social": {
-        "title": "Viral Social App",
-        "avatar": "🧑‍💻",
-        "tagline": "Unpredictable traffic, global users, fast growth.",
-        "intro": (
-            "You’re building a **social media app** that could go viral any day.\n"
-            "Your main challenges are **unpredictable traffic**, **global reach**, and **keeping costs sane**."
-        ),
-        "questions": [
-            # 0 NETWORKING – list of questions
-            [
-                {
-                    "prompt": "Networking: how should users connect globally to your app?",
-                    "options": [
-                        "One small on-prem network in a single city, no extra optimization.",
-                        "Cloud virtual networks (VPC-like) plus a CDN/edge layer for static content.",
-                        "Ask every user to VPN into your office network before using the app.",
-                        "Run everything on localhost; only you can access it.",
-                        "Let ISPs randomly route traffic without any planning.",
-                    ],
-                    "correct": 1,
-                    "ex_correct": (
-                        "✅ Good choice for a viral social app.\n\n"
-                        "- Cloud virtual networks let you define secure subnets in software\n"
-                        "- A CDN/edge layer brings content closer to users worldwide\n"
-                        "- Latency goes down, and you still control routing & firewall rules"
-                    ),
-                    "ex_wrong": (
-                        "💥 **App feels slow and unreliable.**\n\n"
-                        "With a single on-prem network or forced VPN, global users get high latency "
-                        "and friction. Cloud networking + CDNs are key to serving the world."
-                    ),
-                },
-                {
-                    "prompt": "Networking: what should expose your app to the internet?",
-                    "options": [
-                        "Expose each database server directly to the internet.",
-                        "Use a load balancer in front of stateless app instances.",
-                        "Let users SSH into app servers and run code manually.",
-                        "Use a random IP that changes every hour.",
-                        "Only serve traffic on an internal private IP.",
-                    ],
-                    "correct": 1,
-                    "ex_correct": (
-                        "✅ A load balancer in front of stateless app instances is ideal.\n\n"
-                        "- It distributes traffic automatically\n"
-                        "- You can add/remove instances behind it\n"
-                        "- It fits perfectly with cloud auto-scaling"
-                    ),
-                    "ex_wrong": (
-                        "💥 **Users can't reliably reach your app, or it's insecure.**\n\n"
-                        "Exposing DBs, SSH, or random IPs to the world is not how modern apps are fronted."
-                    ),
-                },
-            ],
-            # 1 SERVERS
-            [
-                {
-                    "prompt": "Servers: how will you handle compute capacity for unpredictable load?",
-                    "options": [
-                        "Buy fixed on-prem servers sized for peak traffic, even if often idle.",
-                        "Use cloud VMs with auto-scaling based on CPU/requests.",
-                        "Run everything on your personal laptop 24/7.",
-                        "Put the app on a single shared hosting plan with no scaling.",
-                        "Run one tiny VM and just pray it holds.",
-                    ],
-                    "correct": 1,
-                    "ex_correct": (
-                        "✅ Auto-scaling cloud servers are ideal here.\n\n"
-                        "- Avoid huge upfront hardware costs\n"
-                        "- Capacity grows/shrinks with actual traffic\n"
-                        "- Demonstrates cloud **elasticity** and **pay-as-you-go**"
-                    ),
-                    "ex_wrong": (
-                        "💥 **App crashed or wasted a lot of money.**\n\n"
-                        "Fixed on-prem or tiny static servers either can't handle spikes or stay idle most of the time."
-                    ),
-                },
-                {
-                    "prompt": "Servers: how do you keep instances healthy?",
-                    "options": [
-                        "Never monitor anything; wait for Twitter complaints.",
-                        "Use health checks and replace failed instances automatically.",
-                        "Turn servers off at random times to “test resilience”.",
-                        "Run everything as root with no logs.",
-                        "Keep only one instance; backups are unnecessary.",
-                    ],
-                    "correct": 1,
-                    "ex_correct": (
-                        "✅ Health checks + automatic replacement is cloud-native thinking.\n\n"
-                        "- Failing instances are removed\n"
-                        "- New instances join the pool\n"
-                        "- Your app stays up even when individual VMs die"
-                    ),
-                    "ex_wrong": (
-                        "💥 **Silent failures killed your app.**\n\n"
-                        "Without monitoring and health checks, you don't know what's broken until users scream."
-                    ),
-                },
-            ],
-            # 2 VIRTUALIZATION
-            [
-                {
-                    "prompt": "Virtualization: how should you organize services on servers?",
-                    "options": [
-                        "Run all services in a single process on a single server.",
-                        "Use containers/VMs to isolate services and deploy independently.",
-                        "Run everything in a browser tab on your laptop.",
-                        "Give every developer SSH root access to prod.",
-                        "Put prod and local dev in the same container.",
-                    ],
-                    "correct": 1,
-                    "ex_correct": (
-                        "✅ Containers/VMs give you isolation and easier deployments.\n\n"
-                        "- One misbehaving service won't kill everything\n"
-                        "- Each service can scale separately\n"
-                        "- This is the **virtualization** layer doing its job"
-                    ),
-                    "ex_wrong": (
-                        "💥 **One bug took down the whole system.**\n\n"
-                        "Without isolation, it's too easy for one process to hog resources or crash everything."
-                    ),
-                },
-                {
-                    "prompt": "Virtualization: how do you scale microservices?",
-                    "options": [
-                        "Run multiple container instances behind a load balancer.",
-                        "Run one giant container with every service inside it.",
-                        "Run each service on a random home router.",
-                        "Avoid microservices; put logic into cron jobs only.",
-                        "Use physical servers only, no VMs/containers.",
-                    ],
-                    "correct": 0,
-                    "ex_correct": (
-                        "✅ Multiple container instances behind a load balancer is a microservice classic.\n\n"
-                        "- Each service can scale horizontally\n"
-                        "- Failures affect only that service's instances\n"
-                        "- This maximizes the benefit of virtualization"
-                    ),
-                    "ex_wrong": (
-                        "💥 **Scaling and isolation broke down.**\n\n"
-                        "Packing everything into one big container or random hosts defeats the purpose of microservices."
-                    ),
-                },
-            ],
-            # 3 OS
-            [
-                {
-                    "prompt": "OS: how should OS updates be handled?",
-                    "options": [
-                        "Never patch OS; downtime is worse than vulnerabilities.",
-                        "Use golden images + automatic patching/rollout.\n",
-                        "Let each developer log into prod and update OS whenever they want.",
-                        "Use 10 different OS versions to “increase diversity”.",
-                        "Run beta OS versions only in production.",
-                    ],
-                    "correct": 1,
-                    "ex_correct": (
-                        "✅ Golden images + automated patching keep systems secure and consistent.\n\n"
-                        "That's how cloud users keep the **OS layer** healthy at scale."
-                    ),
-                    "ex_wrong": (
-                        "💥 **Security holes or inconsistent behavior.**\n\n"
-                        "Random or no patching at the OS level is dangerous and unpredictable."
-                    ),
-                },
-                {
-                    "prompt": "OS: where should app logs go?",
-                    "options": [
-                        "Throw them away to keep disks empty.",
-                        "Send them to a centralized logging service from each OS instance.",
-                        "Store logs only in /tmp and delete on reboot.",
-                        "Write logs to a file with no rotation until disk is full.",
-                        "Print logs on paper and archive them in a box.",
-                    ],
-                    "correct": 1,
-                    "ex_correct": (
-                        "✅ Centralized logging from OS instances is best.\n\n"
-                        "- Helps debugging and monitoring\n"
-                        "- Works well with auto-scaling instances that come and go"
-                    ),
-                    "ex_wrong": (
-                        "💥 **No useful logs when things broke.**\n\n"
-                        "Without proper log handling, production issues are painful to debug."
-                    ),
-                },
-            ],
-            # 4 RUNTIME
-            [
-                {
-                    "prompt": "Runtime: how will you manage language runtimes for your app?",
-                    "options": [
-                        "Let every server have a slightly different runtime version.",
-                        "Use container images or managed runtimes with pinned versions.",
-                        "Run random nightly builds of runtimes directly in prod.",
-                        "Compile everything with unknown flags and hope.",
-                        "Change runtime versions in prod before testing.",
-                    ],
-                    "correct": 1,
-                    "ex_correct": (
-                        "✅ Containers/managed runtimes with pinned versions keep behavior consistent.\n\n"
-                        "This is the **runtime** layer being controlled instead of chaotic."
-                    ),
-                    "ex_wrong": (
-                        "💥 **Different behavior on different servers.**\n\n"
-                        "Uncontrolled runtimes cause 'works on my machine' in production too."
-                    ),
-                },
-                {
-                    "prompt": "Runtime: how do you scale your stateless web runtime?",
-                    "options": [
-                        "Add more identical runtime instances behind a load balancer.",
-                        "Scale by SSHing into the same instance and starting random background processes.",
-                        "Run all requests through a single-threaded runtime instance.",
-                        "Turn off runtime instances during peak to save money.",
-                        "Run each request as a separate full VM boot.",
-                    ],
-                    "correct": 0,
-                    "ex_correct": (
-                        "✅ Stateless runtimes scale by adding more instances.\n\n"
-                        "Cloud makes it easy to add/remove runtime containers or functions under load."
-                    ),
-                    "ex_wrong": (
-                        "💥 **Runtime couldn't handle the load.**\n\n"
-                        "Relying on a single process or manual hacks doesn't scale."
-                    ),
-                },
-            ],
-            # 5 MIDDLEWARE
-            [
-                {
-                    "prompt": "Middleware: how should services communicate?",
-                    "options": [
-                        "Direct synchronous calls only; if one fails, everything fails.",
-                        "Use APIs + message queues/streams to decouple services.",
-                        "Send commands via email between teams.",
-                        "Write commands into a shared spreadsheet.",
-                        "Let services poll random URLs without contracts.",
-                    ],
-                    "correct": 1,
-                    "ex_correct": (
-                        "✅ APIs + queues/streams give you reliability and decoupling.\n\n"
-                        "This is the **middleware** layer absorbing spikes and failures."
-                    ),
-                    "ex_wrong": (
-                        "💥 **Cascade failure:** one slow service blocked everything.\n\n"
-                        "No middleware or very ad-hoc integration makes failures contagious."
-                    ),
-                },
-                {
-                    "prompt": "Middleware: how do you process spikes of notifications?",
-                    "options": [
-                        "Drop half the notifications to keep servers alive.",
-                        "Push all messages into a queue and let workers consume at their own pace.",
-                        "Block the user request until all notifications are sent.",
-                        "Store messages in a local text file and hope it doesn't corrupt.",
-                        "Send everything through a single, fragile cron job.",
-                    ],
-                    "correct": 1,
-                    "ex_correct": (
-                        "✅ Queues let you handle spikes smoothly.\n\n"
-                        "Workers consume messages without blocking the main user path."
-                    ),
-                    "ex_wrong": (
-                        "💥 **Notification system overloaded user requests.**\n\n"
-                        "Directly tying user requests to heavy processing causes timeouts."
-                    ),
-                },
-            ],
-            # 6 DATA
-            [
-                {
-                    "prompt": "Data: how do you store user profiles and relationships?",
-                    "options": [
-                        "A single on-prem DB with no replication or backups.",
-                        "A managed DB with replication and automated backups.",
-                        "Only CSV files on disk, updated manually.",
-                        "One big JSON file shared over email.",
-                        "Flat text logs that you parse manually.",
-                    ],
-                    "correct": 1,
-                    "ex_correct": (
-                        "✅ Managed databases fit this well.\n\n"
-                        "- Replication and backups are built in\n"
-                        "- You still design schema & queries at the **data** layer"
-                    ),
-                    "ex_wrong": (
-                        "💥 **Data loss or slow queries.**\n\n"
-                        "Ad-hoc data storage can't handle a real social network."
-                    ),
-                },
-                {
-                    "prompt": "Data: how should you handle analytics queries?",
-                    "options": [
-                        "Run expensive analytics directly on the production OLTP DB.",
-                        "Export data to a separate analytics store or warehouse.",
-                        "Ask interns to manually read logs and count.",
-                        "Never look at analytics; just guess.",
-                        "Use only last 10 users as sample data.",
-                    ],
-                    "correct": 1,
-                    "ex_correct": (
-                        "✅ Splitting OLTP (live app DB) from analytics is smart.\n\n"
-                        "Analytics have their own data layer tuned for heavy reads."
-                    ),
-                    "ex_wrong": (
-                        "💥 **Analytics queries slowed down the app.**\n\n"
-                        "Heavy reads on the main DB hurt real-time user traffic."
-                    ),
-                },
-            ],
-            # 7 STORAGE
-            [
-                {
-                    "prompt": "Storage: where should photos & videos live?",
-                    "options": [
-                        "Local disk of a single VM.",
-                        "Cloud object storage designed for large files.",
-                        "Inside the main relational DB as huge BLOBs.",
-                        "In a zip file emailed to yourself daily.",
-                        "On a random USB drive plugged into a server.",
-                    ],
-                    "correct": 1,
-                    "ex_correct": (
-                        "✅ Cloud object storage is perfect for media.\n\n"
-                        "Huge scale, high durability, pay-as-you-go → ideal **storage** layer choice."
-                    ),
-                    "ex_wrong": (
-                        "💥 **Storage filled or became unreliable.**\n\n"
-                        "Single disks or DB BLOBs don't scale for massive media."
-                    ),
-                },
-                {
-                    "prompt": "Storage: how do you handle user content lifecycle?",
-                    "options": [
-                        "Keep everything forever in the hottest storage tier.",
-                        "Use lifecycle rules to move older content to cheaper tiers.",
-                        "Manually delete random files when disks are full.",
-                        "Zip everything once a year and delete originals.",
-                        "Trust that users will delete content themselves.",
-                    ],
-                    "correct": 1,
-                    "ex_correct": (
-                        "✅ Lifecycle rules control cost over time.\n\n"
-                        "Older/rarely used data can move to colder storage automatically."
-                    ),
-                    "ex_wrong": (
-                        "💥 **Storage costs exploded.**\n\n"
-                        "Ignoring lifecycle means paying top-tier prices for rarely used data."
-                    ),
-                },
-            ],
-            # 8 APPS
-            [
-                {
-                    "prompt": "Apps: how should the social app be structured?",
-                    "options": [
-                        "One huge monolith on a single server.",
-                        "A set of services that can scale and deploy independently.",
-                        "A cron job that emails users a static page once a day.",
-                        "A script you run manually from your laptop.",
-                        "A desktop app only you install.",
-                    ],
-                    "correct": 1,
-                    "ex_correct": (
-                        "✅ Services/functions that scale independently are ideal.\n\n"
-                        "This is the **application** layer using the power of cloud under it."
-                    ),
-                    "ex_wrong": (
-                        "💥 **Single point of failure at the app layer.**\n\n"
-                        "A fragile monolith or manual scripts can't handle viral growth."
-                    ),
-                },
-                {
-                    "prompt": "Apps: how do you roll out new versions safely?",
-                    "options": [
-                        "Deploy directly to all servers at once, no rollback.",
-                        "Use rolling or blue/green deployments with health checks.",
-                        "Change production code manually with a text editor.",
-                        "Deploy to random servers at random times.",
-                        "Wait until Friday night and deploy everything then.",
-                    ],
-                    "correct": 1,
-                    "ex_correct": (
-                        "✅ Rolling/blue-green deployments protect availability.\n\n"
-                        "The app layer evolves safely while cloud infra handles routing."
-                    ),
-                    "ex_wrong": (
-                        "💥 **Bad deployment took the whole app down.**\n\n"
-                        "No rollout strategy means high risk with every change."
-                    ),
-                },
-            ],
-        ],
-    },
-    "bank": {
-        "title": "Secure Banking Portal",
-        "avatar": "👩‍💼",
-        "tagline": "High security, strict regulations, and zero tolerance for leaks.",
-        "intro": (
-            "You’re designing an **online banking portal**.\n"
-            "Your main challenges are **security**, **compliance**, and **reliability**."
-        ),
-        "questions": [
-            # 0 NETWORKING
-            [
-                {
-                    "prompt": "Networking: how should users and branches connect?",
-                    "options": [
-                        "Secure private networking (VPN/private links, private subnets, firewalls).",
-                        "Expose all databases directly to the public internet.",
-                        "Use only HTTP with no TLS encryption.",
-                        "Allow access from any IP with no restrictions.",
-                        "Connect via open Wi-Fi hotspots only.",
-                    ],
-                    "correct": 0,
-                    "ex_correct": (
-                        "✅ Banking needs **private, encrypted networking**.\n\n"
-                        "VPNs/private links + private subnets keep traffic protected."
-                    ),
-                    "ex_wrong": (
-                        "💥 **Traffic could be intercepted or exposed.**\n\n"
-                        "Public exposure or no encryption is unacceptable for financial data."
-                    ),
-                },
-                {
-                    "prompt": "Networking: what should be publicly reachable?",
-                    "options": [
-                        "Only the web front-end through a secure gateway.",
-                        "Every internal admin API and database endpoint.",
-                        "SSH on all servers with password 'bank123'.",
-                        "Core transaction systems directly on the internet.",
-                        "Nothing at all; even customers cannot reach it.",
-                    ],
-                    "correct": 0,
-                    "ex_correct": (
-                        "✅ Only the web/app front-end should be public.\n\n"
-                        "All sensitive internals stay behind secure gateways and networks."
-                    ),
-                    "ex_wrong": (
-                        "💥 **Attack surface too big.**\n\n"
-                        "Exposing internals (DBs/admin APIs) makes breaches much easier."
-                    ),
-                },
-            ],
-            # 1 SERVERS
-            [
-                {
-                    "prompt": "Servers: where do core banking systems run?",
-                    "options": [
-                        "On dedicated, well-governed servers (on-prem or dedicated cloud).",
-                        "On random employee laptops.",
-                        "Only on free trial cloud instances that can disappear anytime.",
-                        "On old end-of-life hardware with no support.",
-                        "On IoT light bulbs in the office.",
-                    ],
-                    "correct": 0,
-                    "ex_correct": (
-                        "✅ Core banking workloads need controlled, auditable servers.\n\n"
-                        "This is the **server** layer under strong governance."
-                    ),
-                    "ex_wrong": (
-                        "💥 **Unreliable or non-compliant compute.**\n\n"
-                        "Critical systems can't run on random/unmanaged machines."
-                    ),
-                },
-                {
-                    "prompt": "Servers: how do you ensure high availability?",
-                    "options": [
-                        "Use multiple servers across availability zones/data centers.",
-                        "Run everything on one big server in a broom closet.",
-                        "Accept that downtime is normal in banking.",
-                        "Turn servers off at night to save power.",
-                        "Run hot workload on a backup server only.",
-                    ],
-                    "correct": 0,
-                    "ex_correct": (
-                        "✅ Redundancy across zones/locations is essential.\n\n"
-                        "Server failures shouldn't bring down banking services."
-                    ),
-                    "ex_wrong": (
-                        "💥 **Single server failure caused outage.**\n\n"
-                        "No redundancy at the server layer is a major risk."
-                    ),
-                },
-            ],
-            # 2 VIRTUALIZATION
-            [
-                {
-                    "prompt": "Virtualization: how should banking services be isolated?",
-                    "options": [
-                        "Separate VMs/containers with strict policies and segmentation.",
-                        "All services in one OS instance, same user, same folder.",
-                        "Test and prod share the exact same container and DB.",
-                        "Run services on public shared hosting for cheaper price.",
-                        "Let vendors install random software on prod directly.",
-                    ],
-                    "correct": 0,
-                    "ex_correct": (
-                        "✅ Isolation reduces blast radius.\n\n"
-                        "VMs/containers with segmentation protect other systems if one is compromised."
-                    ),
-                    "ex_wrong": (
-                        "💥 **One compromised service exposed others.**\n\n"
-                        "No isolation at the virtualization layer is a big security gap."
-                    ),
-                },
-                {
-                    "prompt": "Virtualization: how do you separate environments?",
-                    "options": [
-                        "Use different accounts/VM groups for dev, test, and prod.",
-                        "Use the same VM for dev and prod to save money.",
-                        "Let developers SSH into prod and change things directly.",
-                        "Share credentials between all environments.",
-                        "Allow test data and prod data to mix.",
-                    ],
-                    "correct": 0,
-                    "ex_correct": (
-                        "✅ Environment separation is key.\n\n"
-                        "Virtualization and accounts help isolate dev/test from prod."
-                    ),
-                    "ex_wrong": (
-                        "💥 **Test or dev changes impacted prod.**\n\n"
-                        "Lack of separation at the virtualization/account level is dangerous."
-                    ),
-                },
-            ],
-            # 3 OS
-            [
-                {
-                    "prompt": "OS: how should operating systems be managed?",
-                    "options": [
-                        "Use hardened, standard images with regular, audited patching.",
-                        "Allow each team to pick any OS and version for prod.",
-                        "Never patch OS to avoid reboots.",
-                        "Use unsupported OS versions forever.",
-                        "Use beta OS builds on core banking servers.",
-                    ],
-                    "correct": 0,
-                    "ex_correct": (
-                        "✅ Hardened, consistently patched OS images are mandatory.\n\n"
-                        "The **OS layer** is a critical security boundary."
-                    ),
-                    "ex_wrong": (
-                        "💥 **OS vulnerabilities opened the door to attackers.**\n\n"
-                        "Inconsistent or unpatched OSes fail audits and increase breach risk."
-                    ),
-                },
-                {
-                    "prompt": "OS: how do you manage admin access?",
-                    "options": [
-                        "Use least privilege, audited access, and just-in-time elevation.",
-                        "Share a single root password with everyone.",
-                        "Allow passwordless SSH from any device.",
-                        "Never log admin actions to keep logs small.",
-                        "Use 'admin/admin' as credentials for convenience.",
-                    ],
-                    "correct": 0,
-                    "ex_correct": (
-                        "✅ Controlled, auditable admin access is crucial.\n\n"
-                        "OS-level admin is powerful, so it must be tightly managed."
-                    ),
-                    "ex_wrong": (
-                        "💥 **Untracked admin changes violated policy.**\n\n"
-                        "Poor OS-level access control is a major compliance issue."
-                    ),
-                },
-            ],
-            # 4 RUNTIME
-            [
-                {
-                    "prompt": "Runtime: which policy fits banking apps?",
-                    "options": [
-                        "Approved, supported runtimes with controlled upgrades.",
-                        "Any developer can run any runtime in prod.",
-                        "Use experimental runtime builds straight from nightly.",
-                        "Mix random runtime versions across servers.",
-                        "Never update runtimes after first release.",
-                    ],
-                    "correct": 0,
-                    "ex_correct": (
-                        "✅ Runtime governance keeps behavior predictable and secure.\n\n"
-                        "This is control at the **runtime** layer."
-                    ),
-                    "ex_wrong": (
-                        "💥 **Runtime vulnerabilities or mismatches occurred.**\n\n"
-                        "Uncontrolled runtimes are risky for banking workloads."
-                    ),
-                },
-                {
-                    "prompt": "Runtime: how do you handle config for runtimes?",
-                    "options": [
-                        "Use version-controlled config and secrets management.",
-                        "Hard-code secrets directly into application code.",
-                        "Store config only in environment variables on random servers.",
-                        "Let each server have a different config with no record.",
-                        "Ask devs to remember secrets in their heads.",
-                    ],
-                    "correct": 0,
-                    "ex_correct": (
-                        "✅ Version-controlled config + secret management is safe.\n\n"
-                        "Runtime behavior stays consistent and auditable."
-                    ),
-                    "ex_wrong": (
-                        "💥 **Misconfig or leaked secrets.**\n\n"
-                        "Poor handling at the runtime/config layer leads to outages or leaks."
-                    ),
-                },
-            ],
-            # 5 MIDDLEWARE
-            [
-                {
-                    "prompt": "Middleware: how do core banking services talk?",
-                    "options": [
-                        "Secure API gateway + message bus with auth and logging.",
-                        "Every app directly queries every DB without rules.",
-                        "Pass spreadsheets around by email.",
-                        "Use shared file folders with no permissions.",
-                        "Let services call each other over unauthenticated HTTP.",
-                    ],
-                    "correct": 0,
-                    "ex_correct": (
-                        "✅ Middleware (API gateway, message bus) is the control point.\n\n"
-                        "It enforces auth, auditing, and reliability."
-                    ),
-                    "ex_wrong": (
-                        "💥 **Uncontrolled service-to-service calls.**\n\n"
-                        "No central middleware means poor visibility and messy security."
-                    ),
-                },
-                {
-                    "prompt": "Middleware: how do you handle long-running operations (e.g. batch interest calc)?",
-                    "options": [
-                        "Queue work and process asynchronously with workers.",
-                        "Run everything synchronously in the web request.",
-                        "Ask users to refresh the page repeatedly.",
-                        "Let operations run only on dev's laptop.",
-                        "Run jobs randomly without tracking them.",
-                    ],
-                    "correct": 0,
-                    "ex_correct": (
-                        "✅ Queues + workers keep web requests fast and auditable.\n\n"
-                        "Middleware absorbs heavy workloads."
-                    ),
-                    "ex_wrong": (
-                        "💥 **Banking portal felt slow and unstable.**\n\n"
-                        "Long-running jobs in user requests hurt UX and stability."
-                    ),
-                },
-            ],
-            # 6 DATA
-            [
-                {
-                    "prompt": "Data: where should customer balances and transactions live?",
-                    "options": [
-                        "A well-controlled primary DB (on-prem/private/regulated cloud) with encrypted backups.",
-                        "A public, world-readable cloud bucket.",
-                        "Random spreadsheets on analysts' desktops.",
-                        "A shared network folder with no permissions.",
-                        "On memory sticks mailed between branches.",
-                    ],
-                    "correct": 0,
-                    "ex_correct": (
-                        "✅ Controlled DB + encrypted backups is the right pattern.\n\n"
-                        "The **data** layer must meet strong confidentiality and integrity requirements."
-                    ),
-                    "ex_wrong": (
-                        "💥 **Data breach or loss.**\n\n"
-                        "Improper data storage breaks compliance and trust."
-                    ),
-                },
-                {
-                    "prompt": "Data: how do you enforce data access rules?",
-                    "options": [
-                        "Use role-based access control at DB and app layers.",
-                        "Give every employee full access to all tables.",
-                        "Let apps connect as a single superuser account.",
-                        "No access rules; rely on honor system.",
-                        "Share DB passwords over chat.",
-                    ],
-                    "correct": 0,
-                    "ex_correct": (
-                        "✅ RBAC across data + app layers is essential.\n\n"
-                        "Data layer access is audited and controlled."
-                    ),
-                    "ex_wrong": (
-                        "💥 **Too much access caused a policy violation.**\n\n"
-                        "Weak data access controls are a major risk."
-                    ),
-                },
-            ],
-            # 7 STORAGE
-            [
-                {
-                    "prompt": "Storage: how to store statements & documents?",
-                    "options": [
-                        "Encrypted, access-controlled storage with retention policies.",
-                        "Public file sharing site with open links.",
-                        "Printed papers stacked in an unlocked room.",
-                        "Unencrypted files on a shared USB drive.",
-                        "Temporary folders that get wiped unexpectedly.",
-                    ],
-                    "correct": 0,
-                    "ex_correct": (
-                        "✅ Secure storage with retention meets audit needs.\n\n"
-                        "The **storage** layer enforces confidentiality & lifecycle."
-                    ),
-                    "ex_wrong": (
-                        "💥 **Documents leaked or lost.**\n\n"
-                        "Improper storage is a serious compliance failure."
-                    ),
-                },
-                {
-                    "prompt": "Storage: how do you keep logs for audits?",
-                    "options": [
-                        "Store logs in write-once storage with proper retention and access control.",
-                        "Delete logs daily to save space.",
-                        "Let logs roll over immediately with no backups.",
-                        "Keep logs only on local disks with no replication.",
-                        "Never log anything; too noisy.",
-                    ],
-                    "correct": 0,
-                    "ex_correct": (
-                        "✅ Immutable/controlled log storage is key for audits.\n\n"
-                        "Storage layer can protect log integrity over time."
-                    ),
-                    "ex_wrong": (
-                        "💥 **Insufficient logs during investigation.**\n\n"
-                        "Poor log storage makes it hard to prove what happened."
-                    ),
-                },
-            ],
-            # 8 APPS
-            [
-                {
-                    "prompt": "Apps: how should you structure the banking portal?",
-                    "options": [
-                        "Well-structured app with clear layers and strong auth/authz.",
-                        "Random scripts deployed directly to prod with shared admin password.",
-                        "One UI showing admin and customer views with no separation.",
-                        "Allow URL guessing to access any account.",
-                        "No login; everything is public.",
-                    ],
-                    "correct": 0,
-                    "ex_correct": (
-                        "✅ App layer must enforce business rules & security.\n\n"
-                        "Good design at the top of the stack is as important as lower layers."
-                    ),
-                    "ex_wrong": (
-                        "💥 **Critical access control failure.**\n\n"
-                        "Bad app-layer design negates protections in all lower layers."
-                    ),
-                },
-                {
-                    "prompt": "Apps: how do you handle user sessions?",
-                    "options": [
-                        "Use secure session management with timeouts and regeneration.",
-                        "Store session IDs in URLs forever.",
-                        "Use the same session for all users.",
-                        "Never expire sessions.",
-                        "Let users reuse old session tokens after logout.",
-                    ],
-                    "correct": 0,
-                    "ex_correct": (
-                        "✅ Proper session management is non-negotiable.\n\n"
-                        "The app layer has to protect user accounts."
-                    ),
-                    "ex_wrong": (
-                        "💥 **Session hijacking risk.**\n\n"
-                        "Weak session handling exposes customer accounts."
-                    ),
-                },
-            ],
-        ],
-    },
-}
+BANKS = get_bank_watcher()
+RESUME = get_resume_codec()
+SESSIONS = get_session_store()
 
 # --------------------------------------------------
 # SESSION STATE INITIALIZATION
+# All game state lives in one GameState object; the screens below only
+# render it and call ENGINE transitions on clicks.
+# Its position is saved at the end of every rerun that changed it, so a
+# client that reconnects with a new session picks up where it left off:
+#   - without a session store, as a signed token in the URL (?g=...)
+#   - with one (see sessions.py), in the store under the session id,
+#     which the URL carries instead (?s=...); the store is read once per
+#     new session and written at most once per rerun
+# A restored position goes back on the newest live snapshot that still
+# has its questions.
 # --------------------------------------------------
 
+
 def init_state():
-    if "phase" not in st.session_state:
-        st.session_state.phase = "splash"
-        st.session_state.scenario_key = None
-        st.session_state.layer_index = 0
-        st.session_state.score = 0
-        st.session_state.crashed = False
-        st.session_state.crash_reason = ""
-        st.session_state.crash_layer_name = ""
-        st.session_state.feedback_text = ""
-        st.session_state.feedback_for_layer = -1
-        # new: map layer_index -> chosen question index
-        st.session_state.current_q_indices = {}
+    if "game" not in st.session_state:
+        game, bank = restore_position()
+        if game is None:
+            # anonymous session id, used to tag traces and logged events
+            bank = BANKS.current()
+            game = bank.engine().new_state(session_id=uuid.uuid4().hex[:12])
+        st.session_state.game = game
+        st.session_state.bank = bank
+
+
+def restore_position():
+    # -> (game, bank snapshot), or (None, None)
+    if SESSIONS is None:
+        data = st.query_params.get("g")
+        load = RESUME.load
+    else:
+        session_id = st.query_params.get("s")
+        data = SESSIONS.get(session_id) if session_id else None
+        load = RESUME.unpack
+    if data:
+        for bank in BANKS.live():
+            game = load(data, bank.engine())
+            if game is not None:
+                if SESSIONS is not None:
+                    st.session_state.saved_position = data
+                return game, bank
+    return None, None
+
+
+def pin_bank(game):
+    bank, current = st.session_state.bank, BANKS.current()
+    if bank is current:
+        return bank
+    if game.phase in ("splash", "scenario_select") or (
+        game.phase == "scenario_intro" and game.scenario_key in current.scenarios
+    ):
+        if game.scenario_key not in current.scenarios:
+            # the last scenario played is gone: forget its run
+            game.scenario_key = None
+            game.reset_run()
+        bank = st.session_state.bank = current
+    return bank
+
+
+def save_position(game):
+    if SESSIONS is None:
+        token = RESUME.dump(game, ENGINE)
+        if st.query_params.get("g") != token:
+            st.query_params["g"] = token
+        return
+    data = RESUME.pack(game, ENGINE)
+    if st.session_state.get("saved_position") != data:
+        SESSIONS.put(game.session_id, data)
+        st.session_state.saved_position = data
+    if st.query_params.get("s") != game.session_id:
+        st.query_params["s"] = game.session_id
+
+
+init_state()
+BANK = pin_bank(st.session_state.game)
+LOCALES = BANK.locales
+
+
+def choose_locale():
+    installed = LOCALES.installed
+    if len(installed) == 1:
+        return DEFAULT_LOCALE
+    if "locale" not in st.session_state:
+        st.session_state.locale = (
+            LOCALES.match(st.query_params.get("lang")) or LOCALES.match(st.context.locale) or DEFAULT_LOCALE
+        )
+    return st.sidebar.selectbox("🌐 Language", installed, key="locale", format_func=language_name, on_change=on_locale)
+
+
+def on_locale():
+    if st.session_state.locale == DEFAULT_LOCALE:
+        st.query_params.pop("lang", None)
+    else:
+        st.query_params["lang"] = st.session_state.locale
+
+
+LOCALE = choose_locale()
+LAYERS, SCENARIOS = LOCALES.bank(LOCALE)
+CATALOG = BANK.catalog(LOCALE)
+VIEWS = BANK.views(LOCALE)
+ENGINE = BANK.engine(LOCALE)
+LEADERBOARD = get_leaderboard()
+CLASSROOM = get_classroom_hub()
+DECKS = get_deck_store()
+
+
+# --------------------------------------------------
+# CLASSROOM
+# A student who joins an instructor's room (see pages/classroom_host.py)
+# plays that room's floors instead of the game screens until they leave.
+# The room code is kept in the URL (?room=...), so a reconnecting client
+# rejoins. Answers go straight into the room's counters; the host's
+# actions reach the student through classroom_watch, which polls the
+# room's step counter and reruns this session only when it moved.
+# --------------------------------------------------
+
+def current_room():
+    code = st.session_state.get("room_code")
+    if code is None:
+        code = st.query_params.get("room")
+        if not code:
+            return None
+        if not join_room(code):
+            del st.query_params["room"]
+            return None
+    room = CLASSROOM.get(code)
+    if room is None:
+        leave_room()
+        st.info("Your class has ended.")
+    return room
+
+
+def join_room(code):
+    # True when the session is now in the room
+    game = st.session_state.game
+    room = CLASSROOM.get(code)
+    if room is None:
+        st.session_state.class_error = f"There is no class with the code {code!r}."
+        return False
+    try:
+        room.join(game.session_id, player_name(game))
+    except RoomFull:
+        st.session_state.class_error = "This class is full."
+        return False
+    st.session_state.pop("class_error", None)
+    st.session_state.room_code = room.code
+    st.query_params["room"] = room.code
+    return True
+
+
+def leave_room():
+    code = st.session_state.pop("room_code", None)
+    room = CLASSROOM.get(code)
+    if room is not None:
+        room.leave(st.session_state.game.session_id)
+    if "room" in st.query_params:
+        del st.query_params["room"]
+
+
+def on_join_class():
+    keep_name()
+    join_room(st.session_state.get("class_code", ""))
+
+
+def on_class_answer(room, radio_key: str, options):
+    room.submit(st.session_state.game.session_id, options.index(st.session_state[radio_key]))
+
+
+@st.fragment(run_every=POLL_SECONDS)
+def classroom_watch(room, step: int):
+    if room.step != step:
+        st.rerun()
+
+
+@timed
+def screen_classroom(room):
+    game = st.session_state.game
+    # read the step first: a host action after this line makes the watch rerun
+    step = room.step
+    stage, floor = room.stage, room.floor
+    # the snapshot the room was opened on, in this player's language
+    layers, scenarios = room.bank.locales.bank(LOCALE)
+    scenario = scenarios[room.scenario_key]
+    questions = scenario["questions"]
+
+    st.title(f"🎓 Class {room.code}: {scenario['avatar']} {scenario['title']}")
+    classroom_watch(room, step)
+
+    if stage == "lobby":
+        st.info("You're in! Waiting for your instructor to start the first floor…")
+    elif stage == "finished":
+        score = sum(
+            room.answer_of(game.session_id, f) == questions[f][q_idx]["correct"]
+            for f, q_idx in enumerate(room.q_indices)
+        )
+        st.success(f"Class over – you made **{score} / {len(layers)}** good decisions.")
+    else:
+        layer = layers[floor]
+        question = questions[floor][room.q_indices[floor]]
+        options = question["options"]
+        mine = room.answer_of(game.session_id)
+
+        st.markdown(f"### Floor {floor + 1}: {layer['name']}")
+        st.caption(layer["description"])
+        st.write(question["prompt"])
+
+        if stage == "question":
+            radio_key = f"class_{room.code}_{floor}"
+            with st.form(f"form_{radio_key}", border=False):
+                st.radio("Choose one:", options, index=mine, key=radio_key)
+                st.form_submit_button("📨 Send my answer", on_click=on_class_answer, args=(room, radio_key, options))
+            if mine is not None:
+                st.caption(f"Answer sent: **{options[mine]}** – you can change it until your instructor reveals the answer.")
+        else:
+            correct = question["correct"]
+            if mine == correct:
+                st.success(f"✅ **{options[correct]}** – {question['ex_correct']}")
+            else:
+                if mine is None:
+                    st.info("You did not answer this floor.")
+                else:
+                    st.error(f"💥 **{options[mine]}** – {question['ex_wrong']}")
+                st.markdown(f"Ideal option: **{options[correct]}** – {question['ex_correct']}")
+
+    st.markdown("---")
+    st.button("🚪 Leave class", on_click=leave_room)
+
+
+# --------------------------------------------------
+# REVIEW
+# Every crash puts the missed question into the learner's review deck
+# (see review.py). Review mode asks the deck's due questions, most
+# overdue first, and grades each answer back into the deck.
+# The learner id is kept in the URL (?l=...), so a returning student
+# who kept the link gets their deck back. The deck is read once per
+# session and written after each change.
+# --------------------------------------------------
+
+def learner_deck():
+    if "deck" not in st.session_state:
+        learner = st.query_params.get("l")
+        st.session_state.deck = DECKS.load(learner) if learner and DECKS else Deck()
+    return st.session_state.deck
+
+
+def save_deck(deck):
+    learner = st.query_params.get("l")
+    if learner is None:
+        learner = st.query_params["l"] = uuid.uuid4().hex[:12]
+    if DECKS is not None:
+        DECKS.save(learner, deck)
+
+
+def note_miss(game):
+    deck = learner_deck()
+    deck.miss((game.scenario_key, game.layer_index, ENGINE.question(game)["id"]), time.time())
+    save_deck(deck)
+
+
+def card_question(card):
+    # the question a card names in this session's bank, or None if it is gone
+    key, floor, question_id = card
+    if key not in SCENARIOS or floor >= len(LAYERS):
+        return None
+    return next((q for q in SCENARIOS[key]["questions"][floor] if q["id"] == question_id), None)
+
+
+def next_card(deck, now):
+    # the next due card that the bank can still show
+    while (card := deck.next_due(now)) is not None:
+        if card_question(card) is not None:
+            return card
+        deck.drop(card)
+    return None
+
+
+def start_review():
+    st.session_state.reviewing = True
+
+
+def stop_review():
+    for k in ("reviewing", "review_card", "review_answer"):
+        st.session_state.pop(k, None)
+
+
+def on_review_answer(card, radio_key: str, options):
+    deck = learner_deck()
+    question = card_question(card)
+    if question is None:
+        return  # a reload removed the question; screen_review moves on
+    option = options.index(st.session_state[radio_key])
+    correct = option == question["correct"]
+    deck.grade(card, 4 if correct else 1, time.time())
+    save_deck(deck)
+    st.session_state.review_card = card
+    st.session_state.review_answer = option
+
+
+def next_review():
+    st.session_state.pop("review_card", None)
+    st.session_state.pop("review_answer", None)
+
+
+@timed
+def screen_review():
+    deck = learner_deck()
+    now = time.time()
+    card = st.session_state.get("review_card")
+    if card is not None and card_question(card) is None:
+        next_review()
+        card = None
+    card = card or next_card(deck, now)
+
+    st.title("📚 Review")
+    if card is None:
+        next_at = deck.next_due_at()
+        st.success("Nothing left to review right now.")
+        if next_at is not None:
+            st.write(f"Your deck has {len(deck)} questions; the next one is due in {due_in(next_at - now)}.")
+        st.button("🏠 Back to home", on_click=stop_review)
+        return
+
+    key, floor, question_id = card
+    scenario = SCENARIOS[key]
+    question = card_question(card)
+    options = question["options"]
+    answer = st.session_state.get("review_answer")
+
+    st.caption(f"{deck.due_count(now)} due · {len(deck)} in your deck")
+    st.markdown(f"### {scenario['avatar']} {scenario['title']} · Floor {floor + 1}: {LAYERS[floor]['name']}")
+    st.write(question["prompt"])
+
+    if answer is None:
+        radio_key = f"review_{key}_{floor}_{question_id}"
+        with st.form(f"form_{radio_key}", border=False):
+            st.radio("Choose one:", options, index=None, key=radio_key)
+            st.form_submit_button("✅ Check", on_click=on_review_answer, args=(card, radio_key, options))
+    elif answer == question["correct"]:
+        st.success(f"✅ **{options[answer]}** – {question['ex_correct']}")
+        st.button("➡️ Next question", on_click=next_review)
+    else:
+        st.error(f"💥 **{options[answer]}** – {question['ex_wrong']}")
+        st.markdown(f"Ideal option: **{options[question['correct']]}** – {question['ex_correct']}")
+        st.button("➡️ Next question", on_click=next_review)
+
+    st.markdown("---")
+    st.button("🏠 Back to home", on_click=stop_review)
+
+
+def due_in(seconds):
+    if seconds < 3600:
+        return f"{max(1, round(seconds / 60))} min"
+    if seconds < 2 * 86400:
+        return f"{round(seconds / 3600)} h"
+    return f"{round(seconds / 86400)} days"
 
 
 # --------------------------------------------------
 # UI HELPERS
 # --------------------------------------------------
 
+def tag_rerun(game):
+    begin_rerun(game.phase, game.scenario_key, game.session_id)
+
+
+# The name inputs share the widget key "player_name", which Streamlit
+# drops whenever no name input is on screen; the name itself is kept in
+# the plain key "name" and put back into the widget each time one is drawn.
+def player_name(game):
+    return st.session_state.get("name") or f"Player {game.session_id[:4]}"
+
+
+def name_input(label: str, **kwargs):
+    st.session_state.player_name = st.session_state.get("name", "")
+    st.text_input(label, key="player_name", max_chars=24, **kwargs)
+
+
+def keep_name():
+    st.session_state.name = st.session_state.get("player_name", "").strip()
+
+
+def leaderboard_key(game):
+    # incident response runs are ranked on a board of their own, by points
+    return f"{game.scenario_key}:timed" if game.time_limit else game.scenario_key
+
+
+def on_rename():
+    keep_name()
+    game = st.session_state.game
+    LEADERBOARD.rename(game.session_id, player_name(game))
+
+
+@timed
+def show_leaderboard(game):
+    key = leaderboard_key(game)
+    st.markdown("### 🏆 Leaderboard" + (" · incident response" if game.time_limit else ""))
+    rank = LEADERBOARD.rank(key, game.session_id)
+    if rank is not None:
+        st.write(f"Your best run ranks **#{rank}** of {LEADERBOARD.size(key)}.")
+    name_input("Your name on the leaderboard", on_change=on_rename)
+    st.dataframe([
+        {
+            "#": i + 1,
+            "Player": entry["name"],
+            ("Points" if game.time_limit else "Floors"): entry["score"],
+            "Retries": entry["retries"],
+            "Time": f"{entry['seconds']:.0f} s",
+        }
+        for i, entry in enumerate(LEADERBOARD.top(key, 10))
+    ], hide_index=True)
+
+
+@timed
 def render_tower(current_index: int):
-    st.markdown("### 🏢 Cloud Tower")
-    for i, layer in enumerate(LAYERS):
-        prefix = "▫️"
-        if i == current_index:
-            prefix = "👉"
-            st.markdown(f"**{prefix} Floor {i+1}: {layer['name']}**")
-        else:
-            st.markdown(f"{prefix} Floor {i+1}: {layer['name']}")
+    # one memoized markdown element instead of one per floor
+    st.markdown(VIEWS.tower(current_index))
 
 
+@timed
 def goto_scenario(key: str):
-    st.session_state.scenario_key = key
-    st.session_state.layer_index = 0
-    st.session_state.score = 0
-    st.session_state.crashed = False
-    st.session_state.crash_reason = ""
-    st.session_state.crash_layer_name = ""
-    st.session_state.feedback_text = ""
-    st.session_state.feedback_for_layer = -1
-    st.session_state.current_q_indices = {}
-    st.session_state.phase = "scenario_intro"
+    ENGINE.start(st.session_state.game, key)
 
 
 # --------------------------------------------------
 # SCREENS
 # --------------------------------------------------
 
+@timed
 def screen_splash():
+    game = st.session_state.game
+
     st.title("☁️ Cloud Tower: Architect's Quest")
     st.subheader("Learn cloud computing layers by saving (or crashing) real apps.")
 
@@ -888,39 +501,76 @@ Welcome! In this game you are a **cloud architect**.
 """
     )
     st.markdown("---")
-    if st.button("🚀 Play"):
-        st.session_state.phase = "scenario_select"
+    st.button("🚀 Play", on_click=ENGINE.choose_scenario, args=(game,))
 
+    due = learner_deck().due_count(time.time())
+    if due:
+        st.button(f"📚 Review {due} question{'s' if due > 1 else ''} you missed", on_click=start_review)
 
+    with st.expander("🎓 Joining a class? Enter the code your instructor shows"):
+        with st.form("join_class", border=False):
+            st.text_input("Class code", key="class_code", max_chars=8)
+            name_input("Your name")
+            st.form_submit_button("Join", on_click=on_join_class)
+        if "class_error" in st.session_state:
+            st.error(st.session_state.class_error)
+
+
+def set_catalog_page(page: int):
+    st.session_state.catalog_page = page
+
+
+@timed
 def screen_scenario_select():
+    game = st.session_state.game
+
     st.title("Choose your scenario")
 
-    col1, col2 = st.columns(2)
+    search_col, tags_col = st.columns([2, 1])
+    with search_col:
+        query = st.text_input(
+            "Search scenarios",
+            key="catalog_query",
+            placeholder="e.g. security, global, cost…",
+            on_change=set_catalog_page,
+            args=(0,),
+        )
+    with tags_col:
+        tags = st.multiselect("Tags", CATALOG.tags, key="catalog_tags", on_change=set_catalog_page, args=(0,))
+
+    keys = CATALOG.search(query, tags)
+    page_keys, page, n_pages = paginate(keys, st.session_state.get("catalog_page", 0))
+
+    if not keys:
+        st.info("No scenario matches your search.")
+
+    # two scenario cards per row
+    for row in range(0, len(page_keys), 2):
+        for col, key in zip(st.columns(2), page_keys[row:row + 2]):
+            with col:
+                s = CATALOG.meta[key]
+                st.markdown(f"## {s['avatar']} {s['title']}")
+                st.caption(s["tagline"])
+                st.write(s["intro"])
+                st.button("Build this app", key=f"pick_{key}", on_click=goto_scenario, args=(key,))
+
+    if n_pages > 1:
+        prev_col, info_col, next_col = st.columns([1, 2, 1])
+        prev_col.button("⬅️ Previous", disabled=page == 0, on_click=set_catalog_page, args=(page - 1,))
+        info_col.caption(f"Page {page + 1} of {n_pages} · {len(keys)} scenarios")
+        next_col.button("Next ➡️", disabled=page + 1 >= n_pages, on_click=set_catalog_page, args=(page + 1,))
 
-    with col1:
-        s = SCENARIOS["social"]
-        st.markdown(f"## {s['avatar']} {s['title']}")
-        st.caption(s["tagline"])
-        st.write(s["intro"])
-        if st.button("Build this app", key="pick_social"):
-            goto_scenario("social")
+    st.markdown("---")
+    st.button("⬅️ Back to home", on_click=ENGINE.go_home, args=(game,))
 
-    with col2:
-        s = SCENARIOS["bank"]
-        st.markdown(f"## {s['avatar']} {s['title']}")
-        st.caption(s["tagline"])
-        st.write(s["intro"])
-        if st.button("Build this app", key="pick_bank"):
-            goto_scenario("bank")
 
-    st.markdown("---")
-    if st.button("⬅️ Back to home"):
-        st.session_state.phase = "splash"
+TIMED_FLOOR_SECONDS = 30
 
 
+@timed
 def screen_scenario_intro():
-    key = st.session_state.scenario_key
-    scenario = SCENARIOS[key]
+    game = st.session_state.game
+    scenario = ENGINE.scenario(game)
 
     st.title(f"{scenario['avatar']} {scenario['title']}")
     st.subheader(scenario["tagline"])
@@ -937,23 +587,21 @@ One bad decision can crash the app, but you can retry that floor.
 """
     )
     st.markdown("---")
-    if st.button("Start at Floor 1"):
-        st.session_state.phase = "layer"
+    st.button("Start at Floor 1", on_click=ENGINE.enter_tower, args=(game,))
+    st.button(
+        f"⏱️ Incident response: {TIMED_FLOOR_SECONDS} s per floor, points for speed",
+        on_click=ENGINE.enter_tower,
+        args=(game, TIMED_FLOOR_SECONDS),
+    )
 
 
+@timed
 def screen_layer():
-    key = st.session_state.scenario_key
-    scenario = SCENARIOS[key]
-    layer_index = st.session_state.layer_index
+    game = st.session_state.game
+    scenario = ENGINE.scenario(game)
+    layer_index = game.layer_index
     layer = LAYERS[layer_index]
 
-    # pick or reuse random question index for this floor
-    q_list = scenario["questions"][layer_index]
-    if layer_index not in st.session_state.current_q_indices:
-        st.session_state.current_q_indices[layer_index] = random.randrange(len(q_list))
-    q_idx = st.session_state.current_q_indices[layer_index]
-    question = q_list[q_idx]
-
     st.title(f"{scenario['avatar']} {scenario['title']}")
     st.caption(scenario["tagline"])
 
@@ -965,56 +613,102 @@ def screen_layer():
     with right:
         st.markdown(f"### Floor {layer_index + 1}: {layer['name']}")
         st.caption(layer["description"])
+        if game.time_limit:
+            floor_timer()
         st.markdown("---")
 
-        # already answered correctly? show feedback + next
-        if st.session_state.feedback_for_layer == layer_index and st.session_state.feedback_text:
-            st.success(st.session_state.feedback_text)
-            st.markdown("---")
-
-            if st.button("➡️ Continue to next floor"):
-                if layer_index + 1 < len(LAYERS):
-                    st.session_state.layer_index += 1
-                    st.session_state.feedback_text = ""
-                    st.session_state.feedback_for_layer = -1
-                    st.session_state.phase = "layer"
-                else:
-                    st.session_state.phase = "success"
-            return
+        layer_panel()
+
+
+# The question/feedback panel is a fragment and the answer is a form:
+# picking an option costs no rerun at all, and locking in a correct
+# answer reruns only this panel. Callbacks apply each decision before
+# the rerun starts and ask for a full rerun (which redraws the tower)
+# only when the floor or the phase changes.
+def on_lock_in(radio_key: str):
+    game = st.session_state.game
+    options = ENGINE.question(game)["options"]
+    if not ENGINE.answer(game, options.index(st.session_state[radio_key])):
+        note_miss(game)
+        st.rerun()
+
+
+def on_continue():
+    game = st.session_state.game
+    ENGINE.continue_floor(game)
+    if game.phase == "success":
+        LEADERBOARD.record(
+            leaderboard_key(game),
+            game.session_id,
+            player_name(game),
+            game.points if game.time_limit else game.score,
+            game.misses,
+            game.run_seconds,
+        )
+    st.rerun()
+
+
+# The countdown of a timed floor is its own fragment: once a second it
+# redraws one progress bar and nothing else. It only displays the time;
+# the engine checks the deadline against the time the floor was shown,
+# both here (to end the floor when the time is up) and on lock-in.
+@st.fragment(run_every=1)
+@timed
+def floor_timer():
+    game = st.session_state.game
+    tag_rerun(game)
+    if ENGINE.check_timer(game):
+        note_miss(game)
+        st.rerun()
+    left = ENGINE.seconds_left(game)
+    if left is not None:
+        st.progress(left / game.time_limit, text=f"⏱️ {math.ceil(left)} s left")
+
+
+@st.fragment
+@timed
+def layer_panel():
+    game = st.session_state.game
+    tag_rerun(game)
+    save_position(game)
+
+    if ENGINE.answered_current_floor(game):
+        st.success(ENGINE.feedback_text(game))
+        st.markdown("---")
+        st.button("➡️ Continue to next floor", on_click=on_continue)
+        return
+
+    question = ENGINE.question(game)
+    radio_key = f"layer_{game.scenario_key}_{game.layer_index}"
 
+    with st.form(f"form_{radio_key}", border=False):
         st.write(question["prompt"])
 
-        chosen = st.radio(
-            "Choose one:",
-            question["options"],
-            key=f"layer_{key}_{layer_index}",
-        )
+        with span("layer_radio"):
+            st.radio("Choose one:", question["options"], key=radio_key)
 
-        if st.button("✅ Lock in my choice"):
-            chosen_index = question["options"].index(chosen)
-            if chosen_index == question["correct"]:
-                st.session_state.score += 1
-                st.session_state.feedback_text = question["ex_correct"]
-                st.session_state.feedback_for_layer = layer_index
-            else:
-                st.session_state.crashed = True
-                st.session_state.crash_reason = question["ex_wrong"]
-                st.session_state.crash_layer_name = layer["name"]
-                st.session_state.phase = "crash"
+        st.form_submit_button("✅ Lock in my choice", on_click=on_lock_in, args=(radio_key,))
+
+    st.markdown("---")
+    st.caption("Tip: Think about cost, scalability, security, and who manages this layer (you vs cloud).")
 
-        st.markdown("---")
-        st.caption("Tip: Think about cost, scalability, security, and who manages this layer (you vs cloud).")
 
+def show_run_token(game):
+    # replays this exact run: python -m runtoken <token>
+    st.caption("Run token – include it when you report a problem with this run:")
+    st.code(ENGINE.run_token(game), language=None)
 
+
+@timed
 def screen_crash():
-    key = st.session_state.scenario_key
-    scenario = SCENARIOS[key]
+    game = st.session_state.game
+    scenario = ENGINE.scenario(game)
 
     st.title("💥 Application Crashed!")
     st.subheader(f"Scenario: {scenario['title']}")
 
-    st.error(f"Your app crashed at the **{st.session_state.crash_layer_name}** layer.")
-    st.write(st.session_state.crash_reason)
+    st.error(f"Your app crashed at the **{ENGINE.crash_layer_name(game)}** layer.")
+    st.write(ENGINE.crash_reason(game))
 
     st.markdown(
         """
@@ -1030,55 +724,42 @@ Cloud computing is about deciding **which layers you manage** and **which layers
     col1, col2, col3, col4 = st.columns(4)
 
     with col1:
-        if st.button("🔁 Retry this floor"):
-            # keep same scenario & layer, but pick a new random question for this floor
-            layer_index = st.session_state.layer_index
-            if layer_index in st.session_state.current_q_indices:
-                del st.session_state.current_q_indices[layer_index]
-            st.session_state.crashed = False
-            st.session_state.crash_reason = ""
-            st.session_state.crash_layer_name = ""
-            st.session_state.feedback_text = ""
-            st.session_state.feedback_for_layer = -1
-            st.session_state.phase = "layer"
+        st.button("🔁 Retry this floor", on_click=ENGINE.retry_floor, args=(game,))
 
     with col2:
-        if st.button("🔁 Replay entire scenario"):
-            goto_scenario(key)
+        st.button("🔁 Replay entire scenario", on_click=ENGINE.replay, args=(game,))
 
     with col3:
-        if st.button("🧭 Choose another scenario"):
-            st.session_state.phase = "scenario_select"
+        st.button("🧭 Choose another scenario", on_click=ENGINE.choose_scenario, args=(game,))
 
     with col4:
-        if st.button("🏠 Back to home"):
-            st.session_state.phase = "splash"
+        st.button("🏠 Back to home", on_click=ENGINE.go_home, args=(game,))
 
+    show_run_token(game)
 
+
+@timed
 def screen_success():
-    key = st.session_state.scenario_key
-    scenario = SCENARIOS[key]
+    game = st.session_state.game
+    scenario = ENGINE.scenario(game)
 
     st.title("🎉 Application Launched Successfully!")
     st.subheader(f"Scenario: {scenario['title']}")
     st.success("You made solid decisions at every layer of the Cloud Tower.")
 
     total_layers = len(LAYERS)
-    st.write(f"✅ Correct decisions: **{st.session_state.score} / {total_layers}**")
+    st.write(f"✅ Correct decisions: **{game.score} / {total_layers}**")
+    if game.time_limit:
+        st.write(f"⏱️ Incident response score: **{game.points} points** in {game.run_seconds:.0f} s")
+
+    st.markdown("---")
+    show_leaderboard(game)
 
     st.markdown("---")
     st.markdown("### Your architecture across all layers")
 
-    for i, layer in enumerate(LAYERS):
-        q_list = scenario["questions"][i]
-        q_idx = st.session_state.current_q_indices.get(i, 0)
-        q = q_list[q_idx]
-        correct_option = q["options"][q["correct"]]
-        st.markdown(f"**Floor {i+1} – {layer['name']}**")
-        st.caption(layer["description"])
-        st.markdown(f"- ✅ Ideal option: **{correct_option}**")
-        st.markdown(f"- 💡 Why: {q['ex_correct']}")
-        st.markdown("---")
+    with span("success_report"):
+        st.markdown(VIEWS.success_report(game.scenario_key, tuple(game.current_q_indices)))
 
     st.markdown(
         """
@@ -1095,26 +776,36 @@ def screen_success():
     col1, col2, col3 = st.columns(3)
 
     with col1:
-        if st.button("🔁 Replay this scenario"):
-            goto_scenario(key)
+        st.button("🔁 Replay this scenario", on_click=ENGINE.replay, args=(game,))
 
     with col2:
-        if st.button("🧭 Try another scenario"):
-            st.session_state.phase = "scenario_select"
+        st.button("🧭 Try another scenario", on_click=ENGINE.choose_scenario, args=(game,))
 
     with col3:
-        if st.button("🏠 Back to home"):
-            st.session_state.phase = "splash"
+        st.button("🏠 Back to home", on_click=ENGINE.go_home, args=(game,))
+
+    show_run_token(game)
 
 
 # --------------------------------------------------
 # MAIN
 # --------------------------------------------------
 
+@timed
 def main():
-    init_state()
-
-    phase = st.session_state.phase
+    game = st.session_state.game
+    room = current_room()
+    if room is not None:
+        begin_rerun("classroom", room.scenario_key, game.session_id)
+        screen_classroom(room)
+        return
+    if st.session_state.get("reviewing"):
+        begin_rerun("review", None, game.session_id)
+        screen_review()
+        return
+
+    phase = game.phase
+    tag_rerun(game)
 
     if phase == "splash":
         screen_splash()
@@ -1132,9 +823,12 @@ def main():
         st.error("Unknown phase – resetting game.")
         for k in list(st.session_state.keys()):
             del st.session_state[k]
+        st.query_params.clear()
         init_state()
         screen_splash()
 
+    save_position(st.session_state.game)
+
 
 if __name__ == "__main__":
     main()
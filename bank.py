@@ -0,0 +1,126 @@
+import hashlib
+import json
+import threading
+from collections.abc import Mapping
+from pathlib import Path
+from types import MappingProxyType
+
+from runtoken import MAX_OPTIONS
+
+# --------------------------------------------------
+# QUESTION BANK
+# data/index.json holds the layers and the lightweight metadata of every
+# scenario (key, title, avatar, tagline, intro, tags). The questions of
+# each scenario live in data/scenarios/<key>.json and are only read the
+# first time that scenario is played.
+#
+# Everything is frozen after parsing (dicts -> read-only mappings,
+# lists -> tuples) so a single copy can be shared by every session of
+# the process.
+#
+# Every question gets an "id": a hash of its content, the same in every
+# process and every version of the bank as long as the question itself
+# is unchanged. A bank built with `shared` reuses the frozen question
+# of an older bank that has the same id instead of keeping a copy (see
+# snapshots.py), and version(key) hashes a scenario's ids, so a saved
+# position or a run token can tell whether the questions it points at
+# are still there.
+# --------------------------------------------------
+
+DATA_DIR = Path(__file__).parent / "data"
+INDEX_PATH = DATA_DIR / "index.json"
+SCENARIO_DIR = DATA_DIR / "scenarios"
+
+
+def freeze(value):
+    if isinstance(value, dict):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def question_id(raw):
+    # 16 hex digits over the canonical JSON of the question as written
+    data = json.dumps(raw, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode()
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+
+def freeze_question(raw, shared=None):
+    # a run token keeps an answer in 3 bits (see runtoken.py)
+    n_options = len(raw["options"])
+    if not 2 <= n_options <= MAX_OPTIONS or not 0 <= raw["correct"] < n_options:
+        raise ValueError(f"a question needs 2 to {MAX_OPTIONS} options and a correct one: {raw['prompt']!r}")
+    qid = question_id(raw)
+    question = shared.get(qid) if shared else None
+    if question is None:
+        question = MappingProxyType({**freeze(raw), "id": qid})
+    return question
+
+
+def read_json(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_index(path=INDEX_PATH):
+    raw = read_json(path)
+    return freeze(raw["layers"]), freeze(raw["scenarios"])
+
+
+class ScenarioBank(Mapping):
+    # Read-only mapping of scenario key -> full scenario (metadata plus
+    # "questions"). Keys, iteration and len() only touch the index; a
+    # scenario's question file is parsed on first lookup and kept.
+    # `shared`, if given, is called with a scenario key and returns the
+    # questions of that scenario another bank already holds, by id.
+
+    def __init__(self, meta, directory=SCENARIO_DIR, shared=None):
+        self.meta = meta
+        self._meta_by_key = {m["key"]: m for m in meta}
+        self._directory = Path(directory)
+        self._shared = shared
+        self._loaded = {}
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, key):
+        scenario = self._loaded.get(key)
+        if scenario is None:
+            meta = self._meta_by_key[key]
+            with self._lock:
+                scenario = self._loaded.get(key)
+                if scenario is None:
+                    raw = read_json(self._directory / f"{key}.json")
+                    shared = self._shared(key) if self._shared else None
+                    questions = tuple(
+                        tuple(freeze_question(q, shared) for q in q_list) for q_list in raw["questions"]
+                    )
+                    scenario = MappingProxyType({**meta, "questions": questions})
+                    self._loaded[key] = scenario
+        return scenario
+
+    def __contains__(self, key):
+        return key in self._meta_by_key
+
+    def __iter__(self):
+        return iter(self._meta_by_key)
+
+    def __len__(self):
+        return len(self._meta_by_key)
+
+    def loaded_keys(self):
+        return tuple(self._loaded)
+
+    def version(self, key):
+        # 32-bit hash of the ids of a scenario's questions, in order
+        version = self._versions.get(key)
+        if version is None:
+            ids = ",".join(q["id"] for q_list in self[key]["questions"] for q in q_list)
+            version = self._versions[key] = int.from_bytes(hashlib.blake2b(ids.encode(), digest_size=4).digest())
+        return version
+
+
+def load_bank(index_path=INDEX_PATH, scenario_dir=SCENARIO_DIR, shared=None):
+    layers, meta = load_index(index_path)
+    return layers, ScenarioBank(meta, scenario_dir, shared)
@@ -0,0 +1,102 @@
+"""Dashboard query cost over the rollups vs a rescan of raw history.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_analytics --answers 1000000
+
+Writes synthetic answers through the real SQLite event sink (so the
+rollups are maintained exactly as in production) into a temporary
+database, then times the four instructor-dashboard reports against the
+equivalent GROUP BY queries over the raw `events` table.
+"""
+import argparse
+import random
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+import analytics
+from bank import load_bank
+from events import SQLiteSink
+
+RAW_QUERIES = (
+    "SELECT floor, question, COUNT(*), SUM(correct), SUM(think_ms) FROM events"
+    " WHERE kind = 'answer' AND scenario = ? GROUP BY floor, question",
+    "SELECT floor, COUNT(*), SUM(1 - correct) FROM events"
+    " WHERE kind = 'answer' AND scenario = ? GROUP BY floor",
+    "SELECT floor, question, option, COUNT(*) FROM events"
+    " WHERE kind = 'answer' AND scenario = ? GROUP BY floor, question, option",
+    "SELECT floor, COUNT(*) FROM events"
+    " WHERE kind = 'answer' AND correct AND scenario = ? GROUP BY floor",
+)
+
+
+def synthetic_batches(scenarios, n_answers, batch_size, rng):
+    keys = list(scenarios)
+    batch = []
+    for i in range(n_answers):
+        key = keys[i % len(keys)]
+        floor = rng.randrange(9)
+        q_list = scenarios[key]["questions"][floor]
+        q_idx = rng.randrange(len(q_list))
+        option = rng.randrange(len(q_list[q_idx]["options"]))
+        batch.append({
+            "ts": time.time(), "kind": "answer", "session": f"s{i % 5000}", "scenario": key,
+            "floor": floor, "q_idx": q_idx, "question": q_list[q_idx]["id"], "option": option,
+            "correct": option == q_list[q_idx]["correct"], "think_ms": rng.randrange(500, 30_000),
+        })
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def timed(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--answers", type=int, default=1_000_000)
+    parser.add_argument("--batch", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    _, scenarios = load_bank()
+    rng = random.Random(args.seed)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "events.db"
+        sink = SQLiteSink(db_path)
+        started = time.perf_counter()
+        for batch in synthetic_batches(scenarios, args.answers, args.batch, rng):
+            sink.write(batch)
+        ingest = time.perf_counter() - started
+        sink.close()
+
+        conn = sqlite3.connect(db_path)
+        key = next(iter(scenarios))
+        rollup = timed(lambda: [
+            report(conn, key) for report in (
+                analytics.question_report, analytics.floor_report,
+                analytics.option_report, analytics.funnel_report,
+            )
+        ])
+        rescan = timed(lambda: [conn.execute(q, (key,)).fetchall() for q in RAW_QUERIES], repeat=2)
+        conn.close()
+
+    print(f"answers written:          {args.answers:,}")
+    print(f"ingest incl. rollups:     {ingest:.2f} s ({args.answers / ingest:,.0f} answers/s)")
+    print(f"dashboard from rollups:   {rollup * 1000:.2f} ms")
+    print(f"same reports by rescan:   {rescan * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
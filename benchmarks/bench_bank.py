@@ -0,0 +1,75 @@
+"""Per-rerun cost of the question bank, before and after caching.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_bank
+
+"before" executes the bank as a module-level dict literal, which is what
+every Streamlit rerun used to pay. "after" is the cached lookup a rerun
+does now; "cold load" is the one-off parse paid once per process.
+"""
+import argparse
+import timeit
+import tracemalloc
+
+import streamlit as st
+
+from bank import INDEX_PATH, SCENARIO_DIR, load_bank, read_json
+
+
+def literal_code():
+    index = read_json(INDEX_PATH)
+    scenarios = {
+        m["key"]: {**m, **read_json(SCENARIO_DIR / f"{m['key']}.json")}
+        for m in index["scenarios"]
+    }
+    src = f"LAYERS = {index['layers']!r}\nSCENARIOS = {scenarios!r}\n"
+    return compile(src, "<bank literal>", "exec")
+
+
+def load_everything():
+    layers, scenarios = load_bank()
+    for key in scenarios:
+        scenarios[key]
+    return layers, scenarios
+
+
+def per_call(fn, number):
+    best = min(timeit.repeat(fn, number=number, repeat=5))
+    return best / number
+
+
+def allocated(fn):
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=2000)
+    args = parser.parse_args()
+
+    code = literal_code()
+    cached = st.cache_resource(load_bank)
+    cached()
+
+    before = lambda: exec(code, {})  # noqa: E731
+    rows = [
+        ("before: dict literal per rerun", before),
+        ("after: cache_resource per rerun", cached),
+        ("cold load (once per process)", load_everything),
+    ]
+    results = []
+    for label, fn in rows:
+        number = args.number if fn is not load_everything else max(1, args.number // 20)
+        seconds = per_call(fn, number)
+        results.append(seconds)
+        print(f"{label:<34} {seconds * 1e6:10.2f} µs {allocated(fn) / 1024:10.1f} KiB allocated")
+    print(f"{'speed-up per rerun':<34} {results[0] / results[1]:10.1f} x")
+
+
+if __name__ == "__main__":
+    main()
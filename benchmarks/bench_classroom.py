@@ -0,0 +1,103 @@
+"""Answer fan-in of a full classroom room.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_classroom --students 500 --threads 16
+
+``students`` join one room and answer every floor from ``threads``
+workers (a third of them change their mind once per floor), while one
+thread polls the room like the host's view does. After each floor the
+counters are compared with the answers actually given.
+"""
+import argparse
+import random
+import threading
+import time
+
+from classroom import ClassroomHub
+from snapshots import open_bank_watcher
+
+
+def answer_floor(room, students, rng, timings):
+    n_options = len(room.counts)
+    elapsed = 0.0
+    calls = 0
+    for student in students:
+        picks = [rng.randrange(n_options)]
+        if rng.random() < 1 / 3:
+            picks.append(rng.randrange(n_options))
+        for option in picks:
+            t0 = time.perf_counter()
+            room.submit(student, option)
+            elapsed += time.perf_counter() - t0
+            calls += 1
+    timings.append((elapsed, calls))
+
+
+def poll(room, stop, timings):
+    elapsed = 0.0
+    calls = 0
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        room.snapshot()
+        elapsed += time.perf_counter() - t0
+        calls += 1
+        time.sleep(0.001)
+    timings.append((elapsed, calls))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=500)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--scenario", default="social")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    banks = open_bank_watcher(interval=0)
+    hub = ClassroomHub(banks.current, rng=random.Random(args.seed), max_students=args.students)
+    room = hub.open(args.scenario)
+    students = [f"s{i}" for i in range(args.students)]
+    for student in students:
+        room.join(student, student)
+
+    submits, polls = [], []
+    mismatches = 0
+    started = time.perf_counter()
+    room.start()
+    while True:
+        stop = threading.Event()
+        poller = threading.Thread(target=poll, args=(room, stop, polls))
+        poller.start()
+        workers = [
+            threading.Thread(target=answer_floor, args=(room, students[i::args.threads], random.Random(i), submits))
+            for i in range(args.threads)
+        ]
+        for t in workers:
+            t.start()
+        for t in workers:
+            t.join()
+        stop.set()
+        poller.join()
+
+        expected = [0] * len(room.counts)
+        for option in room.answers.values():
+            expected[option] += 1
+        mismatches += expected != room.counts or sum(room.counts) != args.students
+        room.reveal()
+        room.advance()
+        if room.stage == "finished":
+            break
+    elapsed = time.perf_counter() - started
+
+    n_submits = sum(calls for _, calls in submits)
+    n_polls = sum(calls for _, calls in polls)
+    print(f"students:      {args.students:,} over {args.threads} threads, {len(room.q_indices)} floors")
+    print(f"submits:       {n_submits:,} in {elapsed:.3f} s")
+    print(f"submit:        {sum(e for e, _ in submits) / n_submits * 1e6:.1f} µs")
+    print(f"host poll:     {sum(e for e, _ in polls) / max(n_polls, 1) * 1e6:.1f} µs ({n_polls:,} polls)")
+    print(f"floors with miscounted answers: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Offline grading throughput.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_grading --rows 1000000
+
+Generates an answer sheet of ``rows`` answers (every student answers each
+floor of one scenario once, with a few malformed rows mixed in), writes it
+as CSV and Parquet, and times reading and grading each. A sample of rows is
+checked against a plain-Python grader.
+"""
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from bank import load_bank
+from grading import AnswerKey, floor_report, grade, read_sheet, student_report
+
+
+def synthetic_sheet(layers, scenarios, n_rows, seed):
+    rng = np.random.default_rng(seed)
+    keys = np.array(list(scenarios))
+    n_students = -(-n_rows // len(layers))
+    floor = np.tile(np.arange(len(layers), dtype=np.int16), n_students)[:n_rows]
+    student = np.repeat(np.arange(n_students), len(layers))[:n_rows]
+    scenario = keys[rng.integers(len(keys), size=n_students)][student]
+    q_idx = rng.integers(2, size=n_rows, dtype=np.int16)
+    option = rng.integers(5, size=n_rows, dtype=np.int16)
+    # about 0.1% malformed rows
+    bad = rng.random(n_rows) < 0.001
+    q_idx[bad] = 99
+    return pd.DataFrame({
+        "student": pd.array([f"s{i:07d}" for i in student], dtype="string"),
+        "scenario": pd.Categorical(scenario),
+        "floor": floor,
+        "q_idx": q_idx,
+        "option": option,
+    })
+
+
+def reference_grade(scenarios, row):
+    try:
+        question = scenarios[row.scenario]["questions"][row.floor][row.q_idx]
+    except (KeyError, IndexError):
+        return None
+    return row.option == question["correct"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--sample", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    layers, scenarios = load_bank()
+    key = AnswerKey(layers, scenarios)
+    sheet = synthetic_sheet(layers, scenarios, args.rows, args.seed)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {"csv": Path(tmp) / "answers.csv", "parquet": Path(tmp) / "answers.parquet"}
+        sheet.to_csv(paths["csv"], index=False)
+        sheet.to_parquet(paths["parquet"], index=False)
+
+        print(f"rows: {args.rows:,}")
+        for fmt, path in paths.items():
+            t0 = time.perf_counter()
+            df = read_sheet(path)
+            t1 = time.perf_counter()
+            graded = grade(df, key)
+            t2 = time.perf_counter()
+            students = student_report(graded)
+            floors = floor_report(graded, key)
+            t3 = time.perf_counter()
+            print(
+                f"{fmt:<8} read {t1 - t0:5.2f} s   grade {(t2 - t1) * 1000:6.1f} ms   "
+                f"reports {(t3 - t2) * 1000:6.1f} ms   ({len(students):,} students, {len(floors)} floors)"
+            )
+
+    rows = random.Random(args.seed).sample(range(len(graded)), min(args.sample, len(graded)))
+    mismatches = 0
+    for i in rows:
+        row = graded.iloc[i]
+        expected = reference_grade(scenarios, row)
+        if (expected is None) != (not row.valid) or (expected is not None and expected != row.correct):
+            mismatches += 1
+    print(f"checked {len(rows):,} rows against the reference grader: {mismatches} mismatches")
+
+
+if __name__ == "__main__":
+    main()
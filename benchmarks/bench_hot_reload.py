@@ -0,0 +1,98 @@
+"""Cost of hot-reloading the question bank.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_hot_reload --edits 20
+
+Copies data/ to a temporary directory and edits one question ``edits``
+times, swapping in a new snapshot after each edit while every older
+snapshot is kept alive (as if a session were still pinned to each).
+Prints the cost of an idle poll and of a reload, and the memory held by
+all the snapshots with questions shared by id and, for comparison, with
+every snapshot holding its own copy. Then drops the old snapshots and
+checks that only the current one is left.
+"""
+import argparse
+import gc
+import json
+import shutil
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from bank import DATA_DIR
+from snapshots import BankWatcher
+
+
+def edit(data_dir, n):
+    # append a marker to the first question of the first scenario
+    path = next(iter(sorted((data_dir / "scenarios").glob("*.json"))))
+    raw = json.loads(path.read_text(encoding="utf-8"))
+    raw["questions"][0][0]["prompt"] += f" ({n})"
+    path.write_text(json.dumps(raw, ensure_ascii=False), encoding="utf-8")
+
+
+def run(data_dir, edits, share):
+    watcher = BankWatcher(data_dir, interval=0)
+    if not share:
+        # a new snapshot that cannot see its predecessor keeps a full copy
+        watcher._current.shared_questions = lambda key: None
+    first = watcher.current()
+    for key in first.scenarios:
+        first.scenarios[key]
+
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    pinned = [first]
+    reload_s = 0.0
+    for n in range(edits):
+        edit(data_dir, n)
+        t0 = time.perf_counter()
+        assert watcher.check()
+        reload_s += time.perf_counter() - t0
+        if not share:
+            watcher._current.shared_questions = lambda key: None
+        pinned.append(watcher.current())
+    held = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+
+    t0 = time.perf_counter()
+    for _ in range(1000):
+        watcher.check()
+    poll_s = (time.perf_counter() - t0) / 1000
+
+    live = len(watcher.live())
+    del pinned, first
+    gc.collect()
+    return {
+        "reload_ms": reload_s / edits * 1000,
+        "poll_us": poll_s * 1e6,
+        "held": held,
+        "live_before": live,
+        "live_after": len(watcher.live()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--edits", type=int, default=20)
+    args = parser.parse_args()
+
+    results = {}
+    for share in (True, False):
+        with tempfile.TemporaryDirectory() as tmp:
+            data_dir = Path(tmp) / "data"
+            shutil.copytree(DATA_DIR, data_dir)
+            results[share] = run(data_dir, args.edits, share)
+
+    shared, copied = results[True], results[False]
+    print(f"idle poll:     {shared['poll_us']:.1f} µs")
+    print(f"reload:        {shared['reload_ms']:.2f} ms per edit")
+    print(f"memory:        {shared['held'] / 1024:.0f} KiB for {args.edits} new snapshots sharing questions, "
+          f"{copied['held'] / 1024:.0f} KiB with a copy each")
+    print(f"live:          {shared['live_before']} snapshots pinned, {shared['live_after']} left after release")
+
+
+if __name__ == "__main__":
+    main()
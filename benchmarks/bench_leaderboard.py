@@ -0,0 +1,90 @@
+"""Leaderboard update and query cost under concurrent sessions.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_leaderboard --players 200000 --threads 8
+
+``threads`` workers record finished runs for ``players`` distinct players
+(some of them improving on an earlier run) while asking for their own rank
+and the top 10, like the success screen does. The board is then snapshotted
+to a temporary file, reloaded, and compared with the original.
+"""
+import argparse
+import random
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from leaderboard import Leaderboard
+
+
+def worker(board, players, rng, timings):
+    record = rank = top = 0.0
+    for player in players:
+        score = rng.randrange(10)
+        retries = rng.randrange(12)
+        seconds = rng.uniform(30, 900)
+        t0 = time.perf_counter()
+        board.record("social", player, player, score, retries, seconds)
+        t1 = time.perf_counter()
+        board.rank("social", player)
+        t2 = time.perf_counter()
+        board.top("social", 10)
+        t3 = time.perf_counter()
+        record += t1 - t0
+        rank += t2 - t1
+        top += t3 - t2
+    timings.append((record, rank, top, len(players)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--players", type=int, default=200_000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--improve", type=float, default=0.2, help="share of players who finish twice")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    runs = [f"p{i}" for i in range(args.players)]
+    runs += rng.sample(runs, int(args.players * args.improve))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "leaderboard.json"
+        board = Leaderboard(path, interval=3600)
+        timings = []
+        threads = [
+            threading.Thread(target=worker, args=(board, runs[i::args.threads], random.Random(i), timings))
+            for i in range(args.threads)
+        ]
+        started = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - started
+
+        t0 = time.perf_counter()
+        board.snapshot()
+        snapshot_s = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        reloaded = Leaderboard(path, interval=3600)
+        load_s = time.perf_counter() - t0
+        same = reloaded.top("social", args.players) == board.top("social", args.players)
+        size_kb = path.stat().st_size / 1024
+        board.close()
+        reloaded.close()
+
+    n = sum(t[3] for t in timings)
+    print(f"runs recorded:      {n:,} ({board.size('social'):,} players)")
+    print(f"elapsed:            {elapsed:.3f} s, {n / elapsed:,.0f} runs/s over {args.threads} threads")
+    print(f"record:             {sum(t[0] for t in timings) / n * 1e6:.1f} µs")
+    print(f"rank:               {sum(t[1] for t in timings) / n * 1e6:.1f} µs")
+    print(f"top 10:             {sum(t[2] for t in timings) / n * 1e6:.1f} µs")
+    print(f"snapshot:           {snapshot_s * 1000:.0f} ms, {size_kb:,.0f} KiB")
+    print(f"reload:             {load_s * 1000:.0f} ms, identical: {same}")
+
+
+if __name__ == "__main__":
+    main()
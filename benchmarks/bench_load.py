@@ -0,0 +1,278 @@
+"""Concurrent-player load benchmark for the full tower climb.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_load --players 20 --games 3 --out bench_load.json
+
+Every simulated player drives the real ``app.py`` through
+``streamlit.testing.v1.AppTest`` (and therefore the real ``main()``
+dispatch): splash -> scenario_select -> scenario_intro -> nine ``layer``
+floors -> crash/retry -> success, then back home for the next game.
+
+Paths:
+  scripted  always answers correctly, except for one deliberate crash and
+            retry per game on a fixed floor
+  random    picks a random option on every floor and retries every crash
+  mixed     alternates scripted and random players
+
+AppTest drives one script run at a time per process, so concurrency is
+simulated the way a single Streamlit server sees it: all N sessions are
+alive in the same process and their reruns are interleaved round-robin,
+one rerun per player per turn.
+
+Each rerun is timed. The report gives p50/p95/p99 latency (overall and per
+phase), reruns per second, reruns and script executions per completed
+game and peak RSS, printed
+and written as JSON to ``--out`` so numbers can be compared across releases.
+"""
+import argparse
+import json
+import platform
+import random
+import resource
+import statistics
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from streamlit.runtime.scriptrunner import ScriptRunnerEvent
+from streamlit.testing.v1 import AppTest
+from streamlit.testing.v1.local_script_runner import LocalScriptRunner
+
+from bank import load_bank
+from engine import GameEngine
+
+APP_PATH = str(Path(__file__).resolve().parent.parent / "app.py")
+CRASH_FLOOR = 4
+
+# used only to look up the right answer for the player's current question
+ENGINE = GameEngine(*load_bank())
+
+# Completed script executions, split into full-app and fragment-only
+# runs, plus runs preempted by st.rerun() before finishing. One
+# AppTest.run() can execute the script more than once, so these are
+# counted from the script runner's events.
+SCRIPT_RUNS = {"full": 0, "fragment": 0, "preempted": 0}
+_RUN_KINDS = {
+    ScriptRunnerEvent.SCRIPT_STOPPED_WITH_SUCCESS: "full",
+    ScriptRunnerEvent.FRAGMENT_STOPPED_WITH_SUCCESS: "fragment",
+    ScriptRunnerEvent.SCRIPT_STOPPED_FOR_RERUN: "preempted",
+}
+
+
+def count_script_run(sender, event, **kwargs):
+    kind = _RUN_KINDS.get(event)
+    if kind:
+        SCRIPT_RUNS[kind] += 1
+
+
+_runner_init = LocalScriptRunner.__init__
+
+
+def _counting_runner_init(self, *args, **kwargs):
+    _runner_init(self, *args, **kwargs)
+    self.on_event.connect(count_script_run, weak=False)
+
+
+LocalScriptRunner.__init__ = _counting_runner_init
+
+
+class Player:
+    def __init__(self, player_id, path, rng, timeout):
+        self.player_id = player_id
+        self.path = path
+        self.rng = rng
+        self.at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+        self.samples = []  # (phase, seconds)
+        self.games = 0
+
+    # ---------------- driving the app ----------------
+
+    @property
+    def game(self):
+        return self.at.session_state.game
+
+    def rerun(self):
+        phase = self.game.phase if "game" in self.at.session_state else "splash"
+        started = time.perf_counter()
+        self.at.run()
+        self.samples.append((phase, time.perf_counter() - started))
+        if self.at.exception:
+            raise RuntimeError(f"player {self.player_id}: {self.at.exception[0].value}")
+
+    def find(self, lookup, what):
+        # if the widget the player needs next is not on the page, the
+        # screen is stale (the state moved after it was rendered) and the
+        # player has to interact once more before it appears; count that
+        # rerun too
+        widget = lookup()
+        if widget is None:
+            self.rerun()
+            yield
+            widget = lookup()
+        if widget is None:
+            raise LookupError(f"player {self.player_id}: no {what} in phase {self.game.phase!r}")
+        return widget
+
+    def button(self, label):
+        return next((b for b in self.at.button if b.label == label), None)
+
+    def keyed_button(self, key):
+        return next((b for b in self.at.button if b.key == key), None)
+
+    def radio(self):
+        return self.at.radio[0] if len(self.at.radio) else None
+
+    # ---------------- one full game ----------------
+
+    # every driving method below is a generator that yields after each
+    # rerun, so the scheduler in main() can interleave players
+
+    def play(self, games):
+        self.rerun()
+        yield
+        for _ in range(games):
+            yield from self.play_game()
+
+    def play_game(self):
+        yield from self.click("🚀 Play")
+        key = self.rng.choice(["social", "bank"])
+        yield from self.click_key(f"pick_{key}")
+        yield from self.click("Start at Floor 1")
+
+        crashed_once = False
+        while self.game.phase != "success":
+            if self.game.phase == "crash":
+                yield from self.click("🔁 Retry this floor")
+                continue
+            question = self.current_question()
+            if self.path == "random":
+                choice = self.rng.randrange(len(question["options"]))
+            elif self.game.layer_index == CRASH_FLOOR and not crashed_once:
+                choice = (question["correct"] + 1) % len(question["options"])
+                crashed_once = True
+            else:
+                choice = question["correct"]
+            yield from self.choose(question["options"][choice])
+            yield from self.click("✅ Lock in my choice")
+            if self.game.phase == "layer":
+                yield from self.click("➡️ Continue to next floor")
+
+        yield from self.click("🏠 Back to home")
+        self.games += 1
+
+    def current_question(self):
+        return ENGINE.question(self.game)
+
+    def choose(self, label):
+        radio = yield from self.find(self.radio, "radio")
+        if radio.value != label:
+            radio.set_value(label)
+            # outside a form every pick is a rerun; inside one it waits
+            # for the submit button
+            if not radio.proto.form_id:
+                self.rerun()
+                yield
+
+    def click(self, label):
+        button = yield from self.find(lambda: self.button(label), f"{label!r} button")
+        button.click()
+        self.rerun()
+        yield
+
+    def click_key(self, key):
+        button = yield from self.find(lambda: self.keyed_button(key), f"{key!r} button")
+        button.click()
+        self.rerun()
+        yield
+
+
+def percentiles(seconds):
+    if len(seconds) < 2:
+        value = seconds[0] * 1000 if seconds else 0.0
+        return {"p50": value, "p95": value, "p99": value, "mean": value, "max": value}
+    cuts = statistics.quantiles(seconds, n=100, method="inclusive")
+    return {
+        "p50": cuts[49] * 1000,
+        "p95": cuts[94] * 1000,
+        "p99": cuts[98] * 1000,
+        "mean": statistics.fmean(seconds) * 1000,
+        "max": max(seconds) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--players", type=int, default=10)
+    parser.add_argument("--games", type=int, default=2, help="games per player")
+    parser.add_argument("--path", choices=["scripted", "random", "mixed"], default="mixed")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-rerun timeout in seconds")
+    parser.add_argument("--out", default="bench_load.json")
+    args = parser.parse_args()
+
+    paths = {
+        "scripted": ["scripted"],
+        "random": ["random"],
+        "mixed": ["scripted", "random"],
+    }[args.path]
+
+    players = [
+        Player(i, paths[i % len(paths)], random.Random(args.seed * 100_003 + i), args.timeout)
+        for i in range(args.players)
+    ]
+    running = [p.play(args.games) for p in players]
+    started = time.perf_counter()
+    while running:
+        for turn in list(running):
+            try:
+                next(turn)
+            except StopIteration:
+                running.remove(turn)
+    elapsed = time.perf_counter() - started
+
+    samples = [s for p in players for s in p.samples]
+    seconds = [s for _, s in samples]
+    by_phase = {}
+    for phase, s in samples:
+        by_phase.setdefault(phase, []).append(s)
+    games = sum(p.games for p in players)
+
+    report = {
+        "benchmark": "bench_load",
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "config": vars(args),
+        "games_completed": games,
+        "reruns": len(seconds),
+        "reruns_per_game": len(seconds) / games if games else None,
+        "script_runs": dict(SCRIPT_RUNS),
+        "script_runs_per_game": (SCRIPT_RUNS["full"] + SCRIPT_RUNS["fragment"]) / games if games else None,
+        "elapsed_s": elapsed,
+        "reruns_per_s": len(seconds) / elapsed,
+        "latency_ms": percentiles(seconds),
+        "latency_ms_by_phase": {phase: percentiles(v) for phase, v in sorted(by_phase.items())},
+        # ru_maxrss is reported in KiB on Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+    lat = report["latency_ms"]
+    print(f"players: {args.players}  games: {games}  reruns: {report['reruns']}")
+    print(f"reruns / s:      {report['reruns_per_s']:.1f}")
+    print(f"reruns / game:   {report['reruns_per_game']:.1f}")
+    print(
+        f"script runs / game: {report['script_runs_per_game']:.1f}"
+        f"  (full {SCRIPT_RUNS['full']}, fragment {SCRIPT_RUNS['fragment']},"
+        f" preempted {SCRIPT_RUNS['preempted']})"
+    )
+    print(f"latency ms:      p50 {lat['p50']:.2f}  p95 {lat['p95']:.2f}  p99 {lat['p99']:.2f}")
+    print(f"peak RSS:        {report['peak_rss_mb']:.1f} MiB")
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
+    print(f"wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
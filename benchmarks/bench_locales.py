@@ -0,0 +1,65 @@
+"""Memory and first-use cost of locale packs.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_locales --locales 10
+
+Installs ``locales`` packs in a temporary directory (copies of the
+Spanish pack), then measures with tracemalloc how much memory the
+translated banks hold as players start using one, two, ... of them, and
+how long the first and a repeated lookup of a translated scenario take.
+"""
+import argparse
+import shutil
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from bank import load_bank
+from locales import LOCALE_DIR, Locales
+
+
+def touch(locales, locale):
+    # what the first player in a locale does: catalog, tower, every scenario
+    layers, scenarios = locales.bank(locale)
+    for key in scenarios:
+        scenarios[key]["questions"]
+    return layers
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--locales", type=int, default=10)
+    args = parser.parse_args()
+
+    layers, scenarios = load_bank()
+    for key in scenarios:
+        scenarios[key]["questions"]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        names = [f"x{i:02d}" for i in range(args.locales)]
+        for name in names:
+            shutil.copy(LOCALE_DIR / "es.json", Path(tmp) / f"{name}.json")
+
+        tracemalloc.start()
+        base = tracemalloc.get_traced_memory()[0]
+        locales = Locales(layers, scenarios, tmp)
+        print(f"installed:     {len(locales.installed) - 1} packs, {tracemalloc.get_traced_memory()[0] - base:,} bytes before use")
+        for n, name in enumerate(names, 1):
+            t0 = time.perf_counter()
+            touch(locales, name)
+            first_ms = (time.perf_counter() - t0) * 1000
+            if n in (1, 2, len(names)):
+                held = tracemalloc.get_traced_memory()[0] - base
+                print(f"in use: {n:>2}     {held / 1024:>7.0f} KiB held, first use {first_ms:.1f} ms")
+        tracemalloc.stop()
+
+        t0 = time.perf_counter()
+        for _ in range(10_000):
+            locales.bank(names[0])[1]["social"]["questions"]
+        print(f"warm lookup:   {(time.perf_counter() - t0) / 10_000 * 1e6:.2f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Run token size and bulk replay throughput.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_replay --games 20000 --selection random
+
+Plays ``games`` simulated runs (as in bench_engine), keeps each run's token,
+then replays every token and checks that the replay ends in exactly the same
+state: phase, floor, score, misses and question indices.
+"""
+import argparse
+import random
+import time
+
+from bank import load_bank
+from benchmarks.bench_engine import play_game
+from engine import GameEngine
+from runtoken import replay
+from selection import open_selector
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--games", type=int, default=20_000)
+    parser.add_argument("--accuracy", type=float, default=0.7)
+    parser.add_argument("--selection", choices=["random", "adaptive"], default="random")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    layers, scenarios = load_bank()
+    rng = random.Random(args.seed)
+    engine = GameEngine(layers, scenarios, rng=rng, selector=open_selector(args.selection))
+    keys = list(scenarios)
+
+    played = []
+    for i in range(args.games):
+        state = engine.new_state()
+        play_game(engine, state, keys[i % len(keys)], args.accuracy, rng)
+        played.append((engine.run_token(state), state))
+
+    mismatches = 0
+    started = time.perf_counter()
+    for token, expected in played:
+        got = replay(engine, token)
+        if (got.phase, got.layer_index, got.score, got.misses, got.current_q_indices) != (
+            expected.phase, expected.layer_index, expected.score, expected.misses, expected.current_q_indices
+        ):
+            mismatches += 1
+    elapsed = time.perf_counter() - started
+
+    lengths = sorted(len(token) for token, _ in played)
+    print(f"selection:     {args.selection}")
+    print(f"games:         {args.games}")
+    print(f"token chars:   median {lengths[len(lengths) // 2]}, max {lengths[-1]}")
+    print(f"example:       {played[0][0]}")
+    print(f"replays / s:   {args.games / elapsed:,.0f}")
+    print(f"mismatches:    {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Review deck scheduling and packing cost.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_review --cards 50000 --days 365
+
+Adds ``cards`` missed questions to one deck, then simulates ``days`` days
+of daily review sessions: every due card is drawn in due order and graded
+(correct 80% of the time). Prints the cost per scheduling call, the number
+of reviews, and the packed size of the final deck.
+"""
+import argparse
+import random
+import time
+
+from review import DAY, Deck
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cards", type=int, default=50_000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--correct", type=float, default=0.8)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    deck = Deck()
+    now = 1_700_000_000
+    t0 = time.perf_counter()
+    for i in range(args.cards):
+        deck.miss((f"scenario{i % 40}", i % 9, f"{i:016x}"), now)
+    miss_s = time.perf_counter() - t0
+
+    reviews = 0
+    draw_s = grade_s = 0.0
+    for day in range(1, args.days + 1):
+        today = now + day * DAY
+        while True:
+            t0 = time.perf_counter()
+            card = deck.next_due(today)
+            t1 = time.perf_counter()
+            draw_s += t1 - t0
+            if card is None:
+                break
+            deck.grade(card, 4 if rng.random() < args.correct else 1, today)
+            grade_s += time.perf_counter() - t1
+            reviews += 1
+
+    t0 = time.perf_counter()
+    data = deck.pack()
+    pack_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    same = Deck.unpack(data)._cards == deck._cards
+    unpack_s = time.perf_counter() - t0
+
+    print(f"cards:         {len(deck):,}")
+    print(f"reviews:       {reviews:,} over {args.days} days")
+    print(f"miss:          {miss_s / args.cards * 1e6:.2f} µs")
+    print(f"next due:      {draw_s / (reviews + args.days) * 1e6:.2f} µs")
+    print(f"grade:         {grade_s / max(reviews, 1) * 1e6:.2f} µs")
+    print(f"packed:        {len(data):,} bytes ({len(data) / len(deck):.1f} per card)")
+    print(f"pack / unpack: {pack_s * 1000:.1f} ms / {unpack_s * 1000:.1f} ms, identical: {same}")
+
+
+if __name__ == "__main__":
+    main()
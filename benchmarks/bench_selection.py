@@ -0,0 +1,52 @@
+"""Cost of one adaptive question pick as the pool grows.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_selection --picks 200000
+
+For pools of 10 to 1000 questions per floor, simulated players of random
+ability answer questions of random true difficulty (Rasch model). The
+benchmark reports the time of one pick+record round trip and how far
+the served difficulty tracked the player's ability, for the adaptive
+and the random selector.
+"""
+import argparse
+import math
+import random
+import statistics
+import time
+
+from selection import AdaptiveSelector, Pool, RandomSelector
+
+
+def simulate(selector, n_questions, picks, rng):
+    true_difficulty = [rng.gauss(0, 1.5) for _ in range(n_questions)]
+    pool = Pool(f"q{i}" for i in range(n_questions))
+    gaps = []
+    started = time.perf_counter()
+    for _ in range(picks):
+        player = rng.gauss(0, 1.5)
+        q_idx = selector.pick("bench", 0, pool, player, -1, rng)
+        correct = rng.random() < 1 / (1 + math.exp(true_difficulty[q_idx] - player))
+        selector.record("bench", 0, pool[q_idx], correct)
+        gaps.append(abs(true_difficulty[q_idx] - player))
+    elapsed = time.perf_counter() - started
+    # judge the last half, once the statistics have warmed up
+    return elapsed / picks, statistics.fmean(gaps[picks // 2:])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--picks", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'pool':>6} {'selector':<10} {'µs / pick':>10} {'|difficulty - ability|':>24}")
+    for n_questions in (10, 100, 1000):
+        for name, selector in (("adaptive", AdaptiveSelector()), ("random", RandomSelector())):
+            seconds, gap = simulate(selector, n_questions, args.picks, random.Random(args.seed))
+            print(f"{n_questions:>6} {name:<10} {seconds * 1e6:>10.2f} {gap:>24.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Per-session memory of the game state, old layout vs GameState.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_session_memory --sessions 5000
+
+Both layouts are measured for a player who crashed on floor 5, the
+state that used to carry the most text. Two numbers are reported:
+
+  retained  bytes owned by the session itself, i.e. everything reachable
+            from its state that is not shared with the question bank
+  pickled   bytes of the serialized state, what a copy of the session
+            state (or any external store) has to hold
+"""
+import argparse
+import gc
+import pickle
+import sys
+
+from bank import load_bank
+from engine import GameEngine
+
+CRASH_FLOOR = 4
+
+
+def reachable(roots):
+    seen = {}
+    stack = list(roots)
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, type):
+            continue
+        seen[id(obj)] = obj
+        stack.extend(gc.get_referents(obj))
+    return seen
+
+
+def retained_bytes(root, shared):
+    return sum(sys.getsizeof(o) for i, o in reachable([root]).items() if i not in shared)
+
+
+def crashed_state(engine, key):
+    state = engine.new_state()
+    engine.start(state, key)
+    engine.enter_tower(state)
+    while state.layer_index < CRASH_FLOOR:
+        engine.answer(state, engine.question(state)["correct"])
+        engine.continue_floor(state)
+    question = engine.question(state)
+    engine.answer(state, (question["correct"] + 1) % len(question["options"]))
+    return state
+
+
+def legacy_session(engine, state):
+    # the ten st.session_state keys the app used to keep per session
+    return {
+        "phase": state.phase,
+        "scenario_key": state.scenario_key,
+        "layer_index": state.layer_index,
+        "score": state.score,
+        "crashed": True,
+        "crash_reason": engine.crash_reason(state),
+        "crash_layer_name": engine.crash_layer_name(state),
+        "feedback_text": "",
+        "feedback_for_layer": -1,
+        "current_q_indices": {i: engine.question_index(state, i) for i in range(state.layer_index + 1)},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=5000, help="sessions to project totals for")
+    parser.add_argument("--scenario", default="social")
+    args = parser.parse_args()
+
+    layers, scenarios = load_bank()
+    engine = GameEngine(layers, scenarios)
+    state = crashed_state(engine, args.scenario)
+
+    # the bank, the phase names and small ints are shared by every session
+    shared = reachable([layers, scenarios, *GameEngine.__dict__.values()])
+    shared.update((id(i), i) for i in range(-5, 257))
+
+    rows = [
+        ("legacy: ten session_state keys", legacy_session(engine, state)),
+        ("GameState", state),
+    ]
+
+    print(f"{'layout':<32} {'retained':>10} {'pickled':>10} {f'x{args.sessions} retained':>18}")
+    for label, root in rows:
+        retained = retained_bytes(root, shared)
+        pickled = len(pickle.dumps(root, protocol=pickle.HIGHEST_PROTOCOL))
+        total = retained * args.sessions / 1024 / 1024
+        print(f"{label:<32} {retained:>8} B {pickled:>8} B {total:>14.2f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Session store round trips and latency per backend.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_sessions --games 2000
+
+Plays ``games`` simulated runs (as in bench_engine) and saves the packed
+position after every decision the way app.py does: only when it changed
+since the last write. Half-way through every run the session "reconnects"
+and restores its game from the store. Covers the memory and SQLite stores
+and the Redis store against the in-process RESP stand-in.
+"""
+import argparse
+import random
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+from bank import load_bank
+from engine import GameEngine
+from resume import ResumeCodec
+from sessions import MemoryStore, RedisStore, RespServer, SQLiteStore
+
+
+def run(store, engine, codec, games, accuracy, rng):
+    keys = list(engine.scenarios)
+    decisions = reruns = restores = 0
+    put_s = get_s = 0.0
+    for i in range(games):
+        game = engine.new_state(session_id=uuid.uuid4().hex[:12])
+        engine.start(game, keys[i % len(keys)])
+        # every other run is timed: its floor timer must survive a restore
+        engine.enter_tower(game, 30 if i % 2 else 0)
+        saved = None
+        while game.phase != "success":
+            question = engine.question(game)
+            if rng.random() < accuracy:
+                choice = question["correct"]
+            else:
+                choice = (question["correct"] + 1) % len(question["options"])
+            if engine.answer(game, choice):
+                engine.continue_floor(game)
+            else:
+                engine.retry_floor(game)
+            decisions += 1
+            # two reruns per decision: the click, then an idle rerun
+            for _ in range(2):
+                reruns += 1
+                data = codec.pack(game, engine)
+                if data != saved:
+                    t0 = time.perf_counter()
+                    store.put(game.session_id, data)
+                    put_s += time.perf_counter() - t0
+                    saved = data
+            if decisions % 10 == 5:
+                t0 = time.perf_counter()
+                restored = codec.unpack(store.get(game.session_id), engine)
+                get_s += time.perf_counter() - t0
+                restores += 1
+                if game.time_limit:
+                    assert restored.floor_started_at == game.floor_started_at
+                else:
+                    # an untimed floor's think time restarts on reconnect
+                    assert restored.floor_started_at >= game.floor_started_at
+                    restored.floor_started_at = game.floor_started_at
+                assert codec.pack(restored, engine) == saved
+    puts = store.round_trips - restores
+    return {
+        "reruns": reruns,
+        "round_trips_per_rerun": store.round_trips / reruns,
+        "put_us": put_s / puts * 1e6,
+        "get_us": get_s / restores * 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--games", type=int, default=2000)
+    parser.add_argument("--accuracy", type=float, default=0.7)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    engine = GameEngine(*load_bank(), rng=random.Random(args.seed))
+    codec = ResumeCodec(b"bench")
+    server = RespServer().start()
+    with tempfile.TemporaryDirectory() as tmp:
+        stores = {
+            "memory": MemoryStore(),
+            "sqlite": SQLiteStore(Path(tmp) / "sessions.db"),
+            "redis (stand-in)": RedisStore(server.url),
+        }
+        print(f"{'store':<18} {'round trips/rerun':>18} {'put µs':>8} {'get µs':>8}")
+        for name, store in stores.items():
+            r = run(store, engine, codec, args.games, args.accuracy, random.Random(args.seed))
+            print(f"{name:<18} {r['round_trips_per_rerun']:>18.2f} {r['put_us']:>8.1f} {r['get_us']:>8.1f}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
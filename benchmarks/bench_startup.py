@@ -0,0 +1,122 @@
+"""Cold-start profile: import time and time to first render.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_startup --runs 3
+
+1. Import-time breakdown of what app.py imports (python -X importtime),
+   summed per top-level package, plus the heavy optional packages that a
+   plain import already pulls in (should be none).
+2. Time to first render of a fresh server process, started either as
+   `streamlit run app.py` (cold) or `python serve.py` (warm-up first):
+     ready   process start until /_stcore/health answers
+     first   first page render over the websocket, as a browser does it
+     second  a second session's render, for comparison
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from collections import defaultdict
+
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from websockets.sync.client import connect
+
+APP_IMPORTS = "import streamlit, resources, instrument, catalog"
+HEAVY = ("pandas", "numpy", "pyarrow", "altair", "pydeck")
+
+
+def import_profile(top):
+    probe = f"{APP_IMPORTS}; import sys; print(','.join(m for m in {HEAVY!r} if m in sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe], capture_output=True, text=True, check=True
+    )
+    per_package = defaultdict(int)
+    for line in result.stderr.splitlines():
+        # "import time: <self us> | <cumulative us> | <indented module>"
+        if not line.startswith("import time:"):
+            continue
+        self_us, _, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        if not self_us.isdigit():
+            continue
+        per_package[name.split(".")[0]] += int(self_us)
+    total = sum(per_package.values())
+    print(f"imports of app.py: {total / 1000:.0f} ms")
+    for name, us in sorted(per_package.items(), key=lambda kv: -kv[1])[:top]:
+        print(f"  {name:<24} {us / 1000:>7.1f} ms")
+    heavy = result.stdout.strip()
+    print(f"heavy packages imported: {heavy or 'none'}")
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def render(port):
+    with connect(f"ws://127.0.0.1:{port}/_stcore/stream") as ws:
+        msg = BackMsg()
+        msg.rerun_script.query_string = ""
+        ws.send(msg.SerializeToString())
+        while True:
+            forward = ForwardMsg()
+            forward.ParseFromString(ws.recv(timeout=60))
+            if forward.WhichOneof("type") == "script_finished":
+                return
+
+
+def time_to_first_render(command, timeout):
+    port = free_port()
+    env = {**os.environ, "CLOUD_TOWER_EVENT_LOG": "off", "CLOUD_TOWER_LEADERBOARD": "off"}
+    args = [*command, "--server.headless", "true", "--server.port", str(port), "--browser.gatherUsageStats", "false"]
+    started = time.perf_counter()
+    proc = subprocess.Popen(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=env)
+    try:
+        while True:
+            if time.perf_counter() - started > timeout:
+                raise TimeoutError(f"{' '.join(command)} did not become healthy")
+            try:
+                urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=0.5).read()
+                break
+            except OSError:
+                time.sleep(0.01)
+        ready = time.perf_counter()
+        render(port)
+        first = time.perf_counter()
+        render(port)
+        second = time.perf_counter()
+    finally:
+        proc.terminate()
+        proc.wait()
+    return ready - started, first - ready, second - first
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=8)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+
+    import_profile(args.top)
+
+    modes = {
+        "streamlit run": [sys.executable, "-m", "streamlit", "run", "app.py"],
+        "serve.py": [sys.executable, "serve.py"],
+    }
+    print()
+    print(f"{'median of ' + str(args.runs):<16} {'ready':>8} {'first':>8} {'ready+first':>12} {'second':>8}")
+    for name, command in modes.items():
+        runs = [time_to_first_render(command, args.timeout) for _ in range(args.runs)]
+        ready, first, second = (statistics.median(r[i] for r in runs) for i in range(3))
+        print(f"{name:<16} {ready * 1000:>6.0f}ms {first * 1000:>6.0f}ms {(ready + first) * 1000:>10.0f}ms {second * 1000:>6.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
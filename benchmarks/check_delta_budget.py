@@ -0,0 +1,101 @@
+"""Check the elements and bytes each screen sends per rerun against a budget.
+
+Run from the repository root (exits 1 when a budget is exceeded):
+
+    python -m benchmarks.check_delta_budget
+    python -m benchmarks.check_delta_budget --update   # rewrite the budget
+
+Plays every scenario through AppTest with delta metering on (one crash and
+retry, then straight to the top), prints the per-screen maxima and checks
+them against benchmarks/delta_budget.json. --update writes the measured
+maxima plus ``--headroom`` into the budget file instead.
+tests/test_delta_budget.py runs the same check under pytest.
+"""
+import argparse
+import json
+import math
+import os
+import sys
+from pathlib import Path
+
+os.environ["CLOUD_TOWER_METER"] = "1"
+os.environ.setdefault("CLOUD_TOWER_EVENT_LOG", "off")
+os.environ.setdefault("CLOUD_TOWER_LEADERBOARD", "off")
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from bank import load_bank  # noqa: E402
+from engine import GameEngine  # noqa: E402
+from instrument import get_meter  # noqa: E402
+
+APP_PATH = str(Path(__file__).resolve().parent.parent / "app.py")
+BUDGET_PATH = Path(__file__).with_name("delta_budget.json")
+
+
+def play(key, engine, crash_floor=2, timeout=30):
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout).run()
+    at.button[0].click().run()
+    at.button(key=f"pick_{key}").click().run()
+    at.button[0].click().run()
+    crashed = False
+    while True:
+        game = at.session_state.game
+        if game.phase == "success":
+            return
+        if game.phase == "crash":
+            at.button[0].click().run()
+        elif game.answered:
+            at.button[0].click().run()
+        else:
+            q = engine.question(game)
+            choice = q["correct"]
+            if game.layer_index == crash_floor and not crashed:
+                choice = (choice + 1) % len(q["options"])
+                crashed = True
+            at.radio[0].set_value(at.radio[0].options[choice])
+            at.button[0].click().run()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget", type=Path, default=BUDGET_PATH)
+    parser.add_argument("--update", action="store_true")
+    parser.add_argument("--headroom", type=float, default=0.15)
+    args = parser.parse_args()
+
+    engine = GameEngine(*load_bank())
+    for key in engine.scenarios:
+        play(key, engine)
+
+    meter = get_meter()
+    budgets = json.loads(args.budget.read_text()) if args.budget.exists() else {}
+    print(f"{'name':<22} {'phase':<16} {'reruns':>6} {'max elements':>13} {'max bytes':>10}")
+    worst = {}
+    for row in meter.report():
+        print(f"{row['name']:<22} {row['phase']:<16} {row['reruns']:>6} {row['max_elements']:>13} {row['max_bytes']:>10}")
+        w = worst.setdefault(row["name"], {"elements": 0, "bytes": 0})
+        w["elements"] = max(w["elements"], row["max_elements"])
+        w["bytes"] = max(w["bytes"], row["max_bytes"])
+
+    if args.update:
+        budgets = {
+            name: {metric: math.ceil(value * (1 + args.headroom)) for metric, value in w.items()}
+            for name, w in sorted(worst.items())
+            if name.startswith("screen_") or name == "rerun"
+        }
+        args.budget.write_text(json.dumps(budgets, indent=2) + "\n")
+        print(f"wrote {args.budget}")
+        return 0
+
+    problems = meter.overruns(budgets)
+    if problems:
+        print("\nFAIL: delta budget exceeded")
+        for problem in problems:
+            print(f"  {problem}")
+        return 1
+    print(f"\nOK: within {args.budget.name}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
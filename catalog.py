@@ -0,0 +1,68 @@
+import bisect
+import re
+
+# --------------------------------------------------
+# SCENARIO CATALOG
+# Search and tag filtering over scenario metadata only (title, tagline,
+# intro, tags). Everything is precomputed once per process:
+#   - an inverted index: term -> frozenset of scenario keys
+#   - a sorted vocabulary, so a query word matches every indexed term it
+#     is a prefix of with two bisects
+#   - tag -> frozenset of scenario keys
+# Results keep the order of data/index.json.
+# --------------------------------------------------
+
+PER_PAGE = 6
+
+_WORD = re.compile(r"\w+")
+
+
+def tokenize(text):
+    return _WORD.findall(text.lower())
+
+
+class Catalog:
+    def __init__(self, meta):
+        self.meta = {m["key"]: m for m in meta}
+        self.order = tuple(self.meta)
+
+        postings = {}
+        by_tag = {}
+        for m in meta:
+            text = " ".join([m["title"], m["tagline"], m["intro"], *m["tags"]])
+            for term in set(tokenize(text)):
+                postings.setdefault(term, set()).add(m["key"])
+            for tag in m["tags"]:
+                by_tag.setdefault(tag, set()).add(m["key"])
+
+        self._postings = {term: frozenset(keys) for term, keys in postings.items()}
+        self._vocabulary = tuple(sorted(self._postings))
+        self._by_tag = {tag: frozenset(keys) for tag, keys in by_tag.items()}
+        self.tags = tuple(sorted(self._by_tag))
+
+    def _matching(self, word):
+        lo = bisect.bisect_left(self._vocabulary, word)
+        hi = bisect.bisect_left(self._vocabulary, word + "\uffff", lo)
+        keys = set()
+        for term in self._vocabulary[lo:hi]:
+            keys |= self._postings[term]
+        return keys
+
+    def search(self, text="", tags=()):
+        # every query word (as a prefix) and every tag must match
+        selected = None
+        for tag in tags:
+            keys = self._by_tag.get(tag, frozenset())
+            selected = set(keys) if selected is None else selected & keys
+        for word in tokenize(text):
+            keys = self._matching(word)
+            selected = keys if selected is None else selected & keys
+        if selected is None:
+            return self.order
+        return tuple(k for k in self.order if k in selected)
+
+
+def paginate(keys, page, per_page=PER_PAGE):
+    n_pages = max(1, -(-len(keys) // per_page))
+    page = min(max(page, 0), n_pages - 1)
+    return keys[page * per_page:(page + 1) * per_page], page, n_pages
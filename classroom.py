@@ -0,0 +1,211 @@
+import secrets
+import threading
+import time
+
+# --------------------------------------------------
+# CLASSROOM
+# Instructor-hosted rooms in which a whole class answers the same floor
+# of one scenario at the same time. The hub is shared by every session
+# of the process (see resources.get_classroom_hub).
+#
+# A room moves through
+#   lobby -> question -> reveal -> question -> ... -> finished
+# and only its host (whoever holds `host_key`) moves it on. Every room
+# picks one question per floor when it is opened, so all students see
+# the same question, and keeps the bank snapshot it was opened on (see
+# snapshots.py) until it is closed or dropped: a reload of the bank
+# never changes a class in progress.
+#
+# A student's answer is one dict lookup and two counter updates under
+# the room's lock: O(1) whatever the size of the class. Students may
+# change their answer until the host reveals it; the old option's
+# counter is decremented. The host's view reads the counters
+# (O(options)) from a polling fragment; nothing is pushed to the
+# students' sessions. Each student session polls `step`, a counter the
+# host's actions bump, and reruns itself only when it changed.
+# --------------------------------------------------
+
+MAX_STUDENTS = 500
+# seconds between the polls of the host's view and the students' screens
+POLL_SECONDS = 2
+# rooms nobody touched for this long are dropped when a new one opens
+IDLE_SECONDS = 6 * 3600
+CODE_ALPHABET = "ABCDEFGHJKLMNPQRSTUVWXYZ23456789"
+CODE_LENGTH = 5
+
+
+class RoomFull(Exception):
+    pass
+
+
+class Room:
+    def __init__(self, code, bank, scenario_key, q_indices, n_options, max_students=MAX_STUDENTS, clock=time.time):
+        self.code = code
+        self.bank = bank
+        self.scenario_key = scenario_key
+        # the question of each floor, and its number of options
+        self.q_indices = tuple(q_indices)
+        self.n_options = tuple(n_options)
+        self.max_students = max_students
+        self.host_key = secrets.token_urlsafe(16)
+        self.clock = clock
+        self.stage = "lobby"
+        self.floor = 0
+        # bumped by every host action; students rerun when it changes
+        self.step = 0
+        self.touched_at = clock()
+        # student id -> display name
+        self.students = {}
+        # the current floor: student id -> option, and picks per option
+        self.answers = {}
+        self.counts = [0] * self.n_options[0]
+        # finished floors: (answers, counts)
+        self.history = []
+        self._lock = threading.Lock()
+
+    # ---------------- students ----------------
+
+    def join(self, student, name):
+        with self._lock:
+            if student not in self.students and len(self.students) >= self.max_students:
+                raise RoomFull(f"room {self.code} is full ({self.max_students} students)")
+            self.students[student] = name
+            self.touched_at = self.clock()
+
+    def leave(self, student):
+        # an open answer is withdrawn; once revealed it stays counted, so
+        # the floor's answers and counts (and its history) keep matching
+        with self._lock:
+            self.students.pop(student, None)
+            if self.stage == "question":
+                option = self.answers.pop(student, None)
+                if option is not None:
+                    self.counts[option] -= 1
+
+    def submit(self, student, option):
+        # True when the answer was taken; only while a question is open
+        with self._lock:
+            if self.stage != "question" or student not in self.students:
+                return False
+            if not 0 <= option < len(self.counts):
+                raise ValueError(f"option {option} out of range")
+            old = self.answers.get(student)
+            if old is not None:
+                self.counts[old] -= 1
+            self.answers[student] = option
+            self.counts[option] += 1
+            return True
+
+    def answer_of(self, student, floor=None):
+        # the option the student picked on a floor, or None
+        if floor is None or floor == self.floor:
+            return self.answers.get(student)
+        if floor < len(self.history):
+            return self.history[floor][0].get(student)
+        return None
+
+    # ---------------- host ----------------
+
+    def start(self):
+        self._move("lobby", "question")
+
+    def reveal(self):
+        self._move("question", "reveal")
+
+    def advance(self):
+        with self._lock:
+            self._expect("reveal")
+            self.history.append((self.answers, self.counts))
+            if self.floor + 1 < len(self.q_indices):
+                self.floor += 1
+                self.answers = {}
+                self.counts = [0] * self.n_options[self.floor]
+                self.stage = "question"
+            else:
+                self.stage = "finished"
+            self._bump()
+
+    def finish(self):
+        with self._lock:
+            self.stage = "finished"
+            self._bump()
+
+    def _move(self, expected, stage):
+        with self._lock:
+            self._expect(expected)
+            self.stage = stage
+            self._bump()
+
+    def _expect(self, stage):
+        if self.stage != stage:
+            raise ValueError(f"room {self.code} is in stage {self.stage!r}, expected {stage!r}")
+
+    def _bump(self):
+        self.step += 1
+        self.touched_at = self.clock()
+
+    # ---------------- queries ----------------
+
+    def snapshot(self):
+        # what the host's view shows, read consistently: O(options)
+        with self._lock:
+            return {
+                "stage": self.stage,
+                "floor": self.floor,
+                "step": self.step,
+                "students": len(self.students),
+                "answered": len(self.answers),
+                "counts": tuple(self.counts),
+            }
+
+    def floor_history(self):
+        # (floor, counts) of every finished floor
+        with self._lock:
+            return [(floor, tuple(counts)) for floor, (_, counts) in enumerate(self.history)]
+
+
+class ClassroomHub:
+    # `current_bank` returns the snapshot new rooms are opened on
+    def __init__(self, current_bank, rng=None, max_students=MAX_STUDENTS, clock=time.time):
+        self.current_bank = current_bank
+        self.rng = rng or secrets.SystemRandom()
+        self.max_students = max_students
+        self.clock = clock
+        self._rooms = {}
+        self._lock = threading.Lock()
+
+    def open(self, scenario_key):
+        bank = self.current_bank()
+        questions = bank.scenarios[scenario_key]["questions"]
+        q_indices = [self.rng.randrange(len(q_list)) for q_list in questions]
+        n_options = [len(q_list[q_idx]["options"]) for q_list, q_idx in zip(questions, q_indices)]
+        with self._lock:
+            self._prune()
+            code = self._new_code()
+            room = Room(code, bank, scenario_key, q_indices, n_options, self.max_students, self.clock)
+            self._rooms[code] = room
+        return room
+
+    def get(self, code):
+        return self._rooms.get(code.strip().upper()) if code else None
+
+    def close(self, code, host_key):
+        with self._lock:
+            room = self._rooms.get(code)
+            if room is not None and secrets.compare_digest(room.host_key, host_key):
+                del self._rooms[code]
+                room.finish()
+
+    def __len__(self):
+        return len(self._rooms)
+
+    def _new_code(self):
+        while True:
+            code = "".join(self.rng.choice(CODE_ALPHABET) for _ in range(CODE_LENGTH))
+            if code not in self._rooms:
+                return code
+
+    def _prune(self):
+        cutoff = self.clock() - IDLE_SECONDS
+        for code in [code for code, room in self._rooms.items() if room.touched_at < cutoff]:
+            del self._rooms[code]
@@ -0,0 +1,406 @@
+import random
+import time
+from array import array
+
+import runtoken
+from selection import Pool, RandomSelector, ability
+
+# --------------------------------------------------
+# GAME ENGINE
+# Pure-Python game rules, independent of Streamlit. The screens in
+# app.py render a GameState and call the transitions below when the
+# player clicks something; simulations drive the same engine directly.
+#
+# Phases: splash -> scenario_select -> scenario_intro -> layer
+#         -> crash (retry) / success
+#
+# An optional listener receives one flat event dict per player decision
+# (start, answer, timeout, retry, replay, success); see EVENT_FIELDS.
+# An event names its question both by position (q_idx, in the bank
+# snapshot the run is pinned to) and by id (question, see bank.py),
+# which stays valid when a reload moves or removes questions.
+#
+# A run entered with a time limit is an "incident response" run: each
+# floor must be answered within time_limit seconds of being shown, as
+# measured by the engine's clock against floor_started_at (never by the
+# client), plus TIMER_GRACE for the round trip. A late answer is a
+# crash; a correct one earns POINTS_CORRECT plus up to POINTS_SPEED for
+# the time left.
+#
+# Every run gets its own seed. The n-th question of a run is drawn from
+# RunRandom((seed, n)) rather than a shared RNG, and each answer is
+# appended to the run's trail, so runtoken.replay() can rebuild a whole
+# run from the token returned by run_token().
+# --------------------------------------------------
+
+EVENT_FIELDS = ("ts", "kind", "session", "scenario", "floor", "q_idx", "question", "option", "correct", "think_ms")
+
+# marks a floor whose question has not been picked yet
+NO_QUESTION = 0xFFFF
+
+_MASK64 = (1 << 64) - 1
+_GOLDEN64 = 0x9E3779B97F4A7C15
+
+TIMER_GRACE = 1.0
+POINTS_CORRECT = 100
+POINTS_SPEED = 100
+TIMEOUT_REASON = (
+    "Time ran out before a decision was locked in. During an incident, "
+    "not deciding is a decision too – and usually the most expensive one."
+)
+
+
+def _mix64(x):
+    # splitmix64 output function
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return x ^ (x >> 31)
+
+
+class RunRandom:
+    # splitmix64: a throwaway, cheaply seeded generator with the part of
+    # random.Random's interface the selectors use; constructing a
+    # random.Random per pick costs more than the rest of a turn
+    __slots__ = ("_x",)
+
+    def __init__(self, seed):
+        self._x = seed & _MASK64
+
+    def _next(self):
+        self._x = x = (self._x + _GOLDEN64) & _MASK64
+        return _mix64(x)
+
+    def random(self):
+        return (self._next() >> 11) * (1.0 / (1 << 53))
+
+    def randrange(self, n):
+        return (self._next() * n) >> 64
+
+
+class GameState:
+    # The whole per-session game lives in these slots. Questions are
+    # referenced by (scenario_key, floor, question index) and never
+    # copied: feedback and crash texts are looked up in the bank when a
+    # screen needs them.
+    __slots__ = (
+        "session_id",
+        "phase",
+        "scenario_key",
+        "layer_index",
+        "score",
+        "answered",
+        "misses",
+        "current_q_indices",
+        "floor_started_at",
+        "run_started_at",
+        "run_seconds",
+        "time_limit",
+        "points",
+        "seed",
+        "trail",
+    )
+
+    def __init__(self, n_floors, session_id=None):
+        self.session_id = session_id
+        self.phase = "splash"
+        self.scenario_key = None
+        self.seed = 0
+        # one unsigned 16-bit question index per floor
+        self.current_q_indices = array("H", [NO_QUESTION]) * n_floors
+        self.reset_run()
+
+    def reset_run(self):
+        self.layer_index = 0
+        self.score = 0
+        # the current floor was answered correctly and shows its feedback
+        self.answered = False
+        # crashes in this run, part of the player's ability estimate
+        self.misses = 0
+        # clock() when the current floor's question was first shown
+        self.floor_started_at = 0.0
+        # clock() when the player entered the tower, and the time it took
+        # to reach the top once they did
+        self.run_started_at = 0.0
+        self.run_seconds = 0.0
+        # seconds per floor in an incident response run (0: untimed), and
+        # the points earned with fast correct answers
+        self.time_limit = 0
+        self.points = 0
+        # one varint per answer of this run, see runtoken.py
+        self.trail = bytearray()
+        q = self.current_q_indices
+        q[:] = array("H", [NO_QUESTION]) * len(q)
+
+    def __getstate__(self):
+        # a flat tuple rather than a dict keyed by slot name, with the
+        # question indices and the trail as plain bytes: this is what a copy
+        # of the session, or an external store, has to hold
+        return (
+            self.session_id,
+            self.phase,
+            self.scenario_key,
+            self.layer_index,
+            self.score,
+            self.answered,
+            self.misses,
+            self.current_q_indices.tobytes(),
+            self.floor_started_at,
+            self.run_started_at,
+            self.run_seconds,
+            self.time_limit,
+            self.points,
+            self.seed,
+            bytes(self.trail),
+        )
+
+    def __setstate__(self, values):
+        (
+            self.session_id,
+            self.phase,
+            self.scenario_key,
+            self.layer_index,
+            self.score,
+            self.answered,
+            self.misses,
+            q_indices,
+            self.floor_started_at,
+            self.run_started_at,
+            self.run_seconds,
+            self.time_limit,
+            self.points,
+            self.seed,
+            trail,
+        ) = values
+        self.current_q_indices = array("H")
+        self.current_q_indices.frombytes(q_indices)
+        self.trail = bytearray(trail)
+
+
+class GameEngine:
+    def __init__(self, layers, scenarios, rng=random, listener=None, clock=time.time, selector=None):
+        self.layers = layers
+        self.scenarios = scenarios
+        self.rng = rng
+        self.selector = selector or RandomSelector()
+        self.listener = listener
+        self.clock = clock
+        # the seed alone reproduces a deterministic selector's picks, so
+        # run tokens only pin question indices for the others
+        self._pinned = not getattr(self.selector, "deterministic", False)
+        # uniform picks are made inline, without a Pool, ability or RunRandom
+        self._uniform = type(self.selector) is RandomSelector
+        # scenario -> its per-floor question lists, and
+        # (scenario, floor) -> Pool of the floor's question ids
+        self._q_lists = {}
+        self._pools = {}
+
+    def new_state(self, session_id=None):
+        return GameState(len(self.layers), session_id)
+
+    # ---------------- queries ----------------
+
+    def scenario(self, state):
+        return self.scenarios[state.scenario_key]
+
+    def question_index(self, state, layer_index=None):
+        if layer_index is None:
+            layer_index = state.layer_index
+        q_idx = state.current_q_indices[layer_index]
+        return 0 if q_idx == NO_QUESTION else q_idx
+
+    def question(self, state, layer_index=None):
+        if layer_index is None:
+            layer_index = state.layer_index
+        q_idx = state.current_q_indices[layer_index]
+        return self._questions(state.scenario_key)[layer_index][0 if q_idx == NO_QUESTION else q_idx]
+
+    def answered_current_floor(self, state):
+        return state.phase == "layer" and state.answered
+
+    def feedback_text(self, state):
+        return self.question(state)["ex_correct"] if self.answered_current_floor(state) else ""
+
+    def crash_reason(self, state):
+        if state.phase != "crash":
+            return ""
+        if runtoken.last_option(state.trail) == runtoken.TIMED_OUT:
+            return TIMEOUT_REASON
+        return self.question(state)["ex_wrong"]
+
+    def crash_layer_name(self, state):
+        return self.layers[state.layer_index]["name"] if state.phase == "crash" else ""
+
+    def seconds_left(self, state):
+        # time left on the current floor of a timed run, None otherwise
+        if not state.time_limit or state.phase != "layer" or state.answered:
+            return None
+        return max(0.0, state.time_limit - (self.clock() - state.floor_started_at))
+
+    def run_token(self, state):
+        key = state.scenario_key
+        return runtoken.encode(key, self.scenarios.version(key), state.seed, state.trail, self._pinned)
+
+    # ---------------- navigation ----------------
+
+    def go_home(self, state):
+        state.phase = "splash"
+
+    def choose_scenario(self, state):
+        state.phase = "scenario_select"
+
+    # ---------------- transitions ----------------
+
+    def start(self, state, key, seed=None):
+        if key not in self.scenarios:
+            raise KeyError(f"unknown scenario: {key!r}")
+        state.scenario_key = key
+        state.reset_run()
+        state.seed = self.rng.getrandbits(32) if seed is None else seed
+        state.phase = "scenario_intro"
+
+    def enter_tower(self, state, time_limit=0):
+        self._expect(state, "scenario_intro")
+        state.time_limit = time_limit
+        state.run_started_at = self.clock()
+        self._pick_question(state)
+        state.phase = "layer"
+        self._emit(state, "start")
+
+    def answer(self, state, option_index):
+        self._expect(state, "layer")
+        if state.answered:
+            raise ValueError("this floor has already been answered")
+        if state.time_limit and self.check_timer(state):
+            return False
+        question = self.question(state)
+        n_options = len(question["options"])
+        if not 0 <= option_index < n_options:
+            raise ValueError(f"option {option_index} out of range for a question with {n_options} options")
+        correct = option_index == question["correct"]
+        self.selector.record(state.scenario_key, state.layer_index, question["id"], correct)
+        runtoken.append_step(state.trail, option_index, self.question_index(state) if self._pinned else None)
+        if correct:
+            if state.time_limit:
+                state.points += POINTS_CORRECT + round(POINTS_SPEED * self.seconds_left(state) / state.time_limit)
+            state.score += 1
+            state.answered = True
+        else:
+            state.misses += 1
+            state.phase = "crash"
+        if self.listener is not None:
+            think_ms = int((self.clock() - state.floor_started_at) * 1000)
+            self._emit(state, "answer", option=option_index, correct=correct, think_ms=think_ms)
+        return correct
+
+    def check_timer(self, state):
+        # crashes a timed run whose current floor is out of time; True if so
+        if not state.time_limit or state.phase != "layer" or state.answered:
+            return False
+        elapsed = self.clock() - state.floor_started_at
+        if elapsed <= state.time_limit + TIMER_GRACE:
+            return False
+        self.time_out(state, elapsed)
+        return True
+
+    def time_out(self, state, elapsed=None):
+        # the current floor ran out of time (replays call this directly)
+        self._expect(state, "layer")
+        if elapsed is None:
+            elapsed = self.clock() - state.floor_started_at
+        # a floor nobody answers in time is as hard as one they get wrong
+        self.selector.record(state.scenario_key, state.layer_index, self.question(state)["id"], False)
+        runtoken.append_step(state.trail, runtoken.TIMED_OUT, self.question_index(state) if self._pinned else None)
+        state.misses += 1
+        state.phase = "crash"
+        self._emit(state, "timeout", correct=False, think_ms=int(elapsed * 1000))
+
+    def continue_floor(self, state):
+        self._expect(state, "layer")
+        if not state.answered:
+            raise ValueError("the current floor has not been answered yet")
+        if state.layer_index + 1 < len(self.layers):
+            state.layer_index += 1
+            state.answered = False
+            self._pick_question(state)
+        else:
+            state.phase = "success"
+            state.run_seconds = self.clock() - state.run_started_at
+            self._emit(state, "success")
+
+    def retry_floor(self, state):
+        # keep same scenario & layer, but pick a new question for this floor
+        self._expect(state, "crash")
+        missed = state.current_q_indices[state.layer_index]
+        state.current_q_indices[state.layer_index] = NO_QUESTION
+        state.answered = False
+        self._pick_question(state, exclude=missed)
+        state.phase = "layer"
+        self._emit(state, "retry")
+
+    def replay(self, state):
+        self._emit(state, "replay")
+        self.start(state, state.scenario_key)
+
+    # ---------------- internals ----------------
+
+    def _pick_question(self, state, exclude=NO_QUESTION):
+        layer_index = state.layer_index
+        if state.current_q_indices[layer_index] != NO_QUESTION:
+            return
+        seed = (state.seed << 16) | (state.score + state.misses)
+        if self._uniform:
+            # RandomSelector.pick with a fresh RunRandom(seed), which draws once
+            n_questions = len(self._questions(state.scenario_key)[layer_index])
+            x = _mix64((seed + _GOLDEN64) & _MASK64)
+            if 1 < n_questions and exclude < n_questions:
+                q_idx = (x * (n_questions - 1)) >> 64
+                q_idx += q_idx >= exclude
+            else:
+                q_idx = (x * n_questions) >> 64
+        else:
+            q_idx = self.selector.pick(
+                state.scenario_key,
+                layer_index,
+                self._pool(state.scenario_key, layer_index),
+                ability(state.score, state.misses),
+                exclude,
+                RunRandom(seed),
+            )
+        state.current_q_indices[layer_index] = q_idx
+        state.floor_started_at = self.clock()
+
+    def _questions(self, scenario_key):
+        q_lists = self._q_lists.get(scenario_key)
+        if q_lists is None:
+            q_lists = self._q_lists[scenario_key] = self.scenarios[scenario_key]["questions"]
+        return q_lists
+
+    def _pool(self, scenario_key, layer_index):
+        pool = self._pools.get((scenario_key, layer_index))
+        if pool is None:
+            q_list = self._questions(scenario_key)[layer_index]
+            pool = self._pools[(scenario_key, layer_index)] = Pool(q["id"] for q in q_list)
+        return pool
+
+    def _emit(self, state, kind, **fields):
+        if self.listener is None:
+            return
+        event = {
+            "ts": self.clock(),
+            "kind": kind,
+            "session": state.session_id,
+            "scenario": state.scenario_key,
+            "floor": state.layer_index,
+            "q_idx": self.question_index(state),
+            "question": self.question(state)["id"],
+            "option": None,
+            "correct": None,
+            "think_ms": None,
+        }
+        event.update(fields)
+        self.listener(event)
+
+    @staticmethod
+    def _expect(state, phase):
+        if state.phase != phase:
+            raise ValueError(f"expected phase {phase!r}, got {state.phase!r}")
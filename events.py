@@ -0,0 +1,196 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+from pathlib import Path
+
+import analytics
+from engine import EVENT_FIELDS
+
+# --------------------------------------------------
+# EVENT LOG
+# Append-only history of every player decision (the engine's listener
+# events). EventLog.log() never blocks: events go into a bounded
+# in-memory queue, and a background writer thread drains it in batches
+# into a sink (JSONL file or SQLite in WAL mode).
+#
+# Bounded loss:
+#   - at most `capacity` events are ever waiting in memory; when the
+#     queue is full, new events are dropped and counted in `dropped`
+#   - close() (registered with atexit) stops intake and lets the writer
+#     drain the queue for up to `timeout` seconds; whatever is still
+#     queued after that is counted in `lost`
+# So an orderly shutdown loses nothing unless the disk is slower than
+# the timeout, and a hard crash loses at most `capacity` + one batch.
+#
+# Environment:
+#   CLOUD_TOWER_EVENT_LOG   sqlite:<path> (default: sqlite:events/events.db),
+#                           jsonl:<path>, or off
+#
+# The SQLite sink also keeps the analytics rollups up to date in the same
+# transaction as each batch (see analytics.py).
+# --------------------------------------------------
+
+DEFAULT_TARGET = "sqlite:events/events.db"
+
+log = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class JsonlSink:
+    def __init__(self, path):
+        self.path = Path(path)
+        self._file = None
+
+    def write(self, batch):
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write("".join(json.dumps(e, separators=(",", ":")) + "\n" for e in batch))
+        self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class SQLiteSink:
+    # the connection is opened lazily, i.e. on the writer thread that uses it
+    def __init__(self, path):
+        self.path = Path(path)
+        self.conn = None
+
+    def connect(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS events ("
+            " id INTEGER PRIMARY KEY,"
+            " ts REAL NOT NULL,"
+            " kind TEXT NOT NULL,"
+            " session TEXT,"
+            " scenario TEXT,"
+            " floor INTEGER,"
+            " q_idx INTEGER,"
+            " question TEXT,"
+            " option INTEGER,"
+            " correct INTEGER,"
+            " think_ms INTEGER)"
+        )
+        if "question" not in {row[1] for row in conn.execute("PRAGMA table_info(events)")}:
+            # logs written before events carried question ids; those rows keep NULL
+            with conn:
+                conn.execute("ALTER TABLE events ADD COLUMN question TEXT")
+        analytics.ensure_schema(conn)
+        return conn
+
+    def write(self, batch):
+        if self.conn is None:
+            self.conn = self.connect()
+        with self.conn:
+            self.conn.executemany(
+                f"INSERT INTO events ({', '.join(EVENT_FIELDS)}) VALUES ({', '.join('?' * len(EVENT_FIELDS))})",
+                [tuple(e[f] for f in EVENT_FIELDS) for e in batch],
+            )
+            analytics.apply(self.conn, batch)
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+def sqlite_path(target=None):
+    # path of the SQLite event database, or None when events go elsewhere
+    target = target or os.environ.get("CLOUD_TOWER_EVENT_LOG", DEFAULT_TARGET)
+    kind, _, path = target.partition(":")
+    return Path(path) if kind == "sqlite" else None
+
+
+def open_sink(target):
+    kind, _, path = target.partition(":")
+    if kind == "sqlite":
+        return SQLiteSink(path)
+    if kind == "jsonl":
+        return JsonlSink(path)
+    raise ValueError(f"unknown event log target: {target!r} (use sqlite:<path>, jsonl:<path> or off)")
+
+
+class EventLog:
+    def __init__(self, sink, capacity=10_000, batch_size=500):
+        self.sink = sink
+        self.batch_size = batch_size
+        self.dropped = 0
+        self.failed = 0
+        self.written = 0
+        self.lost = 0
+        self._queue = queue.Queue(maxsize=capacity)
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="cloud-tower-events", daemon=True)
+        self._thread.start()
+
+    def log(self, event):
+        # called on the UI thread: never wait for the writer
+        if self._closed:
+            self.dropped += 1
+            return False
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+            return False
+        return True
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            try:
+                self.sink.write(batch)
+                self.written += len(batch)
+            except Exception:
+                self.failed += len(batch)
+                log.exception("could not write %d events", len(batch))
+        self.sink.close()
+
+    def close(self, timeout=5.0):
+        if self._closed:
+            return self.lost
+        self._closed = True
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout)
+        self.lost = self._queue.qsize()
+        if self.lost or self.dropped or self.failed:
+            log.warning("event log closed: %d lost, %d dropped, %d failed", self.lost, self.dropped, self.failed)
+        return self.lost
+
+
+def open_event_log(target=None, **kwargs):
+    target = target or os.environ.get("CLOUD_TOWER_EVENT_LOG", DEFAULT_TARGET)
+    if target == "off":
+        return None
+    event_log = EventLog(open_sink(target), **kwargs)
+    atexit.register(event_log.close)
+    return event_log
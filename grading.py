@@ -0,0 +1,182 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from bank import load_bank
+
+# --------------------------------------------------
+# OFFLINE GRADING
+# Grades answer sheets of the tower played as a paper or LMS exam. A sheet
+# is a CSV or Parquet table with one row per answer:
+#
+#   student, scenario, floor, q_idx, option
+#
+# with floor, q_idx and option counted from 0 as in the event log. Every
+# row is scored in one vectorized pass: the answer key of the whole bank
+# is a flat int8 array indexed by
+#   (scenario code * n_floors + floor) * max_questions + q_idx
+# (-1 where a floor has fewer questions), so grading is a recode of the
+# scenario categories, one gather and one comparison.
+# Rows naming an unknown scenario, floor or question, and rows with a
+# blank or non-integer floor, q_idx or option (e.g. a skipped answer),
+# are marked invalid and not scored.
+#
+#   python grading.py answers.csv --out reports/
+# writes students.csv (one row per student and scenario) and floors.csv
+# (one row per scenario and floor); --format parquet writes Parquet.
+# --------------------------------------------------
+
+COLUMNS = ("student", "scenario", "floor", "q_idx", "option")
+NUMBERS = ("floor", "q_idx", "option")
+
+
+def whole(values):
+    # -> (int64 values, mask of the whole numbers); blanks are read as NaN
+    values = np.asarray(values, dtype=np.float64)
+    ok = np.isfinite(values) & (values == np.trunc(values))
+    return np.where(ok, values, -1).astype(np.int64), ok
+
+
+class AnswerKey:
+    def __init__(self, layers, scenarios):
+        self.n_floors = len(layers)
+        self.scenarios = list(scenarios)
+        q_lists = {key: scenarios[key]["questions"] for key in self.scenarios}
+        self.max_questions = max(len(q) for questions in q_lists.values() for q in questions)
+        stride = self.n_floors * self.max_questions
+        self.correct = np.full(len(self.scenarios) * stride, -1, dtype=np.int8)
+        for s, key in enumerate(self.scenarios):
+            for floor, q_list in enumerate(q_lists[key]):
+                base = s * stride + floor * self.max_questions
+                self.correct[base:base + len(q_list)] = [q["correct"] for q in q_list]
+
+    def codes(self, scenario):
+        # position of each row's scenario in self.scenarios, -1 if unknown
+        scenario = pd.Series(scenario, copy=False)
+        if isinstance(scenario.dtype, pd.CategoricalDtype):
+            # recodes the few categories instead of every row
+            codes = scenario.cat.set_categories(self.scenarios).cat.codes.to_numpy()
+        else:
+            codes = pd.Index(self.scenarios).get_indexer(scenario)
+        return codes.astype(np.int64)
+
+    def lookup(self, scenario, floor, q_idx):
+        # -> (correct option or -1, valid mask) for columns of equal length
+        codes = self.codes(scenario)
+        floor, floor_ok = whole(floor)
+        q_idx, q_idx_ok = whole(q_idx)
+        valid = (
+            floor_ok & q_idx_ok
+            & (codes >= 0)
+            & (floor >= 0) & (floor < self.n_floors)
+            & (q_idx >= 0) & (q_idx < self.max_questions)
+        )
+        flat = (codes * self.n_floors + floor) * self.max_questions + q_idx
+        correct = self.correct[np.where(valid, flat, 0)]
+        valid &= correct >= 0
+        return np.where(valid, correct, -1), valid
+
+
+def read_sheet(path):
+    path = Path(path)
+    if path.suffix == ".parquet":
+        df = pd.read_parquet(path, columns=list(COLUMNS))
+        # grouping by category codes is much cheaper than by strings
+        df["student"] = df["student"].astype("category")
+        for c in NUMBERS:
+            if not pd.api.types.is_numeric_dtype(df[c]) or pd.api.types.is_extension_array_dtype(df[c]):
+                # nullable or text columns: missing values become NaN
+                df[c] = pd.to_numeric(df[c], errors="coerce").astype("float32")
+    else:
+        # float, so a blank cell reads as NaN instead of failing the sheet
+        dtype = {"student": "category", "scenario": "category", **{c: "float32" for c in NUMBERS}}
+        try:
+            df = pd.read_csv(path, usecols=list(COLUMNS), dtype=dtype)
+        except ValueError:
+            # some cell is not a number at all: parse those columns leniently
+            df = pd.read_csv(path, usecols=list(COLUMNS), dtype={**dtype, **{c: "str" for c in NUMBERS}})
+            for c in NUMBERS:
+                df[c] = pd.to_numeric(df[c], errors="coerce").astype("float32")
+    missing = set(COLUMNS) - set(df.columns)
+    if missing:
+        raise ValueError(f"{path}: missing columns {sorted(missing)}")
+    return df
+
+
+def grade(df, key):
+    # adds `valid` and `correct` columns; the answer sheet is not copied
+    expected, valid = key.lookup(df["scenario"], df["floor"].to_numpy(), df["q_idx"].to_numpy())
+    option, option_ok = whole(df["option"].to_numpy())
+    valid &= option_ok
+    df["valid"] = valid
+    df["correct"] = valid & (option == expected)
+    return df
+
+
+def student_report(graded):
+    report = graded.groupby(["student", "scenario"], observed=True).agg(
+        rows=("valid", "size"), answers=("valid", "sum"), correct=("correct", "sum")
+    )
+    report["score"] = report["correct"] / report["answers"]
+    report["invalid_rows"] = report.pop("rows") - report["answers"]
+    return report.reset_index()
+
+
+def floor_report(graded, key):
+    # a (scenario, floor) histogram of the valid rows, via bincount
+    valid = graded["valid"].to_numpy()
+    cell = key.codes(graded["scenario"])[valid] * key.n_floors + whole(graded["floor"].to_numpy())[0][valid]
+    n_cells = len(key.scenarios) * key.n_floors
+    answers = np.bincount(cell, minlength=n_cells)
+    correct = np.bincount(cell, weights=graded["correct"].to_numpy()[valid], minlength=n_cells).astype(np.int64)
+    report = pd.DataFrame({
+        "scenario": np.repeat(key.scenarios, key.n_floors),
+        "floor": np.tile(np.arange(key.n_floors), len(key.scenarios)),
+        "answers": answers,
+        "correct": correct,
+    })
+    report = report[report["answers"] > 0].reset_index(drop=True)
+    report["correct_rate"] = report["correct"] / report["answers"]
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Grade Cloud Tower answer sheets (CSV or Parquet).")
+    parser.add_argument("sheets", nargs="+", help="answer sheet files")
+    parser.add_argument("--out", default="reports", help="output directory (default: reports/)")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    key = AnswerKey(*load_bank())
+    df = pd.concat([read_sheet(path) for path in args.sheets], ignore_index=True)
+    loaded = time.perf_counter()
+    graded = grade(df, key)
+    students = student_report(graded)
+    floors = floor_report(graded, key)
+    graded_at = time.perf_counter()
+
+    out = Path(args.out)
+    out.mkdir(parents=True, exist_ok=True)
+    for name, report in (("students", students), ("floors", floors)):
+        target = out / f"{name}.{args.format}"
+        if args.format == "parquet":
+            report.to_parquet(target, index=False)
+        else:
+            report.to_csv(target, index=False)
+
+    n_invalid = int((~graded["valid"]).sum())
+    print(f"rows:      {len(graded):,} ({n_invalid:,} invalid, not scored)")
+    print(f"students:  {graded['student'].nunique():,}")
+    print(f"read:      {loaded - started:.2f} s")
+    print(f"grade:     {graded_at - loaded:.2f} s")
+    print(f"reports:   {out}/students.{args.format}, {out}/floors.{args.format}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
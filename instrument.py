@@ -0,0 +1,367 @@
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+
+# --------------------------------------------------
+# TIMING INSTRUMENTATION (opt-in)
+# Set CLOUD_TOWER_TRACE=1 to time every screen_* function and helper per
+# rerun. Each span is tagged with the phase, scenario key and anonymous
+# session id of the rerun and is
+#   - appended as one JSON line to a rotating trace file, and
+#   - aggregated into a Prometheus text endpoint (/metrics).
+#
+# Set CLOUD_TOWER_METER=1 to also count the elements and serialized bytes
+# each rerun sends to the browser, per phase and per screen function (see
+# DELTA METERING below).
+#
+# When both are disabled, timed() returns the function unchanged and
+# span() is a shared no-op context manager, so the cost is one function
+# call; the file handler and HTTP server modules are only imported when
+# tracing is enabled. When the metrics port cannot be bound (e.g. a
+# second replica on the same host), a warning is logged and spans still
+# go to the trace file.
+#
+# Environment:
+#   CLOUD_TOWER_TRACE            1 / true / yes to enable
+#   CLOUD_TOWER_TRACE_FILE       trace file (default: traces/trace.jsonl)
+#   CLOUD_TOWER_TRACE_MAX_BYTES  rotate after this size (default: 10 MiB)
+#   CLOUD_TOWER_TRACE_BACKUPS    rotated files to keep (default: 5)
+#   CLOUD_TOWER_METRICS_PORT     /metrics port, 0 to disable (default: 9464)
+#   CLOUD_TOWER_METRICS_HOST     interface /metrics listens on (default: 127.0.0.1;
+#                                0.0.0.0 exposes it on every interface)
+#   CLOUD_TOWER_METER            1 / true / yes to meter deltas
+# --------------------------------------------------
+
+ENABLED = os.environ.get("CLOUD_TOWER_TRACE", "").lower() in ("1", "true", "yes")
+METERING = os.environ.get("CLOUD_TOWER_METER", "").lower() in ("1", "true", "yes")
+
+# upper bounds of the latency histogram, in seconds
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+_context = threading.local()
+
+log = logging.getLogger(__name__)
+
+
+class Tracer:
+    def __init__(self, trace_file, max_bytes, backups, metrics_port, metrics_host="127.0.0.1"):
+        self._lock = threading.Lock()
+        # (span, phase, scenario) -> [count, sum, bucket counts...]
+        self._series = {}
+
+        import logging.handlers
+
+        Path(trace_file).parent.mkdir(parents=True, exist_ok=True)
+        handler = logging.handlers.RotatingFileHandler(
+            trace_file, maxBytes=max_bytes, backupCount=backups, encoding="utf-8"
+        )
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        self._log = logging.getLogger("cloud_tower.trace")
+        self._log.propagate = False
+        self._log.setLevel(logging.INFO)
+        self._log.addHandler(handler)
+
+        self.server = None
+        if metrics_port:
+            self.server = _serve_metrics(self, metrics_host, metrics_port)
+
+    def record(self, name, seconds):
+        phase = getattr(_context, "phase", None)
+        scenario = getattr(_context, "scenario", None)
+        self._log.info(json.dumps({
+            "ts": time.time(),
+            "span": name,
+            "ms": round(seconds * 1000, 3),
+            "phase": phase,
+            "scenario": scenario,
+            "session": getattr(_context, "session", None),
+        }))
+        key = (name, phase or "", scenario or "")
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0, 0.0] + [0] * len(BUCKETS)
+            series[0] += 1
+            series[1] += seconds
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    series[2 + i] += 1
+
+    def prometheus_text(self):
+        with self._lock:
+            series = {k: list(v) for k, v in self._series.items()}
+        lines = [
+            "# HELP cloud_tower_span_seconds Time spent in a screen or helper per rerun.",
+            "# TYPE cloud_tower_span_seconds histogram",
+        ]
+        for (name, phase, scenario), values in sorted(series.items()):
+            labels = f'span="{name}",phase="{phase}",scenario="{scenario}"'
+            for bound, count in zip(BUCKETS, values[2:]):
+                lines.append(f'cloud_tower_span_seconds_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'cloud_tower_span_seconds_bucket{{{labels},le="+Inf"}} {values[0]}')
+            lines.append(f"cloud_tower_span_seconds_sum{{{labels}}} {values[1]:.6f}")
+            lines.append(f"cloud_tower_span_seconds_count{{{labels}}} {values[0]}")
+        if _meter is not None:
+            lines += _meter.prometheus_lines()
+        return "\n".join(lines) + "\n"
+
+
+def _serve_metrics(tracer, host, port):
+    # -> the running server, or None when the address cannot be bound
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = tracer.prometheus_text().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    try:
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+    except OSError as exc:
+        log.warning("no /metrics endpoint on %s:%d (%s); tracing to the trace file only", host, port, exc)
+        return None
+    threading.Thread(target=server.serve_forever, name="cloud-tower-metrics", daemon=True).start()
+    return server
+
+
+_tracer = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer():
+    # one tracer per process, created on first use
+    global _tracer
+    if _tracer is None:
+        with _tracer_lock:
+            if _tracer is None:
+                _tracer = Tracer(
+                    os.environ.get("CLOUD_TOWER_TRACE_FILE", "traces/trace.jsonl"),
+                    int(os.environ.get("CLOUD_TOWER_TRACE_MAX_BYTES", 10 * 1024 * 1024)),
+                    int(os.environ.get("CLOUD_TOWER_TRACE_BACKUPS", 5)),
+                    int(os.environ.get("CLOUD_TOWER_METRICS_PORT", 9464)),
+                    os.environ.get("CLOUD_TOWER_METRICS_HOST", "127.0.0.1"),
+                )
+    return _tracer
+
+
+# --------------------------------------------------
+# PUBLIC HELPERS
+# --------------------------------------------------
+
+def begin_rerun(phase, scenario, session):
+    # tags for every span recorded by this script thread until the next rerun
+    if ENABLED or METERING:
+        _context.phase = phase
+        _context.scenario = scenario
+        _context.session = session
+
+
+def timed(fn):
+    if not (ENABLED or METERING):
+        return fn
+    name = fn.__name__
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        if METERING:
+            _enter_meter(name)
+        started = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            if ENABLED:
+                get_tracer().record(name, time.perf_counter() - started)
+            if METERING:
+                _exit_meter()
+
+    return wrapper
+
+
+class _NoSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+@contextmanager
+def _span(name):
+    if METERING:
+        _enter_meter(name)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if ENABLED:
+            get_tracer().record(name, time.perf_counter() - started)
+        if METERING:
+            _exit_meter()
+
+
+def span(name):
+    return _span(name) if ENABLED or METERING else _NO_SPAN
+
+
+# --------------------------------------------------
+# DELTA METERING (opt-in)
+# Every delta a script run enqueues for the browser passes through the
+# session's ScriptRunContext.enqueue, which is wrapped once per context.
+# Each delta is counted (elements = new elements, bytes = serialized
+# ForwardMsg size) against the rerun and against every timed()/span()
+# name active when it was sent, so "screen_layer" includes its tower and
+# panel. The outermost timed() call on a thread delimits a rerun: main()
+# for a full run, layer_panel() for a fragment run. Reruns that send
+# nothing (e.g. callbacks) are not recorded.
+#
+# get_meter() aggregates per (phase, name): reruns, totals and maxima,
+# exported with the Prometheus text when tracing is on. For builds:
+#   get_meter().assert_within({"screen_layer": {"elements": 25, "bytes": 6000}})
+# raises AssertionError if any rerun went over (see
+# benchmarks/check_delta_budget.py).
+# --------------------------------------------------
+
+RERUN = "rerun"
+
+
+class Meter:
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (phase, name) -> [reruns, elements, bytes, max elements, max bytes]
+        self._series = {}
+
+    def record(self, phase, counts):
+        with self._lock:
+            for name, (elements, size) in counts.items():
+                series = self._series.get((phase, name))
+                if series is None:
+                    series = self._series[(phase, name)] = [0, 0, 0, 0, 0]
+                series[0] += 1
+                series[1] += elements
+                series[2] += size
+                series[3] = max(series[3], elements)
+                series[4] = max(series[4], size)
+
+    def report(self):
+        # rows of phase, name, reruns, mean and max elements and bytes
+        with self._lock:
+            series = sorted(self._series.items())
+        return [
+            {
+                "phase": phase,
+                "name": name,
+                "reruns": n,
+                "mean_elements": elements / n,
+                "max_elements": max_elements,
+                "mean_bytes": size / n,
+                "max_bytes": max_bytes,
+            }
+            for (phase, name), (n, elements, size, max_elements, max_bytes) in series
+        ]
+
+    def overruns(self, budgets):
+        # budgets: name -> {"elements": max, "bytes": max}, over all phases
+        problems = []
+        for row in self.report():
+            budget = budgets.get(row["name"])
+            if budget is None:
+                continue
+            for metric in ("elements", "bytes"):
+                limit = budget.get(metric)
+                if limit is not None and row[f"max_{metric}"] > limit:
+                    problems.append(
+                        f"{row['name']} ({row['phase']}): {row[f'max_{metric}']} {metric} per rerun, budget {limit}"
+                    )
+        return problems
+
+    def assert_within(self, budgets):
+        problems = self.overruns(budgets)
+        if problems:
+            raise AssertionError("delta budget exceeded:\n  " + "\n  ".join(problems))
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def prometheus_lines(self):
+        lines = [
+            "# HELP cloud_tower_rerun_elements Elements sent to the browser per rerun.",
+            "# TYPE cloud_tower_rerun_elements summary",
+            "# HELP cloud_tower_rerun_bytes Serialized delta bytes sent to the browser per rerun.",
+            "# TYPE cloud_tower_rerun_bytes summary",
+        ]
+        for row in self.report():
+            labels = f'span="{row["name"]}",phase="{row["phase"]}"'
+            for metric in ("elements", "bytes"):
+                lines.append(f"cloud_tower_rerun_{metric}_sum{{{labels}}} {row[f'mean_{metric}'] * row['reruns']:.0f}")
+                lines.append(f"cloud_tower_rerun_{metric}_count{{{labels}}} {row['reruns']}")
+        return lines
+
+
+_meter = Meter() if METERING else None
+
+
+def get_meter():
+    return _meter
+
+
+def _enter_meter(name):
+    stack = getattr(_context, "stack", None)
+    if not stack:
+        # outermost call on this thread: a new rerun
+        _context.stack = stack = []
+        _context.counts = {}
+        _install_meter()
+    stack.append(name)
+
+
+def _exit_meter():
+    stack = _context.stack
+    stack.pop()
+    if not stack and _context.counts:
+        _meter.record(getattr(_context, "phase", None) or "", _context.counts)
+        _context.counts = {}
+
+
+def _install_meter():
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx(suppress_warning=True)
+    if ctx is None or getattr(ctx, "_cloud_tower_metered", False):
+        return
+    enqueue = ctx.enqueue
+
+    def metered_enqueue(msg):
+        stack = getattr(_context, "stack", None)
+        if stack and msg.WhichOneof("type") == "delta":
+            is_element = msg.delta.WhichOneof("type") == "new_element"
+            size = msg.ByteSize()
+            counts = _context.counts
+            for name in {RERUN, *stack}:
+                c = counts.get(name)
+                if c is None:
+                    c = counts[name] = [0, 0]
+                c[0] += is_element
+                c[1] += size
+        enqueue(msg)
+
+    ctx.enqueue = metered_enqueue
+    ctx._cloud_tower_metered = True
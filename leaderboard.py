@@ -0,0 +1,194 @@
+import atexit
+import json
+import logging
+import os
+import threading
+from bisect import bisect_left, insort
+from pathlib import Path
+
+# --------------------------------------------------
+# LEADERBOARD
+# One ranking per scenario, shared by every session of the process.
+# A player keeps their best finished run; runs are ordered by
+#   more floors cleared, then fewer retries, then less time
+# (ties go to whoever got there first).
+#
+# Each scenario keeps its entries in one sorted list of rank keys
+# (-score, retries, duration_ms, seq) plus a player -> key dict, so
+#   - rank(scenario, player) is one bisect: O(log n)
+#   - top(scenario, k) is a slice of the head: O(k)
+#   - record() is a bisect and a list shift (a memmove, cheap even at
+#     hundreds of thousands of entries)
+# All reads and writes take one lock.
+#
+# A daemon thread snapshots dirty leaderboards to a JSON file every
+# `interval` seconds (and once more at exit). The file is written to a
+# temporary name and renamed over the old one, so a crash mid-write never
+# leaves a torn snapshot. The snapshot is loaded on startup.
+#
+# Environment:
+#   CLOUD_TOWER_LEADERBOARD             snapshot file
+#                                       (default: leaderboard/leaderboard.json),
+#                                       or memory (or off) to keep it in memory only
+#   CLOUD_TOWER_LEADERBOARD_INTERVAL    seconds between snapshots (default: 30)
+# --------------------------------------------------
+
+DEFAULT_PATH = "leaderboard/leaderboard.json"
+SNAPSHOT_VERSION = 1
+
+log = logging.getLogger(__name__)
+
+
+class Leaderboard:
+    def __init__(self, path=None, interval=30.0):
+        self.path = Path(path) if path else None
+        self.interval = interval
+        # scenario -> sorted [(-score, retries, duration_ms, seq)]
+        self._ranked = {}
+        # scenario -> {player: rank key}
+        self._best = {}
+        # seq -> player (seq is unique across scenarios), player -> name
+        self._owners = {}
+        self._names = {}
+        self._seq = 0
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+        if self.path is not None:
+            self.load()
+            self._thread = threading.Thread(target=self._run, name="cloud-tower-leaderboard", daemon=True)
+            self._thread.start()
+
+    # ---------------- updates ----------------
+
+    def record(self, scenario, player, name, score, retries, seconds):
+        # returns True when this run is the player's new best
+        with self._lock:
+            key = self._add(scenario, player, name, score, retries, int(seconds * 1000))
+            if key is not None:
+                self._dirty = True
+            return key is not None
+
+    def rename(self, player, name):
+        with self._lock:
+            if player in self._names:
+                self._names[player] = name
+                self._dirty = True
+
+    def _add(self, scenario, player, name, score, retries, duration_ms, seq=None):
+        if seq is None:
+            seq = self._seq
+        self._seq = max(self._seq, seq + 1)
+        key = (-score, retries, duration_ms, seq)
+        best = self._best.setdefault(scenario, {})
+        ranked = self._ranked.setdefault(scenario, [])
+        old = best.get(player)
+        if old is not None:
+            if old <= key:
+                return None
+            del ranked[bisect_left(ranked, old)]
+            del self._owners[old[3]]
+        best[player] = key
+        insort(ranked, key)
+        self._owners[seq] = player
+        self._names[player] = name
+        return key
+
+    # ---------------- queries ----------------
+
+    def rank(self, scenario, player):
+        # 1-based rank of the player's best run, or None
+        with self._lock:
+            key = self._best.get(scenario, {}).get(player)
+            if key is None:
+                return None
+            return bisect_left(self._ranked[scenario], key) + 1
+
+    def size(self, scenario):
+        with self._lock:
+            return len(self._ranked.get(scenario, ()))
+
+    def top(self, scenario, k=10):
+        with self._lock:
+            return [self._entry(key) for key in self._ranked.get(scenario, [])[:k]]
+
+    def _entry(self, key):
+        neg_score, retries, duration_ms, seq = key
+        player = self._owners[seq]
+        return {
+            "player": player,
+            "name": self._names[player],
+            "score": -neg_score,
+            "retries": retries,
+            "seconds": duration_ms / 1000,
+        }
+
+    def _row(self, key):
+        neg_score, retries, duration_ms, seq = key
+        player = self._owners[seq]
+        return [-neg_score, retries, duration_ms, seq, player, self._names[player]]
+
+    # ---------------- snapshots ----------------
+
+    def load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError):
+            log.exception("could not read leaderboard snapshot %s", self.path)
+            return
+        if data.get("version") != SNAPSHOT_VERSION:
+            log.warning("ignoring leaderboard snapshot %s with version %r", self.path, data.get("version"))
+            return
+        with self._lock:
+            for scenario, rows in data["scenarios"].items():
+                for score, retries, duration_ms, seq, player, name in rows:
+                    self._add(scenario, player, name, score, retries, duration_ms, seq)
+
+    def snapshot(self):
+        # writes the leaderboards if they changed since the last snapshot
+        with self._lock:
+            if not self._dirty or self.path is None:
+                return False
+            data = {
+                "version": SNAPSHOT_VERSION,
+                "scenarios": {
+                    scenario: [self._row(key) for key in ranked]
+                    for scenario, ranked in self._ranked.items()
+                },
+            }
+            self._dirty = False
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(self.path.name + ".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+        except OSError:
+            self._dirty = True
+            log.exception("could not write leaderboard snapshot %s", self.path)
+            return False
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.snapshot()
+
+    def close(self):
+        self._stop.set()
+        self.snapshot()
+
+
+def open_leaderboard(path=None, interval=None):
+    path = path or os.environ.get("CLOUD_TOWER_LEADERBOARD", DEFAULT_PATH)
+    if interval is None:
+        interval = float(os.environ.get("CLOUD_TOWER_LEADERBOARD_INTERVAL", 30))
+    board = Leaderboard(None if path in ("memory", "off") else path, interval)
+    atexit.register(board.close)
+    return board
@@ -0,0 +1,245 @@
+import argparse
+import json
+import sys
+import threading
+from collections.abc import Mapping
+from functools import partial
+from pathlib import Path
+from types import MappingProxyType
+
+from bank import DATA_DIR, load_bank, read_json
+
+# --------------------------------------------------
+# LOCALE PACKS
+# The bank in data/ is English. A translation is a locale pack,
+# data/locales/<lang>.json, shaped like the bank but sparse:
+#
+#   {"layers":    {<layer key>: {"name": ..., "description": ...}},
+#    "scenarios": {<scenario key>: {"title": ..., "tagline": ..., "intro": ...,
+#                                   "questions": {<question id>: {"prompt": ..., "options": [...],
+#                                                                 "ex_correct": ..., "ex_wrong": ...}}}}}
+#
+# Questions are matched by id (see bank.py), so a translation stays with
+# its question when the bank inserts or reorders questions, and an edited
+# English question (a new id) shows in English until it is translated
+# again. Any string a pack leaves out (or leaves empty) falls back to the
+# English one, so a partial pack, or a bank that grew since the pack was
+# written, still shows every question; keys, tags, avatars and answer
+# indices always come from the bank.
+#
+#   python locales.py es > missing.json
+# prints the questions the Spanish pack lacks, keyed by id, in English.
+#
+# Nothing is read until a player asks for a locale: its pack is parsed on
+# first use, and a scenario's questions are translated the first time
+# that scenario is shown in that locale (the English questions are loaded
+# lazily too, see bank.py). A server with ten packs installed holds only
+# the locales its players use. A new bank snapshot (see snapshots.py)
+# reuses every translated question of its predecessor that came out the
+# same, so a reload does not copy the translations it did not touch.
+# --------------------------------------------------
+
+LOCALE_DIR = DATA_DIR / "locales"
+DEFAULT_LOCALE = "en"
+
+LANGUAGE_NAMES = {
+    "en": "English",
+    "de": "Deutsch",
+    "es": "Español",
+    "fr": "Français",
+    "it": "Italiano",
+    "ja": "日本語",
+    "ko": "한국어",
+    "nl": "Nederlands",
+    "pl": "Polski",
+    "pt": "Português",
+    "tr": "Türkçe",
+    "zh": "中文",
+}
+
+LAYER_FIELDS = ("name", "description")
+META_FIELDS = ("title", "tagline", "intro")
+QUESTION_FIELDS = ("prompt", "ex_correct", "ex_wrong")
+
+
+def installed_locales(directory=LOCALE_DIR):
+    # English plus one locale per pack file; the packs are not read
+    return (DEFAULT_LOCALE, *sorted(p.stem for p in Path(directory).glob("*.json") if p.stem != DEFAULT_LOCALE))
+
+
+def _text(english, translated):
+    return translated if isinstance(translated, str) and translated else english
+
+
+def _fields(english, translated, fields):
+    # a copy of `english` with the translated strings of `fields`
+    translated = translated if isinstance(translated, Mapping) else {}
+    return MappingProxyType({**english, **{f: _text(english[f], translated.get(f)) for f in fields}})
+
+
+def _item(items, i):
+    return items[i] if isinstance(items, list) and i < len(items) else None
+
+
+def localize_question(q, t):
+    localized = _fields(q, t, QUESTION_FIELDS)
+    t_options = t.get("options") if isinstance(t, Mapping) else None
+    options = tuple(_text(option, _item(t_options, j)) for j, option in enumerate(q["options"]))
+    return MappingProxyType({**localized, "options": options})
+
+
+def localize_questions(questions, translated, previous=None):
+    # `previous`: id -> the same scenario's questions in an older snapshot
+    translated = translated if isinstance(translated, Mapping) else {}
+    previous = previous or {}
+    floors = []
+    for q_list in questions:
+        floor_questions = []
+        for q in q_list:
+            localized = localize_question(q, translated.get(q["id"]))
+            old = previous.get(q["id"])
+            floor_questions.append(old if old == localized else localized)
+        floors.append(tuple(floor_questions))
+    return tuple(floors)
+
+
+class LocalizedBank(Mapping):
+    # The ScenarioBank interface over one locale: metadata is translated
+    # up front (it is small), a scenario's questions on first lookup.
+
+    def __init__(self, bank, pack, shared=None):
+        self._bank = bank
+        self._pack = dict(pack)
+        # key -> id -> translated question of an older snapshot, or None
+        self._shared = shared
+        self.meta = tuple(_fields(m, self._pack.get(m["key"]), META_FIELDS) for m in bank.meta)
+        self._meta_by_key = {m["key"]: m for m in self.meta}
+        self._loaded = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, key):
+        scenario = self._loaded.get(key)
+        if scenario is None:
+            english = self._bank[key]
+            with self._lock:
+                scenario = self._loaded.get(key)
+                if scenario is None:
+                    # the raw pack entry is not needed once translated
+                    translated = self._pack.pop(key, None)
+                    questions = translated.get("questions") if isinstance(translated, Mapping) else None
+                    previous = self._shared(key) if self._shared is not None else None
+                    scenario = MappingProxyType({
+                        **self._meta_by_key[key],
+                        "questions": localize_questions(english["questions"], questions, previous),
+                    })
+                    self._loaded[key] = scenario
+        return scenario
+
+    def __contains__(self, key):
+        return key in self._bank
+
+    def __iter__(self):
+        return iter(self._bank)
+
+    def __len__(self):
+        return len(self._bank)
+
+    def loaded_keys(self):
+        return tuple(self._loaded)
+
+    def version(self, key):
+        # translations do not move questions: the bank's version
+        return self._bank.version(key)
+
+
+class Locales:
+    # `shared(locale, key)` returns id -> translated question of an older
+    # snapshot, or None; see LocalizedBank
+    def __init__(self, layers, scenarios, directory=LOCALE_DIR, shared=None):
+        self._directory = Path(directory)
+        self._shared = shared
+        self.installed = installed_locales(directory)
+        # locale -> (layers, scenarios), filled on first use
+        self._banks = {DEFAULT_LOCALE: (layers, scenarios)}
+        self._lock = threading.Lock()
+
+    def bank(self, locale):
+        # (layers, scenarios) in `locale`; English for a locale without a pack
+        if locale not in self.installed:
+            locale = DEFAULT_LOCALE
+        bank = self._banks.get(locale)
+        if bank is None:
+            with self._lock:
+                bank = self._banks.get(locale)
+                if bank is None:
+                    bank = self._banks[locale] = self._load(locale)
+        return bank
+
+    def _load(self, locale):
+        layers, scenarios = self._banks[DEFAULT_LOCALE]
+        pack = read_json(self._directory / f"{locale}.json")
+        t_layers = pack.get("layers", {})
+        return (
+            tuple(_fields(layer, t_layers.get(layer["key"]), LAYER_FIELDS) for layer in layers),
+            LocalizedBank(scenarios, pack.get("scenarios", {}), self._shared and partial(self._shared, locale)),
+        )
+
+    def match(self, requested):
+        # the installed locale for a browser locale like "es-MX", or None
+        if not requested:
+            return None
+        by_name = {locale.lower(): locale for locale in self.installed}
+        requested = requested.replace("_", "-").lower()
+        return by_name.get(requested) or by_name.get(requested.split("-")[0])
+
+    def loaded(self):
+        return tuple(self._banks)
+
+    def translated_questions(self, locale, key):
+        # id -> translated question of a scenario already shown in `locale`
+        bank = self._banks.get(locale)
+        if bank is None or locale == DEFAULT_LOCALE or key not in bank[1].loaded_keys():
+            return None
+        return {q["id"]: q for q_list in bank[1][key]["questions"] for q in q_list}
+
+
+def language_name(locale):
+    return LANGUAGE_NAMES.get(locale, locale)
+
+
+def missing_questions(scenarios, pack):
+    # scenario key -> id -> English question the pack does not translate
+    missing = {}
+    for key in scenarios:
+        entry = pack.get("scenarios", {}).get(key)
+        translated = entry.get("questions") if isinstance(entry, Mapping) else None
+        translated = translated if isinstance(translated, Mapping) else {}
+        questions = {
+            q["id"]: {**{f: q[f] for f in QUESTION_FIELDS}, "options": list(q["options"])}
+            for q_list in scenarios[key]["questions"]
+            for q in q_list
+            if q["id"] not in translated
+        }
+        if questions:
+            missing[key] = {"questions": questions}
+    return missing
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="List the questions a locale pack does not translate yet.")
+    parser.add_argument("locale", help="pack name, e.g. es for data/locales/es.json")
+    args = parser.parse_args(argv)
+
+    path = LOCALE_DIR / f"{args.locale}.json"
+    pack = read_json(path) if path.exists() else {}
+    _, scenarios = load_bank()
+    missing = missing_questions(scenarios, pack)
+    json.dump({"scenarios": missing}, sys.stdout, ensure_ascii=False, indent=2)
+    print()
+    n = sum(len(entry["questions"]) for entry in missing.values())
+    print(f"{path}: {n} questions to translate", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+import streamlit as st
+
+from classroom import POLL_SECONDS
+from resources import get_catalog, get_classroom_hub
+
+# --------------------------------------------------
+# CLASSROOM HOST
+# Opens a room for one scenario and moves the whole class through its
+# floors together. Students join from the game's home page with the room
+# code. The room panel is a fragment that polls the room's counters every
+# POLL_SECONDS, so a live histogram costs one O(options) read per poll,
+# however many students answer.
+# A room shows the bank snapshot it was opened on (room.bank), whatever
+# reloads happen while the class is running.
+# --------------------------------------------------
+
+st.set_page_config(
+    page_title="Classroom · Cloud Tower",
+    page_icon="🎓",
+    layout="wide",
+)
+
+CATALOG = get_catalog()
+HUB = get_classroom_hub()
+
+
+def hosted_room():
+    hosted = st.session_state.get("hosted_room")
+    if hosted is None:
+        return None
+    code, host_key = hosted
+    room = HUB.get(code)
+    if room is None or room.host_key != host_key:
+        del st.session_state.hosted_room
+        return None
+    return room
+
+
+def on_open(key: str):
+    room = HUB.open(key)
+    st.session_state.hosted_room = (room.code, room.host_key)
+
+
+def on_close(room):
+    HUB.close(room.code, room.host_key)
+    del st.session_state.hosted_room
+    st.rerun()
+
+
+def act(action):
+    try:
+        action()
+    except ValueError:
+        # a button drawn before the room last moved on
+        pass
+
+
+def option_chart(options, counts, correct=None):
+    labels = [
+        f"{chr(65 + i)}" + (" ✅" if i == correct else "")
+        for i in range(len(options))
+    ]
+    st.bar_chart({"option": labels, "answers": list(counts)}, x="option", y="answers", horizontal=True, height=220)
+
+
+@st.fragment(run_every=POLL_SECONDS)
+def room_panel(room):
+    snap = room.snapshot()
+    stage, floor = snap["stage"], snap["floor"]
+    layers = room.bank.layers
+    questions = room.bank.scenarios[room.scenario_key]["questions"]
+
+    students_col, answered_col, floor_col = st.columns(3)
+    students_col.metric("Students", f"{snap['students']} / {room.max_students}")
+    answered_col.metric("Answered", snap["answered"] if stage in ("question", "reveal") else "–")
+    floor_col.metric("Floor", f"{floor + 1} / {len(layers)}")
+
+    if stage == "lobby":
+        st.info(f"Waiting for students. They join from the home page with the code **{room.code}**.")
+        st.button("▶️ Start floor 1", on_click=act, args=(room.start,), type="primary")
+
+    elif stage in ("question", "reveal"):
+        question = questions[floor][room.q_indices[floor]]
+        revealed = stage == "reveal"
+        st.markdown(f"### Floor {floor + 1}: {layers[floor]['name']}")
+        st.write(question["prompt"])
+        st.markdown("\n".join(
+            f"- **{chr(65 + i)}.** {option}" + (" ✅" if revealed and i == question["correct"] else "")
+            for i, option in enumerate(question["options"])
+        ))
+        option_chart(question["options"], snap["counts"], question["correct"] if revealed else None)
+        if revealed:
+            st.caption(question["ex_correct"])
+            last = floor + 1 == len(layers)
+            st.button(
+                "🏁 Finish" if last else f"⏭️ Next floor ({floor + 2})",
+                on_click=act, args=(room.advance,), type="primary",
+            )
+        else:
+            st.button("👀 Reveal the answer", on_click=act, args=(room.reveal,), type="primary")
+
+    else:
+        st.success("Class over. Correct answers per floor:")
+        rows = []
+        for f, counts in room.floor_history():
+            correct = questions[f][room.q_indices[f]]["correct"]
+            answers = sum(counts)
+            rows.append({
+                "floor": f"{f + 1}. {layers[f]['name']}",
+                "answers": answers,
+                "correct_rate": counts[correct] / answers if answers else 0.0,
+            })
+        st.dataframe(
+            rows,
+            hide_index=True,
+            column_config={
+                "correct_rate": st.column_config.ProgressColumn("correct rate", min_value=0.0, max_value=1.0, format="percent"),
+            },
+        )
+
+
+st.title("🎓 Classroom")
+
+room = hosted_room()
+if room is None:
+    key = st.selectbox("Scenario", CATALOG.order, format_func=lambda k: CATALOG.meta[k]["title"])
+    st.button("Open a room", on_click=on_open, args=(key,), type="primary")
+    st.stop()
+
+scenario = room.bank.scenarios[room.scenario_key]
+st.subheader(f"{scenario['avatar']} {scenario['title']} · room code **{room.code}**")
+room_panel(room)
+
+st.markdown("---")
+st.button("Close the room", on_click=on_close, args=(room,))
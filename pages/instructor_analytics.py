@@ -0,0 +1,105 @@
+import sqlite3
+
+import streamlit as st
+
+import analytics
+from events import sqlite_path
+from resources import get_bank, get_catalog
+
+# --------------------------------------------------
+# INSTRUCTOR ANALYTICS
+# Reads only the rollup tables maintained by the event log (see
+# analytics.py), so every view costs the same whether a thousand or
+# millions of answers have been recorded. Rows name their question by id;
+# questions a reload removed from the bank are left out of the tables.
+# --------------------------------------------------
+
+st.set_page_config(
+    page_title="Instructor analytics · Cloud Tower",
+    page_icon="📊",
+    layout="wide",
+)
+
+LAYERS, SCENARIOS = get_bank()
+CATALOG = get_catalog()
+
+
+@st.cache_data(ttl=10, show_spinner=False)
+def load_reports(db_path: str, scenario: str):
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        return (
+            analytics.question_report(conn, scenario),
+            analytics.floor_report(conn, scenario),
+            analytics.option_report(conn, scenario),
+            analytics.funnel_report(conn, scenario),
+        )
+    finally:
+        conn.close()
+
+
+def floor_label(floor: int) -> str:
+    return f"{floor + 1}. {LAYERS[floor]['name']}"
+
+
+st.title("📊 Instructor analytics")
+
+db_path = sqlite_path()
+if db_path is None or not db_path.exists():
+    st.info("No gameplay has been recorded yet. Analytics need the SQLite event log (CLOUD_TOWER_EVENT_LOG=sqlite:…).")
+    st.stop()
+
+key = st.selectbox("Scenario", CATALOG.order, format_func=lambda k: CATALOG.meta[k]["title"])
+questions, floors, options, funnel = load_reports(str(db_path), key)
+
+if questions.empty:
+    st.info("No answers recorded for this scenario yet.")
+    st.stop()
+
+# question id -> question of the current bank
+by_id = {q["id"]: q for q_list in SCENARIOS[key]["questions"] for q in q_list}
+
+left, right = st.columns(2)
+
+with left:
+    st.subheader("Crash rate per floor")
+    floors["floor"] = floors["floor"].map(floor_label)
+    st.bar_chart(floors.set_index("floor")["crash_rate"])
+
+with right:
+    st.subheader("Completion funnel")
+    funnel["step"] = funnel["step"].map(lambda s: "0. Entered the tower" if s == 0 else f"cleared {floor_label(s - 1)}")
+    st.bar_chart(funnel.set_index("step")["runs"])
+
+st.subheader("Questions")
+questions = questions[questions["question"].isin(by_id)].reset_index(drop=True)
+options = options[options["question"].isin(by_id)].reset_index(drop=True)
+questions.insert(0, "prompt", [by_id[q]["prompt"] for q in questions["question"]])
+questions["floor"] = questions["floor"].map(floor_label)
+st.dataframe(
+    questions,
+    hide_index=True,
+    column_config={
+        "prompt": "question",
+        "question": None,
+        "correct_rate": st.column_config.ProgressColumn("correct rate", min_value=0.0, max_value=1.0, format="percent"),
+        "avg_think_s": st.column_config.NumberColumn("avg think time (s)", format="%.1f"),
+    },
+)
+
+st.subheader("Most popular wrong options")
+correct = [by_id[q]["correct"] for q in options["question"]]
+distractors = options[options["option"] != correct].sort_values("picks", ascending=False).head(15)
+distractors.insert(0, "option text", [by_id[q]["options"][o] for q, o in zip(distractors["question"], distractors["option"])])
+distractors.insert(1, "prompt", [by_id[q]["prompt"] for q in distractors["question"]])
+distractors["floor"] = distractors["floor"].map(floor_label)
+st.dataframe(
+    distractors,
+    hide_index=True,
+    column_config={
+        "prompt": "question",
+        "question": None,
+        "option": None,
+        "share": st.column_config.ProgressColumn("share of answers", min_value=0.0, max_value=1.0, format="percent"),
+    },
+)
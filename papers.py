@@ -0,0 +1,228 @@
+import argparse
+import math
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+
+from bank import load_bank
+
+# --------------------------------------------------
+# EXAM PAPERS
+# Streams printable exam variants of one scenario. A variant picks one
+# question per floor, so a scenario has
+#   M = len(q_list_1) * ... * len(q_list_9)
+# possible papers. Variant number v in [0, M) maps to its questions by
+# mixed-radix decoding (floor f's question is digit f of v, in base
+# len(q_list_f)); nothing of size M is ever built.
+#
+# The n-th paper is variant (offset + n * stride) mod M with a stride
+# coprime to M, which visits every variant exactly once before repeating,
+# so the first min(N, M) papers are all different. The stride is the
+# integer closest to M / golden ratio that is coprime to M: consecutive
+# papers land far apart in the space and their questions differ on many
+# floors, and each floor's questions come up about equally often.
+#
+# Papers are rendered to Markdown (pandoc turns them into PDF) by a
+# process pool, in chunks, each worker loading the bank once:
+#   <out>/<scenario>/paper_0001.md        questions only
+#   <out>/<scenario>/paper_0001_key.md    the same paper with answers
+#   <out>/<scenario>/answer_key.csv       paper, floor, q_idx, correct
+# answer_key.csv has grading.py's floor/q_idx numbering (from 0).
+#
+#   python papers.py social --count 500 --out papers/ --workers 4
+# --------------------------------------------------
+
+CHUNK = 64
+GOLDEN = (1 + 5 ** 0.5) / 2
+
+
+def radices(q_lists):
+    return [len(q_list) for q_list in q_lists]
+
+
+def space_size(radix):
+    return math.prod(radix)
+
+
+def pick_stride(m):
+    # the integer nearest to m / golden ratio that is coprime to m
+    if m <= 2:
+        return 1
+    target = round(m / GOLDEN)
+    for delta in range(m):
+        for stride in (target - delta, target + delta):
+            if 0 < stride < m and math.gcd(stride, m) == 1:
+                return stride
+    return 1
+
+
+def decode(variant, radix):
+    # variant number -> question index per floor
+    digits = []
+    for base in radix:
+        variant, digit = divmod(variant, base)
+        digits.append(digit)
+    return digits
+
+
+def variants(radix, count, offset=0):
+    # yields (paper number, variant number) for the first `count` papers
+    m = space_size(radix)
+    stride = pick_stride(m)
+    for n in range(count):
+        yield n + 1, (offset + n * stride) % m
+
+
+def chunks(iterable, size):
+    it = iter(iterable)
+    while batch := list(islice(it, size)):
+        yield batch
+
+
+# --------------------------------------------------
+# RENDERING (runs in the worker processes)
+# --------------------------------------------------
+
+_bank = None
+
+
+def _init_worker():
+    global _bank
+    _bank = load_bank()
+
+
+def render_paper(layers, scenario, number, q_indices, with_answers):
+    lines = [
+        f"# {scenario['title']} – paper {number:04d}" + (" – answer key" if with_answers else ""),
+        "",
+        scenario["intro"],
+        "",
+    ]
+    for floor, (layer, q_idx) in enumerate(zip(layers, q_indices)):
+        q = scenario["questions"][floor][q_idx]
+        lines += [f"## Floor {floor + 1} – {layer['name']}", "", q["prompt"], ""]
+        for i, option in enumerate(q["options"]):
+            if with_answers and i == q["correct"]:
+                lines.append(f"- **{chr(65 + i)}. {option}** ✅")
+            else:
+                lines.append(f"- {chr(65 + i)}. {option}")
+        lines.append("")
+        if with_answers:
+            lines += [f"> {q['ex_correct']}", ""]
+    return "\n".join(lines)
+
+
+def render_chunk(key, batch, out_dir):
+    # writes the papers of `batch`; returns (answer key rows, per-floor counts)
+    layers, scenarios = _bank
+    scenario = scenarios[key]
+    radix = radices(scenario["questions"])
+    out_dir = Path(out_dir)
+    rows = []
+    counts = [[0] * base for base in radix]
+    for number, variant in batch:
+        q_indices = decode(variant, radix)
+        for with_answers, suffix in ((False, ""), (True, "_key")):
+            text = render_paper(layers, scenario, number, q_indices, with_answers)
+            (out_dir / f"paper_{number:04d}{suffix}.md").write_text(text, encoding="utf-8")
+        for floor, q_idx in enumerate(q_indices):
+            counts[floor][q_idx] += 1
+            rows.append(f"{number},{floor},{q_idx},{scenario['questions'][floor][q_idx]['correct']}")
+    return rows, counts
+
+
+# --------------------------------------------------
+# COVERAGE
+# --------------------------------------------------
+
+def coverage(counts):
+    # per floor: how evenly its questions were used (min/max uses)
+    report = []
+    for floor, per_question in enumerate(counts):
+        report.append({
+            "floor": floor,
+            "questions": len(per_question),
+            "unused": sum(1 for c in per_question if c == 0),
+            "min_uses": min(per_question),
+            "max_uses": max(per_question),
+            "evenness": min(per_question) / max(per_question) if max(per_question) else 1.0,
+        })
+    return report
+
+
+def mean_distance(radix, count, offset=0):
+    # mean number of floors on which consecutive papers differ
+    previous = None
+    total = pairs = 0
+    for _, variant in variants(radix, count, offset):
+        digits = decode(variant, radix)
+        if previous is not None:
+            total += sum(a != b for a, b in zip(previous, digits))
+            pairs += 1
+        previous = digits
+    return total / pairs if pairs else 0.0
+
+
+def generate(key, count, out, workers=None, offset=0):
+    radix = radices(load_bank()[1][key]["questions"])
+    m = space_size(radix)
+    out_dir = Path(out) / key
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    counts = [[0] * base for base in radix]
+    workers = workers or os.cpu_count() or 1
+    with open(out_dir / "answer_key.csv", "w", encoding="utf-8") as answer_key, \
+            ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        answer_key.write("paper,floor,q_idx,correct\n")
+        # at most two chunks per worker in flight, collected in order
+        pending = deque()
+        batches = chunks(variants(radix, count, offset), CHUNK)
+        while True:
+            while len(pending) < 2 * workers and (batch := next(batches, None)) is not None:
+                pending.append(pool.submit(render_chunk, key, batch, out_dir))
+            if not pending:
+                break
+            rows, chunk_counts = pending.popleft().result()
+            answer_key.write("\n".join(rows) + "\n")
+            for floor, per_question in enumerate(chunk_counts):
+                for q_idx, c in enumerate(per_question):
+                    counts[floor][q_idx] += c
+    return m, counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate distinct Cloud Tower exam papers as Markdown.")
+    parser.add_argument("scenario")
+    parser.add_argument("--count", type=int, default=100)
+    parser.add_argument("--out", default="papers")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: one per CPU)")
+    parser.add_argument("--offset", type=int, default=0, help="first variant, to start a new series")
+    args = parser.parse_args(argv)
+    if args.scenario not in load_bank()[1]:
+        parser.error(f"unknown scenario: {args.scenario!r}")
+
+    started = time.perf_counter()
+    m, counts = generate(args.scenario, args.count, args.out, args.workers, args.offset)
+    elapsed = time.perf_counter() - started
+
+    radix = radices(load_bank()[1][args.scenario]["questions"])
+    print(f"scenario:        {args.scenario} ({m:,} possible papers)")
+    print(f"papers:          {args.count:,} in {elapsed:.2f} s -> {Path(args.out) / args.scenario}")
+    if args.count > m:
+        print(f"warning:         only {m:,} distinct papers exist; papers repeat after {m:,}")
+    print(f"floors changed between consecutive papers: {mean_distance(radix, args.count, args.offset):.2f} of {len(radix)}")
+    print("floor  questions  unused  min  max  evenness")
+    for row in coverage(counts):
+        print(
+            f"{row['floor']:>5}  {row['questions']:>9}  {row['unused']:>6}  {row['min_uses']:>3}  "
+            f"{row['max_uses']:>3}  {row['evenness']:>8.2f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+import importlib
+import time
+
+import streamlit as st
+
+from classroom import ClassroomHub
+from engine import GameEngine
+from events import open_event_log, sqlite_path
+from leaderboard import open_leaderboard
+from resume import open_codec
+from review import open_deck_store
+from selection import open_selector
+from sessions import open_session_store
+from snapshots import open_bank_watcher
+
+# --------------------------------------------------
+# PROCESS-WIDE RESOURCES
+# Everything shared by all sessions (and all pages) of one server
+# process. Each getter builds its object on first use and returns the
+# same instance afterwards.
+#
+# The bank is the exception: it is hot-reloaded (see snapshots.py), so
+# nothing built on it is cached here. get_bank_watcher() is the one
+# cached object; get_bank() and get_catalog() return the current
+# snapshot's for pages that have no game to keep on one version.
+# --------------------------------------------------
+
+
+@st.cache_resource
+def get_bank_watcher():
+    # one engine per snapshot and locale; they all share the selector
+    # and the event log, and questions keep their indices
+    event_log = get_event_log()
+    selector = get_selector()
+
+    def make_engine(layers, scenarios):
+        return GameEngine(
+            layers,
+            scenarios,
+            listener=event_log.log if event_log else None,
+            selector=selector,
+        )
+
+    return open_bank_watcher(make_engine)
+
+
+def get_bank():
+    snapshot = get_bank_watcher().current()
+    return snapshot.layers, snapshot.scenarios
+
+
+def get_catalog():
+    return get_bank_watcher().current().catalog()
+
+
+@st.cache_resource
+def get_event_log():
+    return open_event_log()
+
+
+@st.cache_resource
+def get_leaderboard():
+    return open_leaderboard()
+
+
+@st.cache_resource
+def get_selector():
+    # per-question statistics start from the recorded history, if any
+    return open_selector(stats_db=sqlite_path())
+
+
+@st.cache_resource
+def get_resume_codec():
+    return open_codec()
+
+
+@st.cache_resource
+def get_session_store():
+    return open_session_store()
+
+
+@st.cache_resource
+def get_deck_store():
+    return open_deck_store()
+
+
+@st.cache_resource
+def get_classroom_hub():
+    return ClassroomHub(get_bank_watcher().current)
+
+
+# --------------------------------------------------
+# WARM-UP
+# Builds every resource above ahead of the first session (see serve.py),
+# reads every scenario file and imports the table stack used by
+# st.dataframe and the analytics page, so the first visitor of a fresh
+# process does not pay for any of it.
+# --------------------------------------------------
+
+def warm_up():
+    timings = {}
+
+    def step(name, fn):
+        t0 = time.perf_counter()
+        fn()
+        timings[name] = time.perf_counter() - t0
+
+    step("bank", lambda: [scenario["questions"] for scenario in get_bank()[1].values()])
+    snapshot = get_bank_watcher().current()
+    step("catalog", snapshot.catalog)
+    step("views", snapshot.views)
+    step("engine", snapshot.engine)
+    step("leaderboard", get_leaderboard)
+    step("resume_codec", get_resume_codec)
+    step("session_store", get_session_store)
+    step("deck_store", get_deck_store)
+    step("classroom_hub", get_classroom_hub)
+    step("pandas", lambda: (importlib.import_module("pandas"), importlib.import_module("pyarrow")))
+    return timings
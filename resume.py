@@ -0,0 +1,163 @@
+import base64
+import hashlib
+import hmac
+import logging
+import os
+import secrets
+import struct
+from array import array
+
+from engine import NO_QUESTION
+
+# --------------------------------------------------
+# RESUME TOKENS
+# The game position of a session, packed into a signed, URL-safe token
+# that app.py keeps in st.query_params. A client that reconnects with a
+# fresh session (dropped websocket, another replica) gets its GameState
+# back from the URL alone; no server memory is needed to continue.
+#
+#   header   version, phase, layer_index, score, misses, answered,
+#            seed, run_started_at, time_limit, points,
+#            floor_started_at, scenario version         (35 bytes)
+#   session  len + ascii id
+#   scenario len + utf-8 key
+#   floors   len + one unsigned 16-bit question index per floor
+#   trail    the rest: the run's answers (see runtoken.py)
+#   mac      first 16 bytes of HMAC-SHA256 over everything above
+#
+# A token is only accepted when its MAC checks out and it describes a
+# position the given engine's bank can show (known scenario and phase,
+# indices in range, and the same questions: the scenario version, see
+# bank.py); anything else is ignored and the player starts fresh. The
+# bank is hot-reloaded (see snapshots.py), so the codec is not tied to
+# one engine: app.py packs with the engine of the session's snapshot and
+# tries the live snapshots, newest first, when it restores one.
+# A timed run keeps the moment its current floor was shown, so
+# reconnecting does not restart the floor's timer.
+#
+# Environment:
+#   CLOUD_TOWER_SECRET   signing key shared by all replicas; without it
+#                        each process signs with a random key, so tokens
+#                        only resume on the process that issued them
+# --------------------------------------------------
+
+VERSION = 3
+PHASES = ("splash", "scenario_select", "scenario_intro", "layer", "crash", "success")
+MAC_BYTES = 16
+
+_HEADER = struct.Struct("!BBBBH?IdHHdI")
+
+log = logging.getLogger(__name__)
+
+
+class ResumeCodec:
+    def __init__(self, secret):
+        self._secret = secret
+
+    def dump(self, state, engine):
+        body = self.pack(state, engine)
+        return base64.urlsafe_b64encode(body + self._mac(body)).rstrip(b"=").decode()
+
+    def pack(self, state, engine):
+        # the unsigned position, e.g. for a trusted session store
+        session = (state.session_id or "").encode("ascii")
+        scenario = (state.scenario_key or "").encode()
+        return b"".join((
+            _HEADER.pack(
+                VERSION,
+                PHASES.index(state.phase),
+                state.layer_index,
+                state.score,
+                min(state.misses, 0xFFFF),
+                state.answered,
+                state.seed,
+                state.run_started_at,
+                state.time_limit,
+                min(state.points, 0xFFFF),
+                state.floor_started_at,
+                engine.scenarios.version(state.scenario_key) if state.scenario_key else 0,
+            ),
+            bytes([len(session)]), session,
+            bytes([len(scenario)]), scenario,
+            bytes([len(state.current_q_indices)]),
+            struct.pack(f"!{len(state.current_q_indices)}H", *state.current_q_indices),
+            bytes(state.trail),
+        ))
+
+    def load(self, token, engine):
+        # -> GameState, or None when the token is forged, malformed or
+        # not a position of `engine`'s bank
+        try:
+            raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        except (ValueError, TypeError):
+            return None
+        body, mac = raw[:-MAC_BYTES], raw[-MAC_BYTES:]
+        if len(raw) <= MAC_BYTES or not hmac.compare_digest(mac, self._mac(body)):
+            return None
+        return self.unpack(body, engine)
+
+    def unpack(self, body, engine):
+        # -> GameState, or None when `body` is not a position of `engine`'s bank
+        try:
+            return self._unpack(body, engine)
+        except (ValueError, IndexError, KeyError, struct.error, UnicodeDecodeError):
+            return None
+
+    def _unpack(self, body, engine):
+        (
+            version, phase, layer_index, score, misses, answered, seed, run_started_at,
+            time_limit, points, floor_started_at, scenario_version,
+        ) = _HEADER.unpack_from(body)
+        if version != VERSION:
+            raise ValueError(f"unsupported resume token version {version}")
+        pos = _HEADER.size
+        session, pos = _chunk(body, pos)
+        scenario, pos = _chunk(body, pos)
+        n_floors = body[pos]
+        floors = struct.unpack_from(f"!{n_floors}H", body, pos + 1)
+        trail = body[pos + 1 + 2 * n_floors:]
+
+        state = engine.new_state(session_id=session.decode("ascii") or None)
+        state.phase = PHASES[phase]
+        if n_floors != len(state.current_q_indices) or layer_index >= n_floors:
+            raise ValueError("token does not match the tower")
+        if scenario:
+            key = scenario.decode()
+            if engine.scenarios.version(key) != scenario_version:
+                raise ValueError("the scenario's questions changed since the token was issued")
+            q_lists = engine.scenarios[key]["questions"]
+            for floor, q_idx in enumerate(floors):
+                if q_idx != NO_QUESTION and q_idx >= len(q_lists[floor]):
+                    raise ValueError("question index out of range")
+            state.scenario_key = key
+        elif state.phase not in ("splash", "scenario_select"):
+            raise ValueError("no scenario")
+        state.layer_index = layer_index
+        state.score = score
+        state.misses = misses
+        state.answered = answered
+        state.seed = seed
+        state.run_started_at = run_started_at
+        state.time_limit = time_limit
+        state.points = points
+        state.current_q_indices[:] = array("H", floors)
+        state.trail = bytearray(trail)
+        # the think time of an untimed floor restarts on reconnect
+        state.floor_started_at = floor_started_at if time_limit else engine.clock()
+        return state
+
+    def _mac(self, body):
+        return hmac.new(self._secret, body, hashlib.sha256).digest()[:MAC_BYTES]
+
+
+def _chunk(body, pos):
+    n = body[pos]
+    return body[pos + 1:pos + 1 + n], pos + 1 + n
+
+
+def open_codec(secret=None):
+    secret = secret or os.environ.get("CLOUD_TOWER_SECRET")
+    if not secret:
+        log.warning("CLOUD_TOWER_SECRET is not set: resume links only work on this server process")
+        return ResumeCodec(secrets.token_bytes(32))
+    return ResumeCodec(secret.encode() if isinstance(secret, str) else secret)
@@ -0,0 +1,197 @@
+import heapq
+import os
+import struct
+
+from sessions import open_session_store
+
+# --------------------------------------------------
+# REVIEW DECKS
+# Every question a learner crashed on becomes a card in their review
+# deck, scheduled with SM-2 spaced repetition:
+#   - a miss (in the tower, or a review graded below 3) sends the card
+#     back to the start and costs 0.2 ease: due again in
+#     RELEARN_SECONDS, then after 1 day, 6 days, and interval * ease
+#     from there on
+#   - each review is graded 0-5 (app.py uses 4 for a correct answer and
+#     1 for a wrong one); a passing grade q moves the ease by
+#       0.1 - (5 - q) * (0.08 + (5 - q) * 0.02)
+#     and it never drops below MIN_EASE
+# SM-2 relearns a missed card after a day; a game session is shorter,
+# so the first step here is minutes.
+#
+# A deck keeps its cards in a dict and a heap of (due, card) entries.
+# Rescheduling pushes a new entry and leaves the old one in the heap,
+# where next_due() skips it when it reaches the top, so adding,
+# rescheduling and drawing the next due card are all O(log n).
+#
+# A card is (scenario, floor, question id): the id (see bank.py) stays
+# the question's own when a reload of the bank inserts, reorders or
+# removes questions, and a card whose question is gone is dropped when it
+# comes up. Decks are packed into a few bytes per card (CARD, 19 bytes)
+# and kept in a session store under the learner's id (see sessions.py),
+# by default a SQLite file of their own. Version 1 decks named questions
+# by position, which a reload can no longer vouch for; they load empty.
+#
+# Environment:
+#   CLOUD_TOWER_REVIEW_STORE   sqlite:<path> (default: sqlite:review/decks.sqlite),
+#                              memory, redis://host:port/db, or off to keep
+#                              decks in the browser session only
+#   CLOUD_TOWER_REVIEW_TTL     seconds a deck is kept after its last change
+#                              (default: 180 days)
+# --------------------------------------------------
+
+DAY = 24 * 3600
+RELEARN_SECONDS = 10 * 60
+START_EASE = 2.5
+MIN_EASE = 1.3
+DEFAULT_STORE = "sqlite:review/decks.sqlite"
+DEFAULT_TTL = 180 * DAY
+KEY_PREFIX = "deck:"
+VERSION = 2
+
+# scenario (index into the deck's scenario table), floor, question id
+# (8 bytes), repetitions, interval in days, ease * 100, due (unix seconds)
+CARD = struct.Struct("!BB8sBHHI")
+
+
+class Deck:
+    def __init__(self):
+        # (scenario, floor, question id) -> [due, repetitions, interval days, ease]
+        self._cards = {}
+        # (due, card); entries whose due no longer matches are stale
+        self._heap = []
+
+    def __len__(self):
+        return len(self._cards)
+
+    def __contains__(self, card):
+        return card in self._cards
+
+    # ---------------- scheduling ----------------
+
+    def miss(self, card, now):
+        # a crash on `card`: add it, or send it back to the first step
+        entry = self._cards.get(card)
+        if entry is None:
+            entry = self._cards[card] = [0, 0, 0, START_EASE]
+        else:
+            entry[3] = round(max(MIN_EASE, entry[3] - 0.2), 2)
+        entry[1] = entry[2] = 0
+        self._schedule(card, entry, now + RELEARN_SECONDS)
+
+    def grade(self, card, quality, now):
+        # one review of `card`, graded 0 (blackout) to 5 (perfect)
+        entry = self._cards[card]
+        if quality < 3:
+            self.miss(card, now)
+            return
+        _, reps, interval, ease = entry
+        interval = 1 if reps == 0 else 6 if reps == 1 else round(interval * ease)
+        entry[1] = min(reps + 1, 0xFF)
+        entry[2] = min(interval, 0xFFFF)
+        # kept to the two decimals a packed deck stores
+        entry[3] = round(max(MIN_EASE, ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02)), 2)
+        self._schedule(card, entry, now + entry[2] * DAY)
+
+    def drop(self, card):
+        # the heap entry goes stale and is skipped
+        self._cards.pop(card, None)
+
+    def _schedule(self, card, entry, due):
+        entry[0] = int(due)
+        heapq.heappush(self._heap, (entry[0], card))
+        if len(self._heap) > 2 * len(self._cards) + 16:
+            # mostly stale entries: rebuild from the cards
+            self._rebuild()
+
+    def _rebuild(self):
+        self._heap = [(entry[0], card) for card, entry in self._cards.items()]
+        heapq.heapify(self._heap)
+
+    # ---------------- queries ----------------
+
+    def next_due(self, now):
+        # the most overdue card, or None when nothing is due at `now`
+        heap = self._heap
+        while heap:
+            due, card = heap[0]
+            entry = self._cards.get(card)
+            if entry is not None and entry[0] == due:
+                return card if due <= now else None
+            heapq.heappop(heap)
+        return None
+
+    def due_count(self, now):
+        return sum(1 for entry in self._cards.values() if entry[0] <= now)
+
+    def next_due_at(self):
+        # when the next card falls due, or None for an empty deck
+        return min((entry[0] for entry in self._cards.values()), default=None)
+
+    # ---------------- persistence ----------------
+
+    def pack(self):
+        scenarios = sorted({card[0] for card in self._cards})
+        index = {key: i for i, key in enumerate(scenarios)}
+        parts = [bytes([VERSION, len(scenarios)])]
+        for key in scenarios:
+            raw = key.encode()
+            parts += [bytes([len(raw)]), raw]
+        parts.append(struct.pack("!H", len(self._cards)))
+        for (scenario, floor, question), (due, reps, interval, ease) in self._cards.items():
+            parts.append(
+                CARD.pack(index[scenario], floor, bytes.fromhex(question), reps, interval, round(ease * 100), due)
+            )
+        return b"".join(parts)
+
+    @classmethod
+    def unpack(cls, data):
+        # -> Deck; raises ValueError when `data` is not a packed deck
+        try:
+            if data[0] != VERSION:
+                raise ValueError(f"unsupported deck version {data[0]}")
+            pos = 2
+            scenarios = []
+            for _ in range(data[1]):
+                n = data[pos]
+                scenarios.append(data[pos + 1:pos + 1 + n].decode())
+                pos += 1 + n
+            (n_cards,) = struct.unpack_from("!H", data, pos)
+            pos += 2
+            deck = cls()
+            for _ in range(n_cards):
+                s, floor, question, reps, interval, ease, due = CARD.unpack_from(data, pos)
+                pos += CARD.size
+                deck._cards[(scenarios[s], floor, question.hex())] = [due, reps, interval, ease / 100]
+        except (IndexError, struct.error, UnicodeDecodeError) as exc:
+            raise ValueError("malformed review deck") from exc
+        deck._rebuild()
+        return deck
+
+
+class DeckStore:
+    # decks by learner id, over any session store
+    def __init__(self, store):
+        self.store = store
+
+    def load(self, learner):
+        data = self.store.get(KEY_PREFIX + learner)
+        if data:
+            try:
+                return Deck.unpack(data)
+            except ValueError:
+                pass
+        return Deck()
+
+    def save(self, learner, deck):
+        self.store.put(KEY_PREFIX + learner, deck.pack())
+
+
+def open_deck_store(target=None, ttl=None):
+    # -> a DeckStore, or None when decks only live in the browser session
+    target = target or os.environ.get("CLOUD_TOWER_REVIEW_STORE", DEFAULT_STORE)
+    if ttl is None:
+        ttl = float(os.environ.get("CLOUD_TOWER_REVIEW_TTL", DEFAULT_TTL))
+    if target == "off":
+        return None
+    return DeckStore(open_session_store(target, ttl))
@@ -0,0 +1,194 @@
+import argparse
+import base64
+import json
+import sys
+
+# --------------------------------------------------
+# RUN TOKENS
+# A compact, URL-safe record of one climb of the tower:
+#
+#   version | flags | len(scenario) scenario | bank (4 bytes) | seed (4 bytes) | steps...
+#
+# where bank is ScenarioBank.version(scenario), the hash of the
+# scenario's question ids when the run was played. Steps are positions in
+# that bank, so replay() refuses a token whose scenario has changed
+# since, instead of quietly replaying other questions.
+#
+# with one varint step per answer, in order. Every question a run sees
+# is drawn from a per-run RNG seeded with (seed, answers so far), so
+# when the selector is deterministic (random mode) a step is just the
+# chosen option and the questions are regenerated from the seed. With a
+# selector that depends on shared statistics (adaptive mode) the token
+# is "pinned": each step also carries the question index,
+# (q_idx << 3) | option. Option 7 (TIMED_OUT) marks a floor of a timed
+# run whose time ran out; replaying it crashes the run just the same.
+# Options 0-6 are answers, so a question has at most MAX_OPTIONS options
+# (bank.py rejects a scenario file with more).
+#
+# The engine appends the steps while the run is played (GameState.trail)
+# so the token costs about one byte per answer and no other history is
+# kept. replay() rebuilds the full outcome from a token, e.g. for a bug
+# report or a bulk regression run:
+#
+#   python -m runtoken <token> [<token> ...]
+#   python -m runtoken --file tokens.txt
+# --------------------------------------------------
+
+VERSION = 2
+PINNED = 0x01
+OPTION_BITS = 3
+TIMED_OUT = (1 << OPTION_BITS) - 1
+MAX_OPTIONS = TIMED_OUT
+
+
+def append_step(trail, option, q_idx=None):
+    if not 0 <= option <= TIMED_OUT:
+        raise ValueError(f"option {option} does not fit in a run token step")
+    value = option if q_idx is None else (q_idx << OPTION_BITS) | option
+    while value >= 0x80:
+        trail.append((value & 0x7F) | 0x80)
+        value >>= 7
+    trail.append(value)
+
+
+def last_option(trail):
+    # the option of the last step in `trail`, or None when it is empty
+    if not trail:
+        return None
+    start = len(trail) - 1
+    while start and trail[start - 1] & 0x80:
+        start -= 1
+    return trail[start] & ((1 << OPTION_BITS) - 1)
+
+
+def encode(scenario, bank_version, seed, trail, pinned):
+    key = scenario.encode()
+    raw = (
+        bytes([VERSION, PINNED if pinned else 0, len(key)]) + key
+        + bank_version.to_bytes(4, "big") + seed.to_bytes(4, "big") + bytes(trail)
+    )
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode(token):
+    # -> (scenario, bank_version, seed, pinned, [(q_idx or None, option), ...])
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        version, flags, key_len = raw[0], raw[1], raw[2]
+        scenario = raw[3:3 + key_len].decode()
+        bank_version = int.from_bytes(raw[3 + key_len:7 + key_len], "big")
+        seed = int.from_bytes(raw[7 + key_len:11 + key_len], "big")
+        body = raw[11 + key_len:]
+    except (ValueError, IndexError, UnicodeDecodeError) as exc:
+        raise ValueError(f"malformed run token: {token!r}") from exc
+    if version != VERSION:
+        raise ValueError(f"unsupported run token version {version}: {token!r}")
+    if len(raw) < 11 + key_len:
+        raise ValueError(f"malformed run token: {token!r}")
+
+    pinned = bool(flags & PINNED)
+    steps = []
+    value = shift = 0
+    for byte in body:
+        value |= (byte & 0x7F) << shift
+        shift += 7
+        if byte & 0x80:
+            continue
+        if pinned:
+            steps.append((value >> OPTION_BITS, value & ((1 << OPTION_BITS) - 1)))
+        else:
+            steps.append((None, value))
+        value = shift = 0
+    if shift:
+        raise ValueError(f"truncated run token: {token!r}")
+    return scenario, bank_version, seed, pinned, steps
+
+
+class ScriptedSelector:
+    # serves the question indices recorded in a pinned token
+    deterministic = True
+
+    def __init__(self, q_indices):
+        self._q_indices = iter(q_indices)
+
+    def pick(self, scenario, floor, pool, ability, exclude, rng):
+        return next(self._q_indices)
+
+    def record(self, scenario, floor, question_id, correct):
+        pass
+
+
+def replay(engine, token):
+    # Replays a run on a private copy of `engine` (no listener, no shared
+    # statistics) and returns the resulting GameState.
+    from selection import RandomSelector
+
+    scenario, bank_version, seed, pinned, steps = decode(token)
+    if scenario not in engine.scenarios:
+        raise ValueError(f"unknown scenario in run token: {scenario!r}")
+    if engine.scenarios.version(scenario) != bank_version:
+        raise ValueError(
+            f"the questions of scenario {scenario!r} changed since the run was played "
+            f"(token bank {bank_version:08x}, loaded bank {engine.scenarios.version(scenario):08x})"
+        )
+    selector = ScriptedSelector(q for q, _ in steps) if pinned else RandomSelector()
+    player = type(engine)(engine.layers, engine.scenarios, selector=selector)
+    state = player.new_state()
+    player.start(state, scenario, seed=seed)
+    player.enter_tower(state)
+    for i, (_, option) in enumerate(steps):
+        last = i + 1 == len(steps)
+        if option == TIMED_OUT:
+            correct = False
+            player.time_out(state)
+        else:
+            correct = player.answer(state, option)
+        if correct:
+            if not last or state.layer_index + 1 == len(player.layers):
+                player.continue_floor(state)
+        elif not last:
+            player.retry_floor(state)
+    return state
+
+
+def describe(engine, token):
+    state = replay(engine, token)
+    return {
+        "token": token,
+        "scenario": state.scenario_key,
+        "seed": state.seed,
+        "phase": state.phase,
+        "floor": state.layer_index + 1,
+        "score": state.score,
+        "misses": state.misses,
+        "current_q_indices": [engine.question_index(state, i) for i in range(state.layer_index + 1)],
+    }
+
+
+def main(argv=None):
+    from bank import load_bank
+    from engine import GameEngine
+
+    parser = argparse.ArgumentParser(description="Replay Cloud Tower run tokens and print their outcome as JSON lines.")
+    parser.add_argument("tokens", nargs="*")
+    parser.add_argument("--file", help="file with one token per line")
+    args = parser.parse_args(argv)
+
+    tokens = list(args.tokens)
+    if args.file:
+        with open(args.file, encoding="utf-8") as f:
+            tokens += [line.strip() for line in f if line.strip()]
+
+    engine = GameEngine(*load_bank())
+    failed = 0
+    for token in tokens:
+        try:
+            print(json.dumps(describe(engine, token)))
+        except (ValueError, KeyError, StopIteration) as exc:
+            failed += 1
+            print(json.dumps({"token": token, "error": str(exc) or type(exc).__name__}))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,265 @@
+import bisect
+import math
+import os
+import sqlite3
+import threading
+import weakref
+
+# --------------------------------------------------
+# QUESTION SELECTION
+# Which question of a floor's pool a player gets. The engine calls
+#   pick(scenario, floor, pool, ability, exclude, rng) -> q_idx
+#   record(scenario, floor, question_id, correct)
+# where `pool` holds the question ids of the floor (see bank.py) in the
+# order of the bank snapshot the run is pinned to, and `exclude` and
+# q_idx are positions in it.
+#
+# RandomSelector is the original behaviour (uniform randrange).
+#
+# AdaptiveSelector is an item-response / bandit hybrid over shared
+# per-question statistics:
+#   - difficulty of a question is the logit of its smoothed error rate,
+#     so it lives on the same scale as the player's ability (Rasch model)
+#   - a question with fewer than MIN_ANSWERS answers is "unexplored" and
+#     is served first (explore), otherwise with probability EXPLORE a
+#     uniformly random question is served
+#   - otherwise (exploit) the question whose difficulty is closest to
+#     the player's ability is the most informative one: a bisect into
+#     the floor's difficulty-sorted index finds it, and the least
+#     exposed of the WINDOW nearest questions is served
+#   - `exclude` (the question the player just missed) is never served
+#     again straight away when the pool has another question
+# Every pick is O(log n) and every record O(log n) plus one list shift.
+# Statistics are kept per question id, so a reload that adds, removes or
+# reorders questions keeps them. Each distinct pool of a floor has its own
+# index, built once (O(n log n)) when a pick first brings it and dropped
+# when the last snapshot holding that pool is freed; while an old and a
+# new snapshot are both in play, an answer updates the index of each
+# pool that has the question, and an answer to a question no live pool
+# has only updates its counts.
+# All statistics sit behind one lock and are shared by every session
+# of the process.
+#
+# Environment:
+#   CLOUD_TOWER_SELECTION   adaptive (default) or random
+# --------------------------------------------------
+
+MIN_ANSWERS = 5
+EXPLORE = 0.1
+WINDOW = 4
+
+
+class Pool:
+    # The question ids of one floor's pool, in bank order. An engine hands
+    # the same Pool to every pick of that floor, so the adaptive selector
+    # finds its index by identity, and drops the index once every Pool with
+    # those ids is gone, i.e. with the last bank snapshot that had them.
+    __slots__ = ("ids", "__weakref__")
+
+    def __init__(self, ids):
+        self.ids = tuple(ids)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, i):
+        return self.ids[i]
+
+
+class RandomSelector:
+    # picks depend on the rng only, so a run token need not pin them
+    deterministic = True
+
+    def pick(self, scenario, floor, pool, ability, exclude, rng):
+        n_questions = len(pool)
+        if n_questions > 1 and 0 <= exclude < n_questions:
+            q_idx = rng.randrange(n_questions - 1)
+            return q_idx + (q_idx >= exclude)
+        return rng.randrange(n_questions)
+
+    def record(self, scenario, floor, question_id, correct):
+        pass
+
+
+_RANDOM = RandomSelector()
+
+
+def difficulty(answers, correct):
+    # logit of the error rate with a uniform Beta(1, 1) prior
+    wrong = answers - correct + 1
+    right = correct + 1
+    return math.log(wrong / right)
+
+
+class PoolIndex:
+    __slots__ = ("ids", "position", "unexplored", "ranked", "users")
+
+    def __init__(self, stats, ids):
+        # O(n log n), once per distinct pool
+        self.ids = ids
+        self.position = {q: i for i, q in enumerate(ids)}
+        # questions of the pool still collecting their first MIN_ANSWERS answers
+        self.unexplored = [q for q in ids if stats.answers.get(q, 0) < MIN_ANSWERS]
+        # (difficulty, id) of every explored question of the pool, sorted
+        self.ranked = sorted(stats.key(q) for q in ids if stats.answers.get(q, 0) >= MIN_ANSWERS)
+        # live Pool objects with these ids
+        self.users = 0
+
+
+class FloorStats:
+    __slots__ = ("answers", "correct", "exposures", "indexes", "pools")
+
+    def __init__(self):
+        # question id -> count; ids a reload removed keep their counts
+        self.answers = {}
+        self.correct = {}
+        self.exposures = {}
+        # ids -> PoolIndex, one per distinct pool still in use
+        self.indexes = {}
+        # Pool -> its PoolIndex, forgotten when the Pool is freed
+        self.pools = weakref.WeakKeyDictionary()
+
+    def key(self, question_id):
+        return (difficulty(self.answers.get(question_id, 0), self.correct.get(question_id, 0)), question_id)
+
+
+class AdaptiveSelector:
+    # picks depend on shared statistics too
+    deterministic = False
+
+    def __init__(self):
+        self._floors = {}
+        # (scenario, floor) -> [(question id, answers, correct)] not applied yet
+        self._seed = {}
+        # (stats, ids) of freed Pools; appended by finalizers, which may run
+        # at any point, and applied under the lock by the next pick
+        self._released = []
+        self._lock = threading.Lock()
+
+    def seed(self, rows):
+        # rows of (scenario, floor, question id, answers, correct), e.g.
+        # the analytics question_stats rollup, so difficulty survives
+        # restarts; a floor picks its rows up when it is first played
+        with self._lock:
+            for scenario, floor, question_id, answers, correct in rows:
+                self._seed.setdefault((scenario, floor), []).append((question_id, answers, correct))
+
+    def _index(self, scenario, floor, pool):
+        stats = self._floors.get((scenario, floor))
+        if stats is None:
+            stats = self._floors[(scenario, floor)] = FloorStats()
+            for question_id, answers, correct in self._seed.pop((scenario, floor), ()):
+                stats.answers[question_id] = stats.answers.get(question_id, 0) + answers
+                stats.correct[question_id] = stats.correct.get(question_id, 0) + correct
+                stats.exposures[question_id] = stats.exposures.get(question_id, 0) + answers
+        index = stats.pools.get(pool)
+        if index is None:
+            # a pool this selector has not seen: share the index of an
+            # equal one (e.g. the same snapshot in another locale)
+            index = stats.indexes.get(pool.ids)
+            if index is None:
+                index = stats.indexes[pool.ids] = PoolIndex(stats, pool.ids)
+            index.users += 1
+            stats.pools[pool] = index
+            weakref.finalize(pool, self._released.append, (stats, pool.ids))
+        return stats, index
+
+    def _release(self):
+        while self._released:
+            stats, ids = self._released.pop()
+            index = stats.indexes.get(ids)
+            if index is not None:
+                index.users -= 1
+                if index.users <= 0:
+                    del stats.indexes[ids]
+
+    def pick(self, scenario, floor, pool, ability, exclude, rng):
+        # `exclude` and the result are positions in `pool`
+        with self._lock:
+            if self._released:
+                self._release()
+            stats, index = self._index(scenario, floor, pool)
+            ids = index.ids
+            question_id = self._choose(stats, index, ability, ids[exclude] if 0 <= exclude < len(ids) else None, rng)
+            stats.exposures[question_id] = stats.exposures.get(question_id, 0) + 1
+            return index.position[question_id]
+
+    def _choose(self, stats, index, ability, exclude, rng):
+        unexplored = index.unexplored
+        if unexplored and not (len(unexplored) == 1 and unexplored[0] == exclude):
+            question_id = unexplored[rng.randrange(len(unexplored))]
+            if question_id == exclude:
+                question_id = unexplored[(unexplored.index(question_id) + 1) % len(unexplored)]
+            return question_id
+
+        if rng.random() < EXPLORE or not index.ranked:
+            ids = index.ids
+            return ids[_RANDOM.pick(None, None, ids, ability, index.position.get(exclude, -1), rng)]
+
+        ranked = index.ranked
+        # WINDOW nearest difficulties around the player's ability
+        pos = bisect.bisect_left(ranked, (ability,))
+        lo = max(0, pos - WINDOW // 2)
+        hi = min(len(ranked), lo + WINDOW + 1)
+        lo = max(0, hi - WINDOW - 1)
+        candidates = [q for _, q in ranked[lo:hi] if q != exclude] or [ranked[pos - 1 if pos else 0][1]]
+        return min(candidates, key=lambda q: (stats.exposures.get(q, 0), rng.random()))
+
+    def record(self, scenario, floor, question_id, correct):
+        with self._lock:
+            stats = self._floors.get((scenario, floor))
+            if stats is None:
+                return
+            answers = stats.answers.get(question_id, 0)
+            explored = answers >= MIN_ANSWERS
+            # every live pool with the question (usually one; two while a
+            # reload's old snapshot is still pinned); a question no pool has
+            # any more only updates its counts
+            indexes = [index for index in stats.indexes.values() if question_id in index.position]
+            if explored:
+                old = stats.key(question_id)
+                for index in indexes:
+                    del index.ranked[bisect.bisect_left(index.ranked, old)]
+            stats.answers[question_id] = answers + 1
+            stats.correct[question_id] = stats.correct.get(question_id, 0) + bool(correct)
+            if answers + 1 >= MIN_ANSWERS:
+                new = stats.key(question_id)
+                for index in indexes:
+                    if not explored:
+                        index.unexplored.remove(question_id)
+                    bisect.insort(index.ranked, new)
+
+    def snapshot(self, scenario, floor):
+        # question id -> (answers, correct, exposures) of one floor
+        with self._lock:
+            stats = self._floors.get((scenario, floor))
+            if stats is None:
+                return {}
+            return {
+                q: (stats.answers.get(q, 0), stats.correct.get(q, 0), stats.exposures.get(q, 0))
+                for q in stats.answers.keys() | stats.exposures.keys()
+            }
+
+
+def ability(score, misses):
+    # logit of the player's smoothed success rate in the current run,
+    # on the same scale as question difficulty
+    return math.log((score + 1) / (misses + 1))
+
+
+def open_selector(mode=None, stats_db=None):
+    mode = mode or os.environ.get("CLOUD_TOWER_SELECTION", "adaptive")
+    if mode == "random":
+        return RandomSelector()
+    if mode != "adaptive":
+        raise ValueError(f"unknown selection mode: {mode!r} (use adaptive or random)")
+    selector = AdaptiveSelector()
+    if stats_db is not None and stats_db.exists():
+        conn = sqlite3.connect(f"file:{stats_db}?mode=ro", uri=True)
+        try:
+            selector.seed(conn.execute("SELECT scenario, floor, question, answers, correct FROM question_stats"))
+        except sqlite3.OperationalError:
+            pass  # no rollups written yet, or only by an older version
+        finally:
+            conn.close()
+    return selector
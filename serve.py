@@ -0,0 +1,54 @@
+import gc
+import logging
+import sys
+import time
+
+# --------------------------------------------------
+# PRODUCTION ENTRY POINT
+#   python serve.py [streamlit run options]
+# e.g. python serve.py --server.port 8501 --server.headless true
+#
+# Same as `streamlit run app.py ...`, but the process-wide resources are
+# built (resources.warm_up) before the server starts listening. The
+# health check (/_stcore/health) therefore only answers once the caches
+# are warm, and an autoscaled replica's first visitor gets a warm render.
+# --------------------------------------------------
+
+log = logging.getLogger("cloud_tower.serve")
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+    started = time.perf_counter()
+
+    from resources import warm_up
+
+    # the cached getters run outside a script run here, which Streamlit
+    # would otherwise warn about once per call
+    bare_mode = logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context")
+    level = bare_mode.level
+    bare_mode.setLevel(logging.ERROR)
+    try:
+        timings = warm_up()
+    finally:
+        bare_mode.setLevel(level)
+    log.info(
+        "warm-up done in %.0f ms (%s)",
+        (time.perf_counter() - started) * 1000,
+        ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in timings.items()),
+    )
+
+    # everything loaded so far lives as long as the process: keep it out
+    # of the garbage collector's generations. The bank snapshot is the
+    # exception, and holds no reference cycles: once a reload replaced it
+    # and no session uses it, reference counting frees it (snapshots.py)
+    gc.freeze()
+
+    from streamlit.web import cli
+
+    sys.argv = ["streamlit", "run", "app.py", *sys.argv[1:]]
+    sys.exit(cli.main())
+
+
+if __name__ == "__main__":
+    main()
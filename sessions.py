@@ -0,0 +1,315 @@
+import argparse
+import os
+import socket
+import socketserver
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlparse
+
+# --------------------------------------------------
+# SESSION STORES
+# Where a session's game position lives between reruns when it should
+# outlive the Streamlit process (restarts, several replicas behind a load
+# balancer). The value is the packed GameState of resume.py (about 60
+# bytes); the key is the session id, which app.py keeps in the URL (?s=).
+#
+# Every store has the same three calls, each one round trip:
+#   get(session_id) -> bytes or None
+#   put(session_id, data)
+#   delete(session_id)
+# and counts them in `round_trips`. app.py reads a session once, when it
+# first sees it, and writes at most once per rerun: only when the packed
+# position differs from what it wrote last (write coalescing).
+#
+#   MemoryStore   a dict in this process (one replica, restarts lose games)
+#   SQLiteStore   a WAL-mode SQLite file shared by the replicas of one host
+#   RedisStore    any server speaking the Redis protocol (RESP), through a
+#                 minimal client over one socket per thread
+#
+# Entries expire `ttl` seconds after their last write.
+#
+# RespServer is a small in-process stand-in for Redis (PING, GET, SET with
+# EX, DEL) for development and benchmarks:
+#   python -m sessions serve --port 6380
+#
+# Environment:
+#   CLOUD_TOWER_SESSION_STORE   url (default: no store, the signed position
+#                               is kept in the URL itself, see resume.py),
+#                               memory, sqlite:<path>, or redis://host:port/db
+#   CLOUD_TOWER_SESSION_TTL     seconds a session is kept (default: 86400)
+# --------------------------------------------------
+
+DEFAULT_TTL = 24 * 3600
+KEY_PREFIX = "cloud_tower:session:"
+
+
+class MemoryStore:
+    def __init__(self, ttl=DEFAULT_TTL):
+        self.ttl = ttl
+        self.round_trips = 0
+        # session_id -> (expires_at, data)
+        self._data = {}
+        self._lock = threading.Lock()
+        self._next_purge = 1024
+
+    def get(self, session_id):
+        with self._lock:
+            self.round_trips += 1
+            entry = self._data.get(session_id)
+            if entry is None or entry[0] < time.time():
+                return None
+            return entry[1]
+
+    def put(self, session_id, data):
+        with self._lock:
+            self.round_trips += 1
+            self._data[session_id] = (time.time() + self.ttl, bytes(data))
+            if len(self._data) >= self._next_purge:
+                now = time.time()
+                self._data = {k: v for k, v in self._data.items() if v[0] >= now}
+                self._next_purge = max(1024, 2 * len(self._data))
+
+    def delete(self, session_id):
+        with self._lock:
+            self.round_trips += 1
+            self._data.pop(session_id, None)
+
+
+class SQLiteStore:
+    def __init__(self, path, ttl=DEFAULT_TTL):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.round_trips = 0
+        # one connection per thread (Streamlit runs each session on its own)
+        self._local = threading.local()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                " id TEXT PRIMARY KEY, data BLOB NOT NULL, expires_at REAL NOT NULL)"
+            )
+            conn.execute("DELETE FROM sessions WHERE expires_at < ?", (time.time(),))
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def get(self, session_id):
+        self.round_trips += 1
+        row = self._conn().execute(
+            "SELECT data FROM sessions WHERE id = ? AND expires_at >= ?", (session_id, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    def put(self, session_id, data):
+        self.round_trips += 1
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT INTO sessions VALUES (?, ?, ?)"
+                " ON CONFLICT (id) DO UPDATE SET data = excluded.data, expires_at = excluded.expires_at",
+                (session_id, bytes(data), time.time() + self.ttl),
+            )
+
+    def delete(self, session_id):
+        self.round_trips += 1
+        with self._conn() as conn:
+            conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+
+
+# --------------------------------------------------
+# REDIS PROTOCOL (RESP)
+# --------------------------------------------------
+
+class RespError(Exception):
+    pass
+
+
+def encode_command(*args):
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if isinstance(arg, str):
+            arg = arg.encode()
+        elif isinstance(arg, int):
+            arg = b"%d" % arg
+        parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+    return b"".join(parts)
+
+
+def read_reply(f):
+    line = f.readline()
+    if not line.endswith(b"\r\n"):
+        raise ConnectionError("connection closed by the server")
+    kind, rest = line[:1], line[1:-2]
+    if kind == b"+":
+        return rest.decode()
+    if kind == b"-":
+        raise RespError(rest.decode())
+    if kind == b":":
+        return int(rest)
+    if kind == b"$":
+        n = int(rest)
+        if n < 0:
+            return None
+        data = f.read(n + 2)
+        if len(data) != n + 2:
+            raise ConnectionError("connection closed by the server")
+        return data[:-2]
+    if kind == b"*":
+        n = int(rest)
+        return None if n < 0 else [read_reply(f) for _ in range(n)]
+    raise RespError(f"unexpected reply: {line!r}")
+
+
+class RedisStore:
+    def __init__(self, url, ttl=DEFAULT_TTL, timeout=2.0):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.password = parsed.password
+        self.ttl = ttl
+        self.timeout = timeout
+        self.round_trips = 0
+        self._local = threading.local()
+
+    def _connect(self):
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        f = sock.makefile("rb")
+        setup = []
+        if self.password:
+            setup.append(encode_command("AUTH", self.password))
+        if self.db:
+            setup.append(encode_command("SELECT", self.db))
+        if setup:
+            # pipelined: once per thread and connection
+            sock.sendall(b"".join(setup))
+            for _ in setup:
+                read_reply(f)
+        self._local.conn = (sock, f)
+        return sock, f
+
+    def command(self, *args):
+        self.round_trips += 1
+        conn = getattr(self._local, "conn", None)
+        for attempt in (0, 1):
+            if conn is None:
+                conn = self._connect()
+            sock, f = conn
+            try:
+                sock.sendall(encode_command(*args))
+                return read_reply(f)
+            except (OSError, ConnectionError):
+                self._local.conn = conn = None
+                sock.close()
+                if attempt:
+                    raise
+
+    def get(self, session_id):
+        return self.command("GET", KEY_PREFIX + session_id)
+
+    def put(self, session_id, data):
+        self.command("SET", KEY_PREFIX + session_id, bytes(data), "EX", int(self.ttl))
+
+    def delete(self, session_id):
+        self.command("DEL", KEY_PREFIX + session_id)
+
+
+class RespServer(socketserver.ThreadingTCPServer):
+    # an in-process stand-in for a Redis server: PING, GET, SET [EX], DEL
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address=("127.0.0.1", 0)):
+        self.data = {}
+        self.lock = threading.Lock()
+        super().__init__(address, _RespHandler)
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"redis://{host}:{port}/0"
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, name="resp-server", daemon=True).start()
+        return self
+
+    def execute(self, args):
+        name = args[0].upper()
+        with self.lock:
+            if name == b"PING":
+                return b"+PONG\r\n"
+            if name in (b"SELECT", b"AUTH"):
+                return b"+OK\r\n"
+            if name == b"GET":
+                entry = self.data.get(args[1])
+                if entry is None or (entry[0] and entry[0] < time.time()):
+                    return b"$-1\r\n"
+                return b"$%d\r\n%s\r\n" % (len(entry[1]), entry[1])
+            if name == b"SET":
+                expires_at = 0
+                if len(args) >= 5 and args[3].upper() == b"EX":
+                    expires_at = time.time() + int(args[4])
+                self.data[args[1]] = (expires_at, args[2])
+                return b"+OK\r\n"
+            if name == b"DEL":
+                removed = sum(self.data.pop(k, None) is not None for k in args[1:])
+                return b":%d\r\n" % removed
+        return b"-ERR unknown command '%s'\r\n" % name
+
+
+class _RespHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        while True:
+            try:
+                args = read_reply(self.rfile)
+            except (ConnectionError, RespError, ValueError):
+                return
+            if not isinstance(args, list) or not args:
+                return
+            self.wfile.write(self.server.execute(args))
+
+
+def open_session_store(target=None, ttl=None):
+    # -> a store, or None when positions stay in the URL
+    target = target or os.environ.get("CLOUD_TOWER_SESSION_STORE", "url")
+    if ttl is None:
+        ttl = float(os.environ.get("CLOUD_TOWER_SESSION_TTL", DEFAULT_TTL))
+    if target == "url":
+        return None
+    if target == "memory":
+        return MemoryStore(ttl)
+    if target.startswith("sqlite:"):
+        return SQLiteStore(target.partition(":")[2], ttl)
+    if target.startswith("redis://"):
+        return RedisStore(target, ttl)
+    raise ValueError(f"unknown session store: {target!r} (use url, memory, sqlite:<path> or redis://host:port/db)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cloud Tower session store tools.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    serve = sub.add_parser("serve", help="run the in-process Redis stand-in")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=6380)
+    args = parser.parse_args(argv)
+
+    server = RespServer((args.host, args.port))
+    print(f"serving {server.url} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
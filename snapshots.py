@@ -0,0 +1,196 @@
+import logging
+import os
+import threading
+import weakref
+from pathlib import Path
+
+from bank import DATA_DIR, load_bank
+from catalog import Catalog
+from engine import GameEngine
+from locales import DEFAULT_LOCALE, Locales
+from views import Views
+
+# --------------------------------------------------
+# BANK SNAPSHOTS
+# The question bank is served as a sequence of immutable snapshots, so
+# an edited question goes live without a redeploy and without dropping
+# a game. A watcher thread polls the files under data/ (the index, the
+# scenario files and the locale packs) every CLOUD_TOWER_BANK_WATCH
+# seconds; when one of them changed, it builds a new snapshot off the
+# request path and swaps it in with a single assignment.
+#
+#   - a session plays a whole run on one snapshot: app.py pins the
+#     snapshot in session_state and only moves the session to the
+#     current one between runs (classroom rooms pin theirs the same way)
+#   - a new snapshot reuses, by content-hash id (see bank.py), every
+#     question its predecessor holds unchanged, and every translated
+#     question that comes out the same (see locales.py), so an edit costs
+#     the memory of the edited questions only, however many snapshots live
+#   - snapshots keep no strong reference to each other; one that no
+#     session, room or watcher references any more is freed, with the
+#     translations, catalogs, views and engines built on it
+#
+# Questions are still read lazily per scenario (see bank.py). A new
+# snapshot loads up front every scenario its predecessor had loaded, so
+# the first rerun after a swap parses nothing. A reload that fails (a
+# half-saved file, invalid JSON, a different number of floors) is
+# logged and the current snapshot stays in place.
+#
+# Environment:
+#   CLOUD_TOWER_BANK_WATCH   seconds between two polls of data/ (default: 2),
+#                            0 to load the bank once per process
+# --------------------------------------------------
+
+DEFAULT_INTERVAL = 2.0
+WATCHED = ("index.json", "scenarios/*.json", "locales/*.json")
+
+log = logging.getLogger(__name__)
+
+
+class BankSnapshot:
+    # One version of the bank and everything built on it, per locale on
+    # first use. `number` counts the snapshots of this process from 1.
+
+    def __init__(
+        self, number, layers, scenarios, data_dir=DATA_DIR, make_engine=GameEngine, shared_translations=None
+    ):
+        self.number = number
+        self.layers = layers
+        self.scenarios = scenarios
+        self.locales = Locales(layers, scenarios, Path(data_dir) / "locales", shared_translations)
+        self._make_engine = make_engine
+        # (kind, locale) -> catalog, views or engine
+        self._built = {}
+        self._lock = threading.Lock()
+
+    def catalog(self, locale=DEFAULT_LOCALE):
+        return self._get("catalog", locale, lambda layers, scenarios: Catalog(scenarios.meta))
+
+    def views(self, locale=DEFAULT_LOCALE):
+        return self._get("views", locale, Views)
+
+    def engine(self, locale=DEFAULT_LOCALE):
+        # one engine per locale, showing that locale's texts; questions
+        # keep their indices in every locale
+        return self._get("engine", locale, self._make_engine)
+
+    def _get(self, kind, locale, build):
+        if locale not in self.locales.installed:
+            locale = DEFAULT_LOCALE
+        built = self._built.get((kind, locale))
+        if built is None:
+            bank = self.locales.bank(locale)
+            with self._lock:
+                built = self._built.get((kind, locale))
+                if built is None:
+                    built = self._built[(kind, locale)] = build(*bank)
+        return built
+
+    def shared_questions(self, key):
+        # id -> frozen question of a scenario this snapshot has loaded
+        if key not in self.scenarios.loaded_keys():
+            return None
+        return {q["id"]: q for q_list in self.scenarios[key]["questions"] for q in q_list}
+
+
+def fingerprint(data_dir=DATA_DIR):
+    # (path, mtime, size) of every watched file; a stat per file, no reads
+    data_dir = Path(data_dir)
+    entries = []
+    for pattern in WATCHED:
+        for path in sorted(data_dir.glob(pattern)):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((str(path.relative_to(data_dir)), st.st_mtime_ns, st.st_size))
+    return tuple(entries)
+
+
+class BankWatcher:
+    def __init__(self, data_dir=DATA_DIR, make_engine=GameEngine, interval=DEFAULT_INTERVAL):
+        self.data_dir = Path(data_dir)
+        self.interval = interval
+        self._make_engine = make_engine
+        self._fingerprint = fingerprint(self.data_dir)
+        self._number = 0
+        # every snapshot still referenced somewhere, by number
+        self._live = weakref.WeakValueDictionary()
+        self._lock = threading.Lock()
+        self._current = self._build(None)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def current(self):
+        return self._current
+
+    def live(self):
+        # the snapshots still in use, newest first
+        return tuple(sorted(self._live.values(), key=lambda snapshot: -snapshot.number))
+
+    def get(self, number):
+        return self._live.get(number)
+
+    def check(self):
+        # swaps in a new snapshot if a watched file changed; True if so
+        with self._lock:
+            current = fingerprint(self.data_dir)
+            if current == self._fingerprint:
+                return False
+            self._fingerprint = current
+            try:
+                snapshot = self._build(self._current)
+            except Exception:
+                log.exception("bank reload failed; still serving snapshot %d", self._current.number)
+                return False
+            previous, self._current = self._current, snapshot
+        log.info("bank snapshot %d replaces %d", snapshot.number, previous.number)
+        return True
+
+    def _build(self, previous):
+        shared = shared_translations = None
+        if previous is not None:
+            # a weak reference: the new snapshot must not keep the old alive
+            ref = weakref.ref(previous)
+
+            def shared(key):
+                old = ref()
+                return old.shared_questions(key) if old is not None else None
+
+            def shared_translations(locale, key):
+                old = ref()
+                return old.locales.translated_questions(locale, key) if old is not None else None
+
+        layers, scenarios = load_bank(self.data_dir / "index.json", self.data_dir / "scenarios", shared)
+        if previous is not None:
+            if len(layers) != len(previous.layers):
+                raise ValueError(f"the tower has {len(previous.layers)} floors, the new bank {len(layers)}")
+            for key in previous.scenarios.loaded_keys():
+                if key in scenarios:
+                    scenarios[key]
+        self._number += 1
+        snapshot = BankSnapshot(self._number, layers, scenarios, self.data_dir, self._make_engine, shared_translations)
+        self._live[snapshot.number] = snapshot
+        weakref.finalize(snapshot, log.info, "bank snapshot %d freed", snapshot.number)
+        return snapshot
+
+    # ---------------- watcher thread ----------------
+
+    def start(self):
+        if self.interval > 0 and self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="cloud-tower-bank", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+
+def open_bank_watcher(make_engine=GameEngine, interval=None, data_dir=DATA_DIR):
+    if interval is None:
+        interval = float(os.environ.get("CLOUD_TOWER_BANK_WATCH", DEFAULT_INTERVAL))
+    return BankWatcher(data_dir, make_engine, interval).start()
@@ -0,0 +1,64 @@
+import random
+import sqlite3
+
+import analytics
+from bank import load_bank
+from engine import GameEngine
+from events import SQLiteSink
+
+
+def play(engine, rng, runs):
+    for _ in range(runs):
+        state = engine.new_state(session_id="s")
+        engine.start(state, rng.choice(list(engine.scenarios)))
+        engine.enter_tower(state)
+        while state.phase == "layer" and state.misses < 3:
+            question = engine.question(state)
+            if rng.random() < 0.1:
+                engine.time_out(state)
+            else:
+                option = question["correct"] if rng.random() < 0.7 else (question["correct"] + 1) % len(question["options"])
+                engine.answer(state, option)
+            if state.phase == "crash":
+                engine.retry_floor(state)
+            else:
+                engine.continue_floor(state)
+
+
+def rollups(conn):
+    return {table: sorted(conn.execute(f"SELECT * FROM {table}")) for table in analytics.ROLLUPS}
+
+
+def test_incremental_rollups_match_a_rebuild(tmp_path):
+    events = []
+    rng = random.Random(0)
+    play(GameEngine(*load_bank(), rng=rng, listener=events.append, clock=lambda: 0.0), rng, 200)
+    sink = SQLiteSink(tmp_path / "events.sqlite")
+    for start in range(0, len(events), 97):
+        sink.write(events[start:start + 97])
+    incremental = rollups(sink.conn)
+    assert incremental["question_stats"] and incremental["option_stats"] and incremental["funnel"]
+
+    analytics.rebuild(sink.conn)
+    assert rollups(sink.conn) == incremental
+    sink.close()
+
+
+def test_outdated_rollups_are_rebuilt_once(tmp_path):
+    path = tmp_path / "events.sqlite"
+    events = []
+    rng = random.Random(1)
+    play(GameEngine(*load_bank(), rng=rng, listener=events.append, clock=lambda: 0.0), rng, 20)
+    sink = SQLiteSink(path)
+    sink.write(events)
+    expected = rollups(sink.conn)
+    sink.conn.execute("DELETE FROM funnel")
+    sink.conn.execute("PRAGMA user_version = 2")
+    sink.conn.commit()
+    sink.close()
+
+    conn = sqlite3.connect(path)
+    analytics.ensure_schema(conn)
+    assert rollups(conn) == expected
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == analytics.ROLLUP_VERSION
+    conn.close()
@@ -0,0 +1,69 @@
+import pytest
+
+from classroom import Room, RoomFull
+
+
+def room(n_options=(3, 2), max_students=10):
+    room = Room("ABCDE", None, "social", [0] * len(n_options), n_options, max_students, clock=lambda: 0.0)
+    for student in ("s1", "s2", "s3"):
+        room.join(student, student.upper())
+    return room
+
+
+def test_changed_answers_move_between_counts():
+    r = room()
+    assert not r.submit("s1", 0)  # still in the lobby
+    r.start()
+    assert r.submit("s1", 0) and r.submit("s2", 0) and r.submit("s3", 2)
+    assert r.submit("s1", 1)
+    assert not r.submit("stranger", 0)
+    assert r.snapshot()["counts"] == (1, 1, 1)
+    assert r.snapshot()["answered"] == 3
+    assert r.answer_of("s1") == 1
+    with pytest.raises(ValueError):
+        r.submit("s2", 3)
+
+
+def test_leaving_withdraws_an_open_answer_only():
+    r = room()
+    r.start()
+    r.submit("s1", 0)
+    r.submit("s2", 1)
+    r.leave("s1")
+    assert r.snapshot()["counts"] == (0, 1, 0)
+    assert r.snapshot()["students"] == 2
+    r.reveal()
+    assert not r.submit("s3", 2)  # answers are closed once revealed
+    r.leave("s2")
+    assert r.snapshot()["counts"] == (0, 1, 0)
+    assert r.snapshot()["answered"] == 1
+    r.advance()
+    assert r.floor_history() == [(0, (0, 1, 0))]
+    assert r.answer_of("s2", floor=0) == 1
+    # the next floor starts from empty counts of its own width
+    assert r.snapshot()["counts"] == (0, 0)
+    r.leave("s2")  # already gone
+    assert r.snapshot()["students"] == 1
+
+
+def test_a_full_room_turns_new_students_away():
+    r = room(max_students=3)
+    with pytest.raises(RoomFull):
+        r.join("s4", "S4")
+    r.join("s1", "renamed")  # rejoining is not a new seat
+    r.leave("s3")
+    r.join("s4", "S4")
+    assert r.snapshot()["students"] == 3
+
+
+def test_the_last_floor_finishes_the_room():
+    r = room()
+    r.start()
+    r.reveal()
+    r.advance()
+    r.reveal()
+    r.advance()
+    assert r.snapshot()["stage"] == "finished"
+    assert r.snapshot()["step"] == 5
+    with pytest.raises(ValueError):
+        r.reveal()
@@ -0,0 +1,30 @@
+import importlib
+import json
+
+import pytest
+
+import instrument
+from bank import load_bank
+from engine import GameEngine
+
+
+@pytest.fixture
+def meter(monkeypatch):
+    # the same environment as benchmarks/check_delta_budget.py; metering is
+    # read when instrument is imported, so reload it on and off around the test
+    monkeypatch.setenv("CLOUD_TOWER_METER", "1")
+    monkeypatch.setenv("CLOUD_TOWER_EVENT_LOG", "off")
+    monkeypatch.setenv("CLOUD_TOWER_LEADERBOARD", "off")
+    yield importlib.reload(instrument).get_meter()
+    monkeypatch.undo()
+    importlib.reload(instrument)
+
+
+def test_every_screen_stays_within_the_delta_budget(meter):
+    from benchmarks.check_delta_budget import BUDGET_PATH, play
+
+    engine = GameEngine(*load_bank())
+    for key in engine.scenarios:
+        play(key, engine)
+    assert meter.report()
+    meter.assert_within(json.loads(BUDGET_PATH.read_text()))
@@ -0,0 +1,23 @@
+import copy
+import pickle
+import random
+
+from bank import load_bank
+from engine import GameEngine
+
+
+def test_state_survives_pickle_and_copy():
+    engine = GameEngine(*load_bank(), rng=random.Random(0))
+    state = engine.new_state(session_id="abc123")
+    engine.start(state, "social")
+    engine.enter_tower(state)
+    engine.answer(state, engine.question(state)["correct"])
+    engine.continue_floor(state)
+    question = engine.question(state)
+    engine.answer(state, (question["correct"] + 1) % len(question["options"]))
+
+    for restored in (pickle.loads(pickle.dumps(state)), copy.deepcopy(state)):
+        assert restored.__getstate__() == state.__getstate__()
+        assert engine.run_token(restored) == engine.run_token(state)
+        engine.retry_floor(restored)
+        assert state.phase == "crash"
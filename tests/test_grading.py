@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+
+from grading import AnswerKey, grade
+
+
+def q(correct):
+    return {"correct": correct}
+
+
+# floor 1 of "ops" has one question and floor 1 of "net" three, so the flat
+# key has a hole (-1) after ops's only floor-1 question
+LAYERS = [{"name": "one"}, {"name": "two"}]
+SCENARIOS = {
+    "ops": {"questions": [[q(1), q(0)], [q(3)]]},
+    "net": {"questions": [[q(2)], [q(0), q(1), q(2)]]},
+}
+
+
+def test_lookup_finds_every_question():
+    key = AnswerKey(LAYERS, SCENARIOS)
+    rows = [(s, f, i) for s in SCENARIOS for f, q_list in enumerate(SCENARIOS[s]["questions"]) for i in range(len(q_list))]
+    scenario, floor, q_idx = map(list, zip(*rows))
+    correct, valid = key.lookup(scenario, floor, q_idx)
+    assert valid.all()
+    assert correct.tolist() == [SCENARIOS[s]["questions"][f][i]["correct"] for s, f, i in rows]
+
+
+def test_lookup_marks_invalid_rows():
+    key = AnswerKey(LAYERS, SCENARIOS)
+    rows = [
+        ("ops", 1, 1),  # a hole: ops floor 1 has one question
+        ("ops", 0, 3),  # past the widest floor
+        ("ops", 2, 0),  # no such floor
+        ("ops", -1, 0),
+        ("ops", 0, -1),
+        ("nope", 0, 0),  # unknown scenario
+        ("ops", np.nan, 0),  # blank floor
+        ("ops", 0, 0.5),  # not a whole number
+        ("net", 1, 2),  # the only valid row
+    ]
+    scenario, floor, q_idx = map(list, zip(*rows))
+    correct, valid = key.lookup(scenario, floor, q_idx)
+    assert valid.tolist() == [False] * 8 + [True]
+    assert correct.tolist() == [-1] * 8 + [2]
+
+
+def test_categorical_scenarios_grade_like_strings():
+    key = AnswerKey(LAYERS, SCENARIOS)
+    df = pd.DataFrame({
+        "student": ["s1", "s1", "s2", "s2"],
+        "scenario": ["ops", "net", "gone", "ops"],
+        "floor": [0.0, 1.0, 0.0, 1.0],
+        "q_idx": [1.0, 1.0, 0.0, 0.0],
+        "option": [0.0, 0.0, 1.0, np.nan],
+    })
+    as_text = grade(df.copy(), key)
+    as_category = grade(df.astype({"scenario": "category"}), key)
+    for graded in (as_text, as_category):
+        assert graded["valid"].tolist() == [True, True, False, False]
+        assert graded["correct"].tolist() == [True, False, False, False]
@@ -0,0 +1,29 @@
+import socket
+
+from instrument import Tracer
+
+
+def test_a_taken_metrics_port_falls_back_to_the_trace_file(tmp_path):
+    with socket.socket() as taken:
+        taken.bind(("127.0.0.1", 0))
+        taken.listen()
+        port = taken.getsockname()[1]
+        tracer = Tracer(tmp_path / "trace.jsonl", 1 << 20, 1, port)
+    assert tracer.server is None
+    tracer.record("screen_layer", 0.002)
+    assert "screen_layer" in (tmp_path / "trace.jsonl").read_text(encoding="utf-8")
+
+
+def test_metrics_listen_on_loopback_by_default(tmp_path):
+    tracer = Tracer(tmp_path / "trace.jsonl", 1 << 20, 1, _free_port())
+    try:
+        assert tracer.server.server_address[0] == "127.0.0.1"
+    finally:
+        tracer.server.shutdown()
+        tracer.server.server_close()
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
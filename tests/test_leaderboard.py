@@ -0,0 +1,56 @@
+from leaderboard import Leaderboard, open_leaderboard
+
+
+def test_rank_orders_score_then_retries_then_time():
+    board = Leaderboard()
+    board.record("social", "p1", "Ada", 8, 2, 90.0)
+    board.record("social", "p2", "Bo", 10, 3, 120.0)
+    board.record("social", "p3", "Cy", 10, 1, 200.0)
+    board.record("social", "p4", "Di", 10, 1, 150.0)
+    assert [e["player"] for e in board.top("social")] == ["p4", "p3", "p2", "p1"]
+    assert [board.rank("social", p) for p in ("p1", "p2", "p3", "p4")] == [4, 3, 2, 1]
+    assert board.rank("social", "nobody") is None
+    assert board.rank("other", "p1") is None
+
+
+def test_ties_go_to_whoever_got_there_first():
+    board = Leaderboard()
+    for player in ("late", "later", "latest"):
+        board.record("social", player, player, 10, 0, 60.0)
+    assert [e["player"] for e in board.top("social")] == ["late", "later", "latest"]
+    assert board.rank("social", "latest") == 3
+
+
+def test_a_player_keeps_their_best_run():
+    board = Leaderboard()
+    board.record("social", "p1", "Ada", 10, 0, 60.0)
+    board.record("social", "p2", "Bo", 10, 0, 50.0)
+    assert not board.record("social", "p1", "Ada", 9, 0, 10.0)
+    assert board.rank("social", "p1") == 2
+    assert board.record("social", "p1", "Ada L.", 10, 0, 40.0)
+    assert board.rank("social", "p1") == 1
+    assert board.size("social") == 2
+    assert board.top("social", 1) == [{"player": "p1", "name": "Ada L.", "score": 10, "retries": 0, "seconds": 40.0}]
+
+
+def test_snapshot_restores_ranks_and_tie_order(tmp_path):
+    path = tmp_path / "leaderboard.json"
+    board = Leaderboard(path, interval=3600)
+    board.record("social", "p1", "Ada", 10, 0, 60.0)
+    board.record("social", "p2", "Bo", 10, 0, 60.0)
+    board.record("cloud", "p2", "Bo", 7, 1, 30.0)
+    board.close()
+
+    restored = Leaderboard(path, interval=3600)
+    restored.record("social", "p3", "Cy", 10, 0, 60.0)
+    assert [e["player"] for e in restored.top("social")] == ["p1", "p2", "p3"]
+    assert restored.rank("cloud", "p2") == 1
+    restored.close()
+
+
+def test_memory_mode_writes_no_file(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    board = open_leaderboard("memory")
+    board.record("social", "p1", "Ada", 10, 0, 60.0)
+    assert board.path is None and not board.snapshot()
+    assert not any(tmp_path.iterdir())
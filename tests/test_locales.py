@@ -0,0 +1,33 @@
+import json
+import shutil
+
+from bank import DATA_DIR, load_bank
+from locales import Locales
+
+
+def edited_bank(tmp_path, edit):
+    data_dir = tmp_path / "data"
+    shutil.copytree(DATA_DIR, data_dir)
+    path = data_dir / "scenarios" / "social.json"
+    scenario = json.loads(path.read_text(encoding="utf-8"))
+    edit(scenario["questions"][0])
+    path.write_text(json.dumps(scenario, ensure_ascii=False), encoding="utf-8")
+    return load_bank(data_dir / "index.json", data_dir / "scenarios"), data_dir / "locales"
+
+
+def spanish(bank, directory):
+    return Locales(*bank, directory).bank("es")[1]["social"]["questions"][0]
+
+
+def test_translations_follow_reordered_questions(tmp_path):
+    before = spanish(load_bank(), DATA_DIR / "locales")
+    bank, directory = edited_bank(tmp_path, lambda floor: floor.reverse())
+    after = spanish(bank, directory)
+    assert [q["prompt"] for q in after] == [q["prompt"] for q in reversed(before)]
+
+
+def test_an_edited_question_falls_back_to_english(tmp_path):
+    bank, directory = edited_bank(tmp_path, lambda floor: floor[0].update(prompt="Edited?"))
+    after = spanish(bank, directory)
+    assert after[0]["prompt"] == "Edited?"
+    assert after[1]["prompt"] == spanish(load_bank(), DATA_DIR / "locales")[1]["prompt"]
@@ -0,0 +1,108 @@
+import base64
+import json
+import random
+import shutil
+
+import pytest
+
+from bank import DATA_DIR, load_bank
+from engine import GameEngine
+from resume import MAC_BYTES, ResumeCodec
+
+
+@pytest.fixture
+def engine():
+    return GameEngine(*load_bank(), rng=random.Random(0))
+
+
+@pytest.fixture
+def codec():
+    return ResumeCodec(b"test secret")
+
+
+def mid_run(engine):
+    state = engine.new_state(session_id="abc123")
+    engine.start(state, "social")
+    engine.enter_tower(state)
+    engine.answer(state, engine.question(state)["correct"])
+    engine.continue_floor(state)
+    return state
+
+
+def resign(codec, body):
+    return base64.urlsafe_b64encode(body + codec._mac(body)).rstrip(b"=").decode()
+
+
+def raw(token):
+    return base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+
+
+def test_round_trip(engine, codec):
+    state = mid_run(engine)
+    restored = codec.load(codec.dump(state, engine), engine)
+    assert restored is not None
+    assert (restored.phase, restored.scenario_key, restored.layer_index, restored.score) == ("layer", "social", 1, 1)
+    assert list(restored.current_q_indices) == list(state.current_q_indices)
+    assert restored.trail == state.trail
+    # an untimed floor's think time restarts on restore; nothing else changes
+    restored.floor_started_at = state.floor_started_at
+    assert codec.pack(restored, engine) == codec.pack(state, engine)
+
+
+def test_tampered_mac_is_rejected(engine, codec):
+    data = bytearray(raw(codec.dump(mid_run(engine), engine)))
+    data[-1] ^= 0x01
+    assert codec.load(base64.urlsafe_b64encode(bytes(data)).decode(), engine) is None
+
+
+def test_tampered_body_is_rejected(engine, codec):
+    data = bytearray(raw(codec.dump(mid_run(engine), engine)))
+    # the score byte of the header
+    data[3] += 5
+    assert codec.load(base64.urlsafe_b64encode(bytes(data)).decode(), engine) is None
+
+
+def test_other_secret_is_rejected(engine, codec):
+    token = ResumeCodec(b"another secret").dump(mid_run(engine), engine)
+    assert codec.load(token, engine) is None
+
+
+@pytest.mark.parametrize("token", ["", "not a token", "AAAA", "=" * 8])
+def test_garbage_is_rejected(engine, codec, token):
+    assert codec.load(token, engine) is None
+
+
+def test_out_of_range_index_is_rejected(engine, codec):
+    state = mid_run(engine)
+    state.current_q_indices[1] = 999
+    # correctly signed, but not a position the bank can show
+    assert codec.load(codec.dump(state, engine), engine) is None
+
+
+def test_unknown_scenario_is_rejected(engine, codec):
+    body = codec.pack(mid_run(engine), engine)
+    forged = body.replace(b"\x06social", b"\x06nosuch")
+    assert forged != body
+    assert codec.load(resign(codec, forged), engine) is None
+
+
+def test_stale_scenario_version_is_rejected(engine, codec, tmp_path):
+    token = codec.dump(mid_run(engine), engine)
+
+    data_dir = tmp_path / "data"
+    shutil.copytree(DATA_DIR, data_dir)
+    path = data_dir / "scenarios" / "social.json"
+    scenario = json.loads(path.read_text(encoding="utf-8"))
+    scenario["questions"][0][0]["prompt"] += " (edited)"
+    path.write_text(json.dumps(scenario), encoding="utf-8")
+    edited = GameEngine(*load_bank(data_dir / "index.json", data_dir / "scenarios"))
+
+    assert codec.load(token, edited) is None
+    # the same token still restores on the bank it was issued for
+    assert codec.load(token, engine) is not None
+
+
+def test_truncated_body_is_rejected(engine, codec):
+    body = codec.pack(mid_run(engine), engine)
+    assert len(body) > MAC_BYTES
+    assert codec.unpack(body[:20], engine) is None
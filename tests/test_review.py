@@ -0,0 +1,73 @@
+import pytest
+
+from review import DAY, MIN_EASE, RELEARN_SECONDS, Deck
+
+NOW = 1_700_000_000
+A = ("social", 0, "00112233445566aa")
+B = ("social", 3, "00112233445566bb")
+C = ("bank", 1, "00112233445566cc")
+
+
+def drain(deck, now):
+    # the due cards in the order reviews serve them, each pushed a day out
+    order = []
+    while (card := deck.next_due(now)) is not None:
+        order.append(card)
+        deck.grade(card, 4, now)
+    return order
+
+
+def test_sm2_intervals_and_ease():
+    deck = Deck()
+    deck.miss(A, NOW)
+    assert deck.next_due(NOW) is None
+    assert deck.next_due(NOW + RELEARN_SECONDS) == A
+    deck.grade(A, 4, NOW)
+    assert deck.next_due_at() == NOW + DAY
+    deck.grade(A, 5, NOW)
+    assert deck.next_due_at() == NOW + 6 * DAY
+    deck.grade(A, 3, NOW)
+    # ease 2.5 -> 2.5 (q=4) -> 2.6 (q=5) -> 2.46 (q=3); third step is 6 * 2.6
+    assert deck.next_due_at() == NOW + 16 * DAY
+    deck.grade(A, 1, NOW)
+    assert deck.next_due_at() == NOW + RELEARN_SECONDS
+    for _ in range(20):
+        deck.miss(A, NOW)
+    deck.grade(A, 0, NOW)
+    assert deck._cards[A][3] == MIN_EASE
+
+
+def test_most_overdue_card_comes_first():
+    deck = Deck()
+    deck.miss(B, NOW)
+    deck.miss(A, NOW - 100)
+    deck.miss(C, NOW - 50)
+    # rescheduling leaves a stale heap entry behind that must be skipped
+    deck.grade(C, 4, NOW)
+    deck.drop(B)
+    later = NOW + RELEARN_SECONDS
+    assert deck.due_count(later) == 1
+    assert drain(deck, later) == [A]
+    assert drain(deck, NOW + 2 * DAY) == [C, A]
+
+
+def test_pack_round_trip_keeps_cards_and_due_order():
+    deck = Deck()
+    for i, card in enumerate((A, B, C)):
+        deck.miss(card, NOW - i * 60)
+    deck.grade(B, 4, NOW)
+    restored = Deck.unpack(deck.pack())
+    assert restored._cards == deck._cards
+    assert len(deck.pack()) == 2 + 2 * 1 + len("social") + len("bank") + 2 + 3 * 19
+    later = NOW + 2 * DAY
+    assert drain(restored, later) == drain(deck, later) == [C, A, B]
+
+
+def test_foreign_or_truncated_decks_are_rejected():
+    packed = Deck().pack()
+    with pytest.raises(ValueError, match="version"):
+        Deck.unpack(bytes([1]) + packed[1:])
+    deck = Deck()
+    deck.miss(A, NOW)
+    with pytest.raises(ValueError, match="malformed"):
+        Deck.unpack(deck.pack()[:-3])
@@ -0,0 +1,74 @@
+import json
+import random
+import shutil
+
+import pytest
+
+import runtoken
+from bank import DATA_DIR, load_bank
+from engine import GameEngine
+from selection import AdaptiveSelector
+
+
+def play(engine, rng):
+    state = engine.new_state()
+    engine.start(state, "social")
+    engine.enter_tower(state)
+    while state.phase == "layer":
+        question = engine.question(state)
+        option = question["correct"] if rng.random() < 0.7 else (question["correct"] + 1) % len(question["options"])
+        if engine.answer(state, option):
+            engine.continue_floor(state)
+        elif state.misses < 3:
+            engine.retry_floor(state)
+    return state
+
+
+def outcome(state):
+    return state.phase, state.layer_index, state.score, state.misses, state.current_q_indices
+
+
+@pytest.mark.parametrize("selector", [None, AdaptiveSelector()], ids=["random", "adaptive"])
+def test_replay_rebuilds_the_run(selector):
+    rng = random.Random(0)
+    engine = GameEngine(*load_bank(), rng=rng, selector=selector)
+    for _ in range(20):
+        state = play(engine, rng)
+        assert outcome(runtoken.replay(engine, engine.run_token(state))) == outcome(state)
+
+
+def test_steps_round_trip():
+    trail = bytearray()
+    steps = [(0, 1), (3, 0), (200, 6), (17, runtoken.TIMED_OUT)]
+    for q_idx, option in steps:
+        runtoken.append_step(trail, option, q_idx)
+    assert runtoken.last_option(trail) == runtoken.TIMED_OUT
+    token = runtoken.encode("social", 0xDEADBEEF, 1234, trail, pinned=True)
+    assert runtoken.decode(token) == ("social", 0xDEADBEEF, 1234, True, steps)
+
+
+def test_truncated_token_is_rejected():
+    trail = bytearray()
+    runtoken.append_step(trail, 1, 300)
+    token = runtoken.encode("social", 0, 0, trail[:-1], pinned=True)
+    with pytest.raises(ValueError, match="truncated"):
+        runtoken.decode(token)
+
+
+def test_replay_refuses_a_changed_bank(tmp_path):
+    rng = random.Random(0)
+    engine = GameEngine(*load_bank(), rng=rng)
+    token = engine.run_token(play(engine, rng))
+
+    data_dir = tmp_path / "data"
+    shutil.copytree(DATA_DIR, data_dir)
+    path = data_dir / "scenarios" / "social.json"
+    scenario = json.loads(path.read_text(encoding="utf-8"))
+    scenario["questions"][0][0]["prompt"] += " (edited)"
+    path.write_text(json.dumps(scenario), encoding="utf-8")
+    edited = GameEngine(*load_bank(data_dir / "index.json", data_dir / "scenarios"))
+
+    with pytest.raises(ValueError, match="changed since the run was played"):
+        runtoken.replay(edited, token)
+    # the same token still replays on the bank it was played on
+    runtoken.replay(engine, token)
@@ -0,0 +1,92 @@
+import gc
+import random
+
+from selection import MIN_ANSWERS, AdaptiveSelector, Pool
+
+
+def warm_up(selector, pool, rng, picks=200):
+    for _ in range(picks):
+        q_idx = selector.pick("social", 0, pool, 0.0, -1, rng)
+        selector.record("social", 0, pool[q_idx], rng.random() < 0.5)
+
+
+def test_picks_follow_a_shrunk_pool():
+    selector, rng = AdaptiveSelector(), random.Random(0)
+    warm_up(selector, Pool("abcde"), rng)
+    # a reload removed two questions and moved the rest
+    pool = Pool("eac")
+    for _ in range(200):
+        q_idx = selector.pick("social", 0, pool, 0.0, -1, rng)
+        assert 0 <= q_idx < len(pool)
+        selector.record("social", 0, pool[q_idx], True)
+
+
+def test_statistics_stay_with_their_question():
+    selector, rng = AdaptiveSelector(), random.Random(0)
+    warm_up(selector, Pool("abc"), rng)
+    before = selector.snapshot("social", 0)
+    # a reload added a question in front: it is served while unexplored
+    pool = Pool(("new", "c", "b", "a"))
+    for _ in range(MIN_ANSWERS):
+        assert selector.pick("social", 0, pool, 0.0, -1, rng) == 0
+        selector.record("social", 0, "new", True)
+    after = selector.snapshot("social", 0)
+    for q in "abc":
+        assert after[q][:2] == before[q][:2]
+    assert after["new"][:2] == (MIN_ANSWERS, MIN_ANSWERS)
+
+
+def test_answers_to_a_removed_question_are_counted():
+    selector, rng = AdaptiveSelector(), random.Random(0)
+    warm_up(selector, Pool("ab"), rng)
+    pool = Pool("bc")
+    selector.pick("social", 0, pool, 0.0, -1, rng)
+    answers = selector.snapshot("social", 0)["a"][0]
+    # a session still pinned to the old snapshot answers "a"
+    selector.record("social", 0, "a", False)
+    assert selector.snapshot("social", 0)["a"][0] == answers + 1
+    assert selector.pick("social", 0, pool, 0.0, 0, rng) == 1
+
+
+def test_exclude_is_a_position_in_the_pool():
+    selector, rng = AdaptiveSelector(), random.Random(0)
+    pool = Pool("ab")
+    warm_up(selector, pool, rng)
+    for _ in range(50):
+        assert selector.pick("social", 0, pool, 0.0, 1, rng) == 0
+
+
+def test_two_live_pools_keep_their_own_index():
+    selector, rng = AdaptiveSelector(), random.Random(0)
+    old, new = Pool("abcd"), Pool("dcbae")
+    warm_up(selector, old, rng)
+    selector.pick("social", 0, new, 0.0, -1, rng)
+    stats = selector._floors[("social", 0)]
+    indexes = dict(stats.indexes)
+    for _ in range(100):
+        for pool in (old, new):
+            q_idx = selector.pick("social", 0, pool, 0.0, -1, rng)
+            selector.record("social", 0, pool[q_idx], rng.random() < 0.5)
+    # alternating pools never rebuilt an index ...
+    assert all(stats.indexes[ids] is index for ids, index in indexes.items())
+    # ... and each index still ranks exactly its explored questions
+    for index in stats.indexes.values():
+        assert index.ranked == sorted(stats.key(q) for q in index.ids if stats.answers.get(q, 0) >= MIN_ANSWERS)
+
+
+def test_an_index_goes_with_its_last_pool():
+    selector, rng = AdaptiveSelector(), random.Random(0)
+    # the same pool in two locales shares one index
+    english, spanish = Pool("abc"), Pool("abc")
+    selector.pick("social", 0, english, 0.0, -1, rng)
+    selector.pick("social", 0, spanish, 0.0, -1, rng)
+    stats = selector._floors[("social", 0)]
+    assert len(stats.indexes) == 1
+    del english
+    gc.collect()
+    selector.pick("social", 0, spanish, 0.0, -1, rng)
+    assert len(stats.indexes) == 1
+    del spanish
+    gc.collect()
+    selector.pick("social", 0, Pool("xy"), 0.0, -1, rng)
+    assert list(stats.indexes) == [("x", "y")]
@@ -0,0 +1,51 @@
+from functools import lru_cache, partial
+
+from engine import NO_QUESTION
+
+# --------------------------------------------------
+# PRE-COMPOSED VIEWS
+# Markdown for the parts of a screen that only depend on the bank and a
+# few small keys, built once and sent as a single element instead of one
+# element per line:
+#   tower(current floor)                      the floor list on every floor
+#   success_report(scenario, question indices) the per-floor recap
+# The text is memoized per key; there are 9 towers and at most one report
+# per possible paper of a scenario (see papers.py), each a few KiB.
+# The caches wrap plain functions rather than bound methods, so a Views
+# holds no reference cycle and goes away with its bank snapshot as soon
+# as the last reference does (see snapshots.py).
+# --------------------------------------------------
+
+REPORT_CACHE_SIZE = 1024
+
+
+class Views:
+    def __init__(self, layers, scenarios):
+        self.layers = layers
+        self.scenarios = scenarios
+        self.tower = lru_cache(maxsize=None)(partial(tower, layers))
+        self.success_report = lru_cache(maxsize=REPORT_CACHE_SIZE)(partial(success_report, layers, scenarios))
+
+
+def tower(layers, current_index):
+    lines = ["### 🏢 Cloud Tower"]
+    for i, layer in enumerate(layers):
+        if i == current_index:
+            lines.append(f"**👉 Floor {i+1}: {layer['name']}**")
+        else:
+            lines.append(f"▫️ Floor {i+1}: {layer['name']}")
+    return "\n\n".join(lines)
+
+
+def success_report(layers, scenarios, scenario_key, q_indices):
+    questions = scenarios[scenario_key]["questions"]
+    parts = []
+    for i, (layer, q_idx) in enumerate(zip(layers, q_indices)):
+        q = questions[i][0 if q_idx == NO_QUESTION else q_idx]
+        parts.append(
+            f"**Floor {i+1} – {layer['name']}**\n\n"
+            f":gray[{layer['description']}]\n\n"
+            f"- ✅ Ideal option: **{q['options'][q['correct']]}**\n"
+            f"- 💡 Why: {q['ex_correct']}\n"
+        )
+    return "\n---\n\n".join(parts) + "\n---\n"